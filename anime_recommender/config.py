@@ -13,19 +13,141 @@ class Config(BaseModel):
 
     Attributes
     ----------
-    chunk_size : int
-        The number of records to be processed during one iteration for computing similarity scores. In order to avoid
-        unnecessary load on server the process of calculating recommendations is partioned into chunks. According to
-        local tests, the value of 1000 has practically no impact on calculation time, but approx. 16.7 times less
-        memory is consumed. The results of chunked calculations are almost the same (corr. coef > 0.999) as for
-        non-chunked calculations. The actual difference is the result of precision changes (float64 to float16 to
-        reduce RAM consumption) and common 'float values inaccuracy' while the order of operations (dot product, vector
-        sum and precision change) is not the same. Moreover, it was observed that the result difference might lead to
-        swapping of some pairs of titles in rare cases, which is, however, has almost zero affect on the final result.
+    memory_budget_bytes : int
+        Memory budget in bytes for computing similarity scores in chunks of user's titles. In order to avoid
+        unnecessary load on server the process of calculating recommendations is partitioned into chunks, and the
+        chunk size is derived per request from the catalog size, the number of selected columns, dtype and similarity
+        method, so small feature subsets are processed in one chunk and wide ones stay under the budget. The results of
+        chunked calculations are almost the same (corr. coef > 0.999) as for non-chunked calculations. The actual
+        difference is the result of precision changes and common 'float values inaccuracy' while the order of
+        operations (dot product, vector sum and precision change) is not the same.
+
+    chunk_workers : int
+        The number of threads scoring chunks of user's titles in parallel. Chunk results are summed in the order of
+        chunks, so recommendations do not depend on the number of threads. The value of 1 disables the thread pool.
+
+    precision : str
+        Numeric precision of the matrix of features and similarity calculations: `float16` (matrix stored in float16,
+        calculations and accumulation in float32), `float32` or `float64`. Refer to `main_benchmark.py --precision` for
+        time, peak memory and agreement of recommendations with float64 for every mode.
+
+    kernel_backend : str
+        Backend of similarity kernels: `numpy` (`sklearn` kernels, `RBFEngine` and BLAS products) or `numba` (fused
+        compiled kernels scoring the catalog in one parallel pass without chunk x N intermediate matrices). Numba is an
+        optional dependency, if it is not installed, `numpy` is used. Refer to `main_benchmark.py --backends` for the
+        comparison of backends.
+
+    top_k_margin : int
+        The number of additional titles selected on top of requested ones during partial top-k selection of
+        recommendations. Selected titles are sorted by score and index, which keeps the order of titles with tied scores
+        at the page boundary deterministic.
+
+    top_k_block_size : int
+        The number of titles in a block of the exact top-k search of linear similarity methods (`BlockTopK`). Blocks of
+        titles that cannot enter the requested page are skipped, recommendations are the same as with scoring of the
+        whole catalog. The value of 0 disables the search.
+
+    unique_rows_max_ratio : float
+        The maximum ratio of distinct rows of the matrix of features to titles for which titles are scored through
+        distinct rows (`UniqueRows`). Distinct rows are found once per combination of feature groups. The value of 0
+        disables deduplication.
+
+    engine_catalogs : int
+        The maximum number of combinations of feature groups, similarity method and precision `RecommendationEngine`
+        keeps catalog-side artifacts for.
+
+    engine_shards : int
+        The number of shards of titles `RecommendationEngine` scores in worker processes of the local host
+        (`ProcessTransport`). Values below 2 disable local shards.
+
+    shard_addresses : list[str]
+        Addresses (`host:port` or paths of Unix domain sockets) of shard servers started with `main_shard.py`, in the
+        order of their shards (`SocketTransport`). Used instead of local shards if not empty. The key shared with
+        servers is read from the `SHARD_AUTHKEY` environment variable.
+
+    centroids_max : int
+        The maximum number of weighted centroids huge lists of user's titles are reduced to for the RBF kernel
+        (`ProfileCentroids`). The value of 0 disables the reduction.
+
+    centroids_min_titles : int
+        The minimum number of user's titles to reduce to centroids.
+
+    centroids_tolerance : float
+        The maximum error of scores of the sample of catalog titles scored through centroids relative to the range of
+        their exact scores. If it is not reached with `centroids_max` centroids, the list is scored exactly.
+
+    centroids_profiles : int
+        The maximum number of lists to keep centroids for.
+
+    matrix_cache_bytes : int
+        Maximum total size in bytes of feature matrices cached by storage. Matrices are cached per combination of
+        selected feature groups, so repeated requests with the same features skip gathering columns from the data mart.
+
+    group_scores_profiles : int
+        The maximum number of user profiles to keep per-feature-group partial score vectors for. Partial score vectors
+        let linear similarity methods recombine scores when feature groups are toggled without rescoring the catalog.
+
+    title_scores_sessions : int
+        The maximum number of sessions to keep accumulators of similarity rows of chosen titles for in title mode
+        (`TitleScores`). Adding or removing a title then applies a delta instead of rescoring the whole title set.
+
+    kernel_scores_profiles : int
+        The maximum number of user profiles to keep recommendation vectors of similarity methods sharing a pass over
+        the catalog for (`KernelScores`). A pass scoring the RBF kernel also emits the linear kernel vector from the
+        same dot products, so switching the similarity method reuses it. The value of 0 disables the cache.
+
+    result_cache_entries : int
+        The maximum number of recommendations cached per canonical fingerprint of recommender configuration,
+        similarity method, contents of user's lists and version of the data mart.
+
+    result_cache_ttl : float
+        Time to live of cached recommendations in seconds. Bounds staleness of recommendations when user's lists change
+        on AniList.
+
+    ann_max_titles : int
+        The maximum number of titles chosen in title mode for which the RBF kernel is scored exactly only for candidates
+        found by the approximate nearest neighbours index (`LowRankCandidates`), i.e. titles with the highest scores of
+        the kernel of reduced features of `low_rank_variance`. The value of 0 disables the index. Recall of exact top
+        recommendations among candidates is reported by `main_benchmark.py --ann`.
+
+    ann_candidates : int
+        The number of candidates found by the approximate nearest neighbours index besides chosen titles. Higher values
+        give better recall of exact top recommendations at the cost of scoring time.
+
+    rff_components : int
+        Dimension of the random Fourier feature space used by the approximate RBF kernel (`rbf_kernel_rff`). Higher
+        values give better approximation of the exact kernel at the cost of memory and scoring time.
+
+    low_rank_variance : float
+        The minimum explained variance of the truncated SVD of every feature group used by the low-rank mode of
+        recommendations (`RecommenderConfig.low_rank`). Higher values give better approximation of scores at the cost
+        of the rank of the reduced matrix of features.
+
+    low_rank_max_rank : int
+        The maximum rank of the truncated SVD of every feature group. The value of 0 does not limit the rank.
+
+    batch_memory_bytes : int
+        Memory ceiling in bytes for the block of catalog x users scores computed by `BatchRecommender` at once.
+
+    storage_backend : str
+        Backend of the local storage, `dense` or `sparse`. The sparse backend loads the data mart in CSR format from
+        `sparse_data_path` and scores the catalog with sparse-dense products, which reduces memory consumption since
+        most of the features are one-hot encoded.
+
+    storage_check_interval : float
+        The minimum number of seconds between checks of files of the data mart for changes. Requests within the
+        interval are served by the loaded version without touching the file system.
 
     data_path : str
         Path to the raw data file. The data DataFrame contains all features for titles.
 
+    sparse_data_path : str
+        Path to the data mart in CSR format. Contains the same columns as the data DataFrame.
+
+    low_rank_path : str
+        Path to the truncated SVD factors of feature groups of the data mart (`LowRankFactors`) staged by the ETL.
+        Groups missing from the file are factorised on the first use.
+
     metadata_path : str
         Path to the metadata file. The metadata DataFrame contains column names from data and their types.
 
@@ -57,8 +179,37 @@ class Config(BaseModel):
         The number of items displayed in the dropdown menu.
     """
 
-    chunk_size: int
+    memory_budget_bytes: int
+    chunk_workers: int
+    precision: str
+    kernel_backend: str
+    top_k_margin: int
+    top_k_block_size: int
+    unique_rows_max_ratio: float
+    engine_catalogs: int
+    engine_shards: int
+    shard_addresses: list[str]
+    centroids_max: int
+    centroids_min_titles: int
+    centroids_tolerance: float
+    centroids_profiles: int
+    matrix_cache_bytes: int
+    group_scores_profiles: int
+    title_scores_sessions: int
+    kernel_scores_profiles: int
+    result_cache_entries: int
+    result_cache_ttl: float
+    ann_max_titles: int
+    ann_candidates: int
+    rff_components: int
+    low_rank_variance: float
+    low_rank_max_rank: int
+    batch_memory_bytes: int
+    storage_backend: str
+    storage_check_interval: float
     data_path: str
+    sparse_data_path: str
+    low_rank_path: str
     metadata_path: str
     info_path: str
     data_staged_path: str
@@ -6,8 +6,12 @@ import numpy as np
 import pandas as pd
 from loguru import logger
 from pandas import DataFrame, RangeIndex, Series
+from pandas.api.types import is_numeric_dtype
+from scipy.sparse import coo_matrix, csr_matrix
 from sklearn.preprocessing import MinMaxScaler
 
+from anime_recommender.storage.LowRankFactors import LowRankFactors
+
 from . import ITransformer, TextProcessor, stage_file
 
 
@@ -22,6 +26,12 @@ class APITransformer(DataFrame, ITransformer):
     __transformed_path: str
         Path to the transformed data file.
 
+    __sparse_path: str
+        Path to the transformed data file in CSR format.
+
+    __low_rank_path: str
+        Path to the truncated SVD factors of feature groups (`LowRankFactors`) of the transformed data.
+
     __metadata_path: str
         Path to the metadata file.
 
@@ -69,6 +79,8 @@ class APITransformer(DataFrame, ITransformer):
         if not inner:
             self.__staged_path: str = os.environ.get('DATA_PROCESSED_PATH')
             self.__transformed_path: str = os.environ.get('DATA_PATH')
+            self.__sparse_path: str = os.environ.get('SPARSE_DATA_PATH')
+            self.__low_rank_path: str = os.environ.get('LOW_RANK_PATH')
             self.__metadata_path: str = os.environ.get('METADATA_PATH')
             self.__info_path: str = os.environ.get('INFO_PATH')
 
@@ -87,6 +99,8 @@ class APITransformer(DataFrame, ITransformer):
                 f'APITransformer(\n',
                 f'  staged_path={self.__staged_path}\n',
                 f'  transformed_path={self.__transformed_path}\n',
+                f'  sparse_path={self.__sparse_path}\n',
+                f'  low_rank_path={self.__low_rank_path}\n',
                 f'  metadata_path={self.__metadata_path}\n',
                 f'  info_path={self.__info_path}\n',
                 f'  metadata={self.__metadata}\n',
@@ -159,8 +173,45 @@ class APITransformer(DataFrame, ITransformer):
         stage_file(self.__metadata, self.__metadata_path)
         stage_file(DataFrame(self), self.__transformed_path)
 
+        sparse = self.__to_sparse() if self.__sparse_path or self.__low_rank_path else None
+
+        if self.__sparse_path:
+            stage_file(sparse, self.__sparse_path)
+
+        if self.__low_rank_path:
+            stage_file(self.__to_low_rank(sparse), self.__low_rank_path)
+
         logger.info('Done.')
 
+    def __to_sparse(self):
+        """Convert the transformed data to float32 CSR matrix.
+
+        Non-numeric columns are left empty, so column positions are the same as in the transformed data and metadata.
+        """
+        is_numeric = np.array([is_numeric_dtype(dtype) for dtype in self.dtypes])
+        numeric = coo_matrix(self.iloc[:, is_numeric].to_numpy(dtype=np.float32))
+        positions = np.flatnonzero(is_numeric)
+
+        return coo_matrix((numeric.data, (numeric.row, positions[numeric.col])), shape=self.shape).tocsr()
+
+    def __to_low_rank(self, sparse: csr_matrix) -> LowRankFactors:
+        """Factorise feature groups of `__META_CATEGORIES` with truncated SVD.
+
+        Other groups are factorised by the storage on the first use.
+        """
+        logger.info('Factorising feature groups...')
+
+        groups = self.__metadata.column_name.values
+        is_category = np.isin(groups, APITransformer.__META_CATEGORIES)
+        factors = LowRankFactors(
+            float(os.environ.get('LOW_RANK_VARIANCE')),
+            int(os.environ.get('LOW_RANK_MAX_RANK', 0)),
+        )
+        factors.fit(sparse[:, np.flatnonzero(is_category)], groups[is_category])
+
+        logger.info('\n' + factors.__repr__())
+        return factors
+
     def transform_list(self, column: str, mode: str) -> DataFrame:
         logger.info(f'Transforming {column} column...')
 
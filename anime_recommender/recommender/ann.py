@@ -0,0 +1,141 @@
+"""Approximate nearest neighbours module.
+
+Provides the `LowRankCandidates` index that finds candidate neighbours of a few titles without scoring the whole catalog
+with the full matrix of features. It is used by `Recommender` in title mode, where candidates are then reranked exactly.
+The index is the matrix of truncated SVD factors of feature groups (`LowRankFactors`), which is staged next to the data
+mart, so it is built once per version of the data mart.
+"""
+
+from typing import final
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+@final
+class LowRankCandidates(object):
+    """Candidate neighbours of titles found in the space of truncated SVD factors of feature groups.
+
+    Reduced features approximate euclidean distances of titles (see `LowRankFactors`), so the RBF kernel evaluated
+    between reduced rows of query titles and reduced rows of the catalog ranks titles almost the same way as the exact
+    one, at the cost proportional to the rank instead of the number of features. Titles with the highest approximate
+    scores are the candidates, which are then scored exactly, so the recommendations are exact as long as the exact top
+    titles are among the candidates. Recall of the exact top titles is reported by `benchmark_ann`
+    (`main_benchmark.py --ann`).
+
+    Attributes
+    ----------
+    matrix : NDArray[np.float32]
+        The matrix of reduced features of the catalog.
+
+    row_norms : NDArray[np.float32]
+        Squared euclidean norms of rows of the matrix of reduced features.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the LowRankCandidates class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the LowRankCandidates class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not LowRankCandidates:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(self, matrix: NDArray[np.float32], row_norms: NDArray[np.float32]):
+        """Initialize the index with the matrix of reduced features.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of reduced features of the catalog, e.g. from `IStorage.matrix` with `low_rank` set.
+
+        row_norms : NDArray[np.float32]
+            Squared euclidean norms of rows of the matrix.
+        """
+        self._matrix: NDArray[np.float32] = matrix
+        self._row_norms: NDArray[np.float32] = row_norms
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'LowRankCandidates(\n',
+                '  shape={shape})',
+            ],
+        )
+
+        return repr_template.format(shape=self._matrix.shape)
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def matrix(self) -> NDArray[np.float32]:
+        """Return the matrix of reduced features.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            The matrix of reduced features of the catalog.
+        """
+        return self._matrix
+
+    def query(self, indexes: NDArray[np.uint32], scores: NDArray[np.uint8], n_candidates: int) -> NDArray[np.intp]:
+        """Find candidate neighbours of the given titles.
+
+        The RBF kernel has the default coefficient of `1 / n_features` of the reduced space, which `LowRankFactors`
+        scales to match the coefficient of the full space.
+
+        Parameters
+        ----------
+        indexes : NDArray[np.uint32]
+            Indexes of query titles.
+
+        scores : NDArray[np.uint8]
+            Scores of query titles.
+
+        n_candidates : int
+            The number of candidates to find besides query titles.
+
+        Returns
+        -------
+        NDArray[np.intp]
+            Sorted indexes of candidate titles. Query titles are included.
+        """
+        indexes = np.asarray(indexes, dtype=np.intp)
+        scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        kernel = self._matrix[indexes] @ self._matrix.T
+        kernel *= -2
+        kernel += self._row_norms
+        kernel += self._row_norms[indexes].reshape(-1, 1)
+        np.maximum(kernel, 0, out=kernel)
+        kernel *= -1 / max(self._matrix.shape[1], 1)
+        np.exp(kernel, out=kernel)
+        approximate_scores = scores @ kernel
+        approximate_scores[indexes] = np.inf
+        count = min(n_candidates + indexes.shape[0], approximate_scores.shape[0])
+        partition_start = approximate_scores.shape[0] - count
+
+        return np.sort(np.argpartition(approximate_scores, partition_start)[partition_start:])
@@ -0,0 +1,224 @@
+"""Batch recommender module.
+
+Provides the `BatchRecommender` class that scores many user profiles at once, e.g. for nightly precomputation of
+recommendations. Profiles are stacked into a matrix and scored against the catalog with blocked matrix-matrix products
+instead of separate `Recommender.recommend` calls per user.
+"""
+
+from typing import final
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.sparse import csr_matrix, issparse
+
+from anime_recommender.config import config
+from anime_recommender.recommender.recommender import SimilarityMethod, VectorUtility
+from anime_recommender.recommender.result import RecommendationResult
+from anime_recommender.storage import IStorage
+
+
+@final
+class BatchRecommender(object):
+    """Recommender for many user profiles scored with blocked matrix-matrix products.
+
+    Only similarity methods scored through a profile vector (linear ones and ones with a feature map) are supported,
+    since the summed similarity of a profile is then a single row of the product of the profile matrix and the
+    catalog matrix.
+
+    Attributes
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features and titles' information.
+
+    columns : list[str]
+        Feature groups to include in the calculation.
+
+    similarity_method : SimilarityMethod
+        The similarity method to use.
+
+    max_bytes : int
+        Memory ceiling in bytes for the block of catalog x users scores. The number of users scored at once is derived
+        from it.
+
+    matrix : NDArray[np.float32]
+        Matrix of features, mapped if the similarity method uses a feature map.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the BatchRecommender class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the BatchRecommender class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not BatchRecommender:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(
+        self,
+        storage: IStorage,
+        columns: list[str],
+        similarity_method: SimilarityMethod,
+        max_bytes: int | None = None,
+    ):
+        """Initialize the BatchRecommender with the given parameters.
+
+        Parameters
+        ----------
+        storage : IStorage
+            IStorage interface implementation. The currently loaded version of the data mart is pinned.
+
+        columns : list[str]
+            Feature groups to include in the calculation.
+
+        similarity_method : SimilarityMethod
+            The similarity method to use. Must be linear or use a feature map.
+
+        max_bytes : int, optional
+            Memory ceiling in bytes for the block of scores. If None, `config.batch_memory_bytes` is used.
+
+        Raises
+        ------
+        ValueError
+            If the similarity method cannot be scored through a profile vector.
+        """
+        if not (similarity_method.is_linear or similarity_method.uses_feature_map):
+            raise ValueError('{method} cannot be scored in batch.'.format(method=similarity_method))
+
+        storage = storage.pin()
+        self._storage: IStorage = storage
+        self._columns: list[str] = columns
+        self._similarity_method: SimilarityMethod = similarity_method
+        self._max_bytes: int = max_bytes if max_bytes is not None else config.batch_memory_bytes
+        self._matrix: NDArray[np.float32] = storage.matrix(columns)
+
+        if similarity_method.uses_feature_map:
+            feature_map = similarity_method.feature_map
+            self._matrix = storage.matrix_artifact(columns, feature_map.key, feature_map.transform)
+
+    def __repr__(self) -> str:
+        """Return a representation of the BatchRecommender object.
+
+        Returns
+        -------
+        str
+            A representation of the BatchRecommender object.
+        """
+        repr_template = ''.join(
+            [
+                'BatchRecommender(\n',
+                '  columns={columns},\n',
+                '  matrix_shape={matrix_shape},\n',
+                '  max_bytes={max_bytes},\n',
+                '  similarity_method={similarity_method})',
+            ],
+        )
+
+        return repr_template.format(
+            columns=self._columns,
+            matrix_shape=self._matrix.shape,
+            max_bytes=self._max_bytes,
+            similarity_method=self._similarity_method,
+        )
+
+    def __str__(self) -> str:
+        """Return a string representation of the BatchRecommender object.
+
+        Returns
+        -------
+        str
+            A string representation of the BatchRecommender object.
+        """
+        return self.__repr__()
+
+    @property
+    def block_size(self) -> int:
+        """Return the number of users scored with one matrix-matrix product.
+
+        Returns
+        -------
+        int
+            The number of users in a block, at least 1.
+        """
+        return max(self._max_bytes // (self._matrix.shape[0] * np.dtype(np.float32).itemsize), 1)
+
+    def recommend(
+        self,
+        profiles: list[tuple[NDArray[np.uint32], NDArray]],
+        k: int,
+        indexes_exclude: list[NDArray[np.uint32]] | None = None,
+    ) -> list[RecommendationResult]:
+        """Generate top k recommendations for every profile.
+
+        Parameters
+        ----------
+        profiles : list[tuple[NDArray[np.uint32], NDArray]]
+            Pairs of internal indexes of users' titles and their scores.
+
+        k : int
+            The number of recommendations per user.
+
+        indexes_exclude : list[NDArray[np.uint32]], optional
+            Indexes of titles to exclude from recommendations per user. Titles of the profile are always excluded.
+
+        Returns
+        -------
+        list[RecommendationResult]
+            Top recommended titles with their scores in the same format as `Recommender.recommend` returns, one per
+            profile.
+        """
+        indexes_exclude = indexes_exclude or [np.array([], dtype=np.uint32)] * len(profiles)
+        vector_utility = VectorUtility(self._similarity_method)
+        recommendations = []
+
+        for block_start in range(0, len(profiles), self.block_size):
+            block_profiles = profiles[block_start : block_start + self.block_size]
+            block_scores = self._score_block(block_profiles)
+
+            for block_index, (indexes_include, _) in enumerate(block_profiles):
+                if not indexes_include.shape[0]:
+                    recommendations.append(RecommendationResult.empty())
+                    continue
+
+                vector_utility.result_vector = block_scores[:, block_index]
+                recommendations.append(
+                    vector_utility.extract_sorted_recommendations(
+                        self._storage,
+                        indexes_include,
+                        indexes_exclude[block_start + block_index],
+                        k,
+                    ),
+                )
+
+        return recommendations
+
+    def _score_block(self, profiles: list[tuple[NDArray[np.uint32], NDArray]]) -> NDArray[np.float32]:
+        """Score block of profiles against the catalog.
+
+        Parameters
+        ----------
+        profiles : list[tuple[NDArray[np.uint32], NDArray]]
+            Pairs of internal indexes of users' titles and their scores.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Catalog x users matrix of unnormalised scores.
+        """
+        rows = np.repeat(np.arange(len(profiles)), [indexes.shape[0] for indexes, _ in profiles])
+        columns = np.concatenate([indexes for indexes, _ in profiles]).astype(np.intp)
+        weights = np.concatenate([np.asarray(scores, dtype=np.float32).reshape(-1) for _, scores in profiles])
+        selection = csr_matrix((weights, (rows, columns)), shape=(len(profiles), self._matrix.shape[0]))
+
+        profile_matrix = selection @ self._matrix
+        profile_matrix = profile_matrix.toarray() if issparse(profile_matrix) else profile_matrix
+
+        return np.asarray(self._matrix @ profile_matrix.T.astype(np.float32), dtype=np.float32)
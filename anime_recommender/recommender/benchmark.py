@@ -0,0 +1,859 @@
+"""Benchmark module.
+
+Provides functions to measure scoring time and accuracy of approximate or alternative recommendation modes against the
+exact `VectorUtility` path on the data mart. User profiles are sampled from the catalog, so benchmarks do not require
+access to the AniList API. Run `main_benchmark.py` to get reports.
+"""
+
+import tracemalloc
+from time import perf_counter
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+from scipy.sparse import issparse
+
+from anime_recommender.recommender.ann import LowRankCandidates
+from anime_recommender.recommender.centroids import ProfileCentroids
+from anime_recommender.recommender.kernels import NumbaBackend
+from anime_recommender.recommender.recommender import (
+    Precision,
+    RandomFourierFeatures,
+    RBFEngine,
+    SimilarityMethod,
+    VectorUtility,
+)
+from anime_recommender.recommender.topk import BlockTopK
+from anime_recommender.storage import IStorage
+from anime_recommender.storage.LowRankFactors import LowRankFactors
+
+
+def sample_profile(storage: IStorage, list_size: int, seed: int = 0) -> tuple[NDArray[np.uint32], NDArray[np.uint8]]:
+    """Sample user profile from the catalog.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to sample titles from.
+
+    list_size : int
+        The number of titles in the profile. Capped by the size of the catalog.
+
+    seed : int, default: 0
+        Seed of the random generator.
+
+    Returns
+    -------
+    tuple[NDArray[np.uint32], NDArray[np.uint8]]
+        Internal indexes of sampled titles and their scores on ten-point scale.
+    """
+    generator = np.random.default_rng(seed)
+    catalog_size = storage.info.shape[0]
+    indexes = generator.choice(catalog_size, min(list_size, catalog_size), replace=False).astype(np.uint32)
+    scores = generator.integers(1, 11, size=indexes.shape[0]).astype(np.uint8)
+
+    return indexes, scores
+
+
+def rank_correlation(vector_a: NDArray, vector_b: NDArray) -> float:
+    """Calculate Spearman rank correlation between two score vectors.
+
+    Parameters
+    ----------
+    vector_a : NDArray
+        First score vector.
+
+    vector_b : NDArray
+        Second score vector.
+
+    Returns
+    -------
+    float
+        Rank correlation coefficient.
+    """
+    ranks_a = np.argsort(np.argsort(vector_a))
+    ranks_b = np.argsort(np.argsort(vector_b))
+
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+def top_k_overlap(vector_a: NDArray, vector_b: NDArray, k: int = 20) -> float:
+    """Calculate share of common titles among top k titles of two score vectors.
+
+    Parameters
+    ----------
+    vector_a : NDArray
+        First score vector.
+
+    vector_b : NDArray
+        Second score vector.
+
+    k : int, default: 20
+        The number of top titles to compare.
+
+    Returns
+    -------
+    float
+        Share of common titles in range from 0 to 1.
+    """
+    top_a = np.argpartition(-vector_a, k)[:k]
+    top_b = np.argpartition(-vector_b, k)[:k]
+
+    return np.intersect1d(top_a, top_b).shape[0] / k
+
+
+def score(
+    similarity_method: str,
+    indexes: NDArray[np.uint32],
+    scores: NDArray[np.uint8],
+    matrix: NDArray[np.float32],
+    precision: str = 'float32',
+    backend: str = 'numpy',
+) -> tuple[NDArray[np.float32], float]:
+    """Score the catalog for the profile with `VectorUtility`.
+
+    Titles of the profile are masked with `-inf`, so they do not affect accuracy metrics.
+
+    Parameters
+    ----------
+    similarity_method : str
+        The similarity method to use.
+
+    indexes : NDArray[np.uint32]
+        Indexes of titles of the profile.
+
+    scores : NDArray[np.uint8]
+        Scores of titles of the profile.
+
+    matrix : NDArray[np.float32]
+        The matrix of features, already mapped if the similarity method uses a feature map.
+
+    precision : str, default: 'float32'
+        Numeric precision of calculations. The matrix should be in the storage data type of the precision.
+
+    backend : str, default: 'numpy'
+        The kernel backend.
+
+    Returns
+    -------
+    tuple[NDArray[np.float32], float]
+        Vector of recommendations and scoring time in seconds.
+    """
+    vector_utility = VectorUtility(SimilarityMethod(similarity_method, backend), Precision(precision))
+    vector_utility.matrix_size = matrix.shape[0]
+
+    if vector_utility.similarity_method.uses_row_norms:
+        vector_utility.row_norms = RBFEngine.row_norms(matrix)
+
+    time_start = perf_counter()
+    vector_utility.accumulate_chunked_results(indexes, scores.reshape(-1, 1), scores.sum(dtype=np.uint32), matrix)
+    elapsed = perf_counter() - time_start
+
+    result_vector = vector_utility.result_vector.astype(np.float64)
+    result_vector[indexes] = -np.inf
+
+    return result_vector, elapsed
+
+
+def benchmark_rff(
+    storage: IStorage,
+    columns: list[str],
+    list_size: int,
+    components: list[int],
+    seed: int = 0,
+) -> list[dict]:
+    """Compare approximate RBF kernel with random Fourier features against the exact RBF kernel.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_size : int
+        The number of titles in the sampled profile.
+
+    components : list[int]
+        Dimensions of the random Fourier feature space to benchmark.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling the profile.
+
+    Returns
+    -------
+    list[dict]
+        Report row per dimension with mapping time, scoring times, rank correlation and top-20 overlap.
+    """
+    matrix = storage.matrix(columns)
+    indexes, scores = sample_profile(storage, list_size, seed)
+    exact_vector, exact_time = score('rbf_kernel', indexes, scores, matrix)
+    report = []
+
+    for n_components in components:
+        time_start = perf_counter()
+        mapped = RandomFourierFeatures(n_components).transform(matrix)
+        map_time = perf_counter() - time_start
+
+        approx_vector, approx_time = score('rbf_kernel_rff', indexes, scores, mapped)
+        is_valid = np.isfinite(exact_vector)
+
+        report.append(
+            {
+                'n_components': n_components,
+                'map_time': map_time,
+                'exact_time': exact_time,
+                'approx_time': approx_time,
+                'rank_correlation': rank_correlation(exact_vector[is_valid], approx_vector[is_valid]),
+                'top_20_overlap': top_k_overlap(exact_vector, approx_vector),
+            },
+        )
+
+    log_report('Random Fourier features vs exact RBF', report)
+    return report
+
+
+def benchmark_precision(
+    storage: IStorage,
+    columns: list[str],
+    list_size: int,
+    similarity_methods: list[str],
+    seed: int = 0,
+) -> list[dict]:
+    """Compare precision modes against float64 calculations.
+
+    Peak memory is traced with `tracemalloc` while scoring and includes the matrix converted to the compute data type
+    (if needed), kernel buffers and result vectors, but not the cached matrix of features itself, which is reported
+    separately.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_size : int
+        The number of titles in the sampled profile.
+
+    similarity_methods : list[str]
+        Similarity methods to benchmark.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling the profile.
+
+    Returns
+    -------
+    list[dict]
+        Report row per similarity method and precision mode with scoring time, peak memory, size of the matrix, rank
+        correlation and top-20 overlap with float64.
+    """
+    indexes, scores = sample_profile(storage, list_size, seed)
+    precisions = sorted(Precision.modes, reverse=True)
+    report = []
+
+    for similarity_method in similarity_methods:
+        reference_vector = None
+
+        for precision in precisions:
+            matrix = storage.matrix(columns, Precision(precision).storage_dtype)
+            matrix_bytes = matrix.data.nbytes + matrix.indices.nbytes if issparse(matrix) else matrix.nbytes
+
+            tracemalloc.start()
+            result_vector, elapsed = score(similarity_method, indexes, scores, matrix, precision)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            reference_vector = result_vector if reference_vector is None else reference_vector
+            is_valid = np.isfinite(reference_vector)
+
+            report.append(
+                {
+                    'similarity_method': similarity_method,
+                    'precision': precision,
+                    'time': elapsed,
+                    'peak_bytes': peak_bytes,
+                    'matrix_bytes': matrix_bytes,
+                    'rank_correlation': rank_correlation(reference_vector[is_valid], result_vector[is_valid]),
+                    'top_20_overlap': top_k_overlap(reference_vector, result_vector),
+                },
+            )
+
+    log_report('Precision modes vs float64', report)
+    return report
+
+
+def benchmark_backends(
+    storage: IStorage,
+    columns: list[str],
+    list_size: int,
+    similarity_methods: list[str],
+    seed: int = 0,
+    repeats: int = 3,
+) -> list[dict]:
+    """Compare kernel backends against the NumPy one.
+
+    The first call of every backend is timed separately, since it includes compilation of Numba kernels (or loading
+    them from the disk cache). Peak memory is traced with `tracemalloc` and includes only arrays allocated by NumPy, but
+    fused kernels do not allocate anything except the profile vector of linear methods.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_size : int
+        The number of titles in the sampled profile.
+
+    similarity_methods : list[str]
+        Similarity methods to benchmark.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling the profile.
+
+    repeats : int, default: 3
+        The number of timed calls after the first one. The best time is reported.
+
+    Returns
+    -------
+    list[dict]
+        Report row per similarity method and backend with the time of the first call, the best time of repeated calls,
+        peak memory, the maximum relative difference, rank correlation and top-20 overlap with the NumPy backend.
+    """
+    backends = ['numpy']
+
+    if NumbaBackend.is_available():
+        backends.append(NumbaBackend.name)
+    else:
+        logger.warning('Numba is not installed, only numpy kernel backend is benchmarked.')
+
+    indexes, scores = sample_profile(storage, list_size, seed)
+    report = []
+
+    for similarity_method in similarity_methods:
+        matrix = storage.matrix(columns)
+        feature_map = SimilarityMethod(similarity_method, 'numpy').feature_map
+
+        if feature_map is not None:
+            matrix = storage.matrix_artifact(columns, feature_map.key, feature_map.transform)
+
+        reference_vector = None
+
+        for backend in backends:
+            tracemalloc.start()
+            result_vector, first_time = score(similarity_method, indexes, scores, matrix, backend=backend)
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            best_time = min(
+                score(similarity_method, indexes, scores, matrix, backend=backend)[1] for _ in range(max(repeats, 1))
+            )
+
+            reference_vector = result_vector if reference_vector is None else reference_vector
+            is_valid = np.isfinite(reference_vector)
+            difference = np.abs(result_vector[is_valid] - reference_vector[is_valid])
+
+            report.append(
+                {
+                    'similarity_method': similarity_method,
+                    'backend': backend,
+                    'first_time': first_time,
+                    'time': best_time,
+                    'peak_bytes': peak_bytes,
+                    'max_rel_diff': float(difference.max() / (np.abs(reference_vector[is_valid]).max() or 1)),
+                    'rank_correlation': rank_correlation(reference_vector[is_valid], result_vector[is_valid]),
+                    'top_20_overlap': top_k_overlap(reference_vector, result_vector),
+                },
+            )
+
+    log_report('Kernel backends vs numpy', report)
+    return report
+
+
+def benchmark_block_top_k(
+    storage: IStorage,
+    columns: list[str],
+    list_sizes: list[int],
+    block_sizes: list[int],
+    k: int = 20,
+    seed: int = 0,
+) -> list[dict]:
+    """Compare the exact top-k search over blocks of titles against scoring of the whole catalog.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_sizes : list[int]
+        The numbers of titles in sampled profiles.
+
+    block_sizes : list[int]
+        The numbers of titles in a block to benchmark.
+
+    k : int, default: 20
+        The number of recommendations.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling profiles.
+
+    Returns
+    -------
+    list[dict]
+        Report row per block size and list size with the time of fitting the index, scoring times of the whole catalog
+        and of blocks, and whether recommended titles are the same.
+    """
+    matrix = storage.matrix(columns)
+    metadata = storage.metadata
+    groups = metadata[metadata.column_name.isin(columns)].column_name.values
+    vector_utility = VectorUtility(SimilarityMethod('linear_kernel'), Precision('float32'))
+    indexes_exclude = np.array([], dtype=np.uint32)
+    report = []
+
+    for block_size in block_sizes:
+        time_start = perf_counter()
+        block_top_k = BlockTopK(block_size).fit(matrix, groups)
+        fit_time = perf_counter() - time_start
+
+        for list_size in list_sizes:
+            indexes, scores = sample_profile(storage, list_size, seed)
+            scores = scores.reshape(-1, 1)
+            scores_sum = scores.sum(dtype=np.uint32)
+
+            time_start = perf_counter()
+            vector_utility.matrix_size = matrix.shape[0]
+            vector_utility.accumulate_chunked_results(indexes, scores, scores_sum, matrix)
+            exact = vector_utility.extract_sorted_recommendations(storage, indexes, indexes_exclude, k)
+            exact_time = perf_counter() - time_start
+
+            time_start = perf_counter()
+            pruned = vector_utility.extract_pruned_recommendations(
+                storage,
+                block_top_k,
+                indexes,
+                scores,
+                scores_sum,
+                matrix,
+                indexes_exclude,
+                k,
+            )
+            pruned_time = perf_counter() - time_start
+
+            report.append(
+                {
+                    'block_size': block_size,
+                    'list_size': list_size,
+                    'fit_time': fit_time,
+                    'exact_time': exact_time,
+                    'pruned_time': pruned_time,
+                    'same_scores': bool(np.array_equal(exact.scores, pruned.scores)),
+                },
+            )
+
+    log_report('Block top-k vs whole catalog', report)
+    return report
+
+
+def benchmark_centroids(
+    storage: IStorage,
+    columns: list[str],
+    list_sizes: list[int],
+    tolerances: list[float],
+    max_centroids: int = 256,
+    seed: int = 0,
+) -> list[dict]:
+    """Compare RBF scoring through weighted centroids of user's titles against the exact one.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_sizes : list[int]
+        The numbers of titles in sampled profiles.
+
+    tolerances : list[float]
+        Tolerances of `ProfileCentroids` to benchmark.
+
+    max_centroids : int, default: 256
+        The maximum number of centroids.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling profiles.
+
+    Returns
+    -------
+    list[dict]
+        Report row per list size and tolerance with the number of centroids (0 if the list is scored exactly), the
+        exact time, the time of the first call including k-means, the time of a call with cached centroids, the speedup
+        of the latter, the maximum relative difference, rank correlation and top-20 overlap with the exact scores.
+    """
+    matrix = storage.matrix(columns)
+    row_norms = RBFEngine.row_norms(matrix)
+    report = []
+
+    for list_size in list_sizes:
+        indexes, scores = sample_profile(storage, list_size, seed)
+        reference_vector, exact_time = score('rbf_kernel', indexes, scores, matrix)
+
+        for tolerance in tolerances:
+            profile_centroids = ProfileCentroids(max_centroids, tolerance, 1, seed=seed)
+            vector_utility = VectorUtility(SimilarityMethod('rbf_kernel', 'numpy'), Precision('float32'))
+            vector_utility.row_norms = row_norms
+            vector_utility.profile_centroids = profile_centroids
+
+            time_start = perf_counter()
+            vector_utility.score(indexes, scores, matrix)
+            first_time = perf_counter() - time_start
+
+            time_start = perf_counter()
+            result_vector = vector_utility.score(indexes, scores, matrix).astype(np.float64) / scores.sum()
+            cached_time = perf_counter() - time_start
+
+            reduced = profile_centroids.reduce(indexes, scores, matrix)
+            result_vector[indexes] = -np.inf
+            is_valid = np.isfinite(reference_vector)
+            difference = np.abs(result_vector[is_valid] - reference_vector[is_valid])
+
+            report.append(
+                {
+                    'list_size': list_size,
+                    'tolerance': tolerance,
+                    'centroids': reduced[0].shape[0] if reduced is not None else 0,
+                    'exact_time': exact_time,
+                    'first_time': first_time,
+                    'time': cached_time,
+                    'speedup': exact_time / cached_time,
+                    'max_rel_diff': float(difference.max() / (np.abs(reference_vector[is_valid]).max() or 1)),
+                    'rank_correlation': rank_correlation(reference_vector[is_valid], result_vector[is_valid]),
+                    'top_20_overlap': top_k_overlap(reference_vector, result_vector),
+                },
+            )
+
+    log_report('Weighted centroids vs exact RBF kernel', report)
+    return report
+
+
+def benchmark_low_rank(  # noqa: WPS211
+    storage: IStorage,
+    columns: list[str],
+    list_size: int,
+    variances: list[float],
+    methods: list[str],
+    max_rank: int = 0,
+    seed: int = 0,
+) -> list[dict]:
+    """Compare scoring in the reduced space of truncated SVD factors of feature groups against the full matrix.
+
+    Scores of linear methods in the reduced space differ from the exact ones by a constant factor, so differences are
+    measured between min-max scaled scores, the same as in recommendations.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_size : int
+        The number of titles in the sampled profile.
+
+    variances : list[float]
+        Explained variances of `LowRankFactors` to benchmark.
+
+    methods : list[str]
+        Similarity methods to benchmark.
+
+    max_rank : int, default: 0
+        The maximum rank of every feature group. The value of 0 does not limit the rank.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling the profile.
+
+    Returns
+    -------
+    list[dict]
+        Report row per variance and similarity method with the rank of the reduced matrix, the smallest explained
+        variance of its groups, sizes of the full and the reduced matrices in bytes, the factorisation time, exact and
+        reduced scoring times, the speedup, the maximum difference of scaled scores, rank correlation and top-20
+        overlap with the exact scores.
+    """
+    matrix = storage.matrix(columns)
+    metadata = storage.metadata
+    groups = metadata[metadata.column_name.isin(columns)].column_name.values
+    matrix_nbytes = matrix.nbytes
+
+    if issparse(matrix):
+        matrix_nbytes = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+    indexes, scores = sample_profile(storage, list_size, seed)
+    exact = {}
+
+    for method in methods:
+        similarity_method = SimilarityMethod(method, 'numpy')
+        mapped = similarity_method.feature_map.transform(matrix) if similarity_method.uses_feature_map else matrix
+        exact[method] = score(method, indexes, scores, mapped)
+
+    report = []
+
+    for variance in variances:
+        time_start = perf_counter()
+        factors = LowRankFactors(variance, max_rank).fit(matrix, groups)
+        fit_time = perf_counter() - time_start
+
+        columns_ordered = list(dict.fromkeys(groups))
+        reduced = factors.matrix(columns_ordered)
+
+        for method in methods:
+            similarity_method = SimilarityMethod(method, 'numpy')
+            mapped = similarity_method.feature_map.transform(reduced) if similarity_method.uses_feature_map else reduced
+            reference_vector, exact_time = exact[method]
+            result_vector, reduced_time = score(method, indexes, scores, mapped)
+            is_valid = np.isfinite(reference_vector)
+            difference = np.abs(_minmax(result_vector[is_valid]) - _minmax(reference_vector[is_valid]))
+
+            report.append(
+                {
+                    'variance': variance,
+                    'method': method,
+                    'rank': reduced.shape[1],
+                    'explained': min(factors.explained(group) for group in columns_ordered),
+                    'full_bytes': matrix_nbytes,
+                    'reduced_bytes': reduced.nbytes,
+                    'fit_time': fit_time,
+                    'exact_time': exact_time,
+                    'time': reduced_time,
+                    'speedup': exact_time / reduced_time,
+                    'max_scaled_diff': float(difference.max()),
+                    'rank_correlation': rank_correlation(reference_vector[is_valid], result_vector[is_valid]),
+                    'top_20_overlap': top_k_overlap(reference_vector, result_vector),
+                },
+            )
+
+    log_report('Low-rank vs full matrix of features', report)
+    return report
+
+
+def benchmark_paging(  # noqa: WPS211
+    storage: IStorage,
+    columns: list[str],
+    list_size: int,
+    methods: list[str],
+    k: int = 20,
+    pages_count: int = 20,
+    seed: int = 0,
+) -> list[dict]:
+    """Check that consecutive pages of recommendations make up the fully sorted recommendations.
+
+    Half of the sampled titles are included and half excluded. Low-cardinality feature groups (e.g. format) produce
+    large groups of titles with tied scores, which pages have to cut in the same place as the sorted result.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_size : int
+        The number of sampled titles.
+
+    methods : list[str]
+        Similarity methods to check.
+
+    k : int, default: 20
+        The number of recommendations in a page.
+
+    pages_count : int, default: 20
+        The number of consecutive pages.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling titles.
+
+    Returns
+    -------
+    list[dict]
+        Report row per similarity method with the numbers of paged and distinct titles and whether the pages are the
+        same as the sorted result.
+    """
+    indexes, scores = sample_profile(storage, 2 * list_size, seed)
+    indexes_include, indexes_exclude = indexes[:list_size], indexes[list_size:]
+    scores = scores[:list_size].reshape(-1, 1)
+    matrix = storage.matrix(columns)
+    report = []
+
+    for similarity_method in methods:
+        vector_utility = VectorUtility(SimilarityMethod(similarity_method), Precision('float32'))
+        matrix_method = matrix
+
+        if vector_utility.similarity_method.uses_feature_map:
+            matrix_method = vector_utility.similarity_method.feature_map.transform(matrix)
+
+        if vector_utility.similarity_method.uses_row_norms:
+            vector_utility.row_norms = RBFEngine.row_norms(matrix_method)
+
+        vector_utility.matrix_size = matrix_method.shape[0]
+        vector_utility.accumulate_chunked_results(indexes_include, scores, scores.sum(dtype=np.uint32), matrix_method)
+        pages = [
+            vector_utility.extract_sorted_recommendations(storage, indexes_include, indexes_exclude, k, offset)
+            for offset in range(0, k * pages_count, k)
+        ]
+        paged = np.concatenate([page.indexes for page in pages])
+        full = vector_utility.extract_sorted_recommendations(storage, indexes_include, indexes_exclude)
+
+        report.append(
+            {
+                'method': similarity_method,
+                'paged_titles': paged.shape[0],
+                'distinct_titles': np.unique(paged).shape[0],
+                'same_as_sorted': bool(np.array_equal(paged, full.indexes[: paged.shape[0]])),
+            },
+        )
+
+    log_report('Pages vs sorted recommendations', report)
+    return report
+
+
+def benchmark_ann(  # noqa: WPS211
+    storage: IStorage,
+    columns: list[str],
+    list_sizes: list[int],
+    candidates: list[int],
+    queries_count: int = 100,
+    k: int = 20,
+    seed: int = 0,
+) -> list[dict]:
+    """Measure recall of exact top RBF recommendations of title mode among candidates of the nearest neighbours index.
+
+    Candidates are found by `LowRankCandidates` over reduced features of the storage (`low_rank_variance`). Titles tied
+    with the kth recommendation are counted as exact top recommendations, so a query is missed if any of them is not a
+    candidate.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving the matrix of features.
+
+    columns : list[str]
+        Feature groups to select.
+
+    list_sizes : list[int]
+        The numbers of titles chosen in sampled queries.
+
+    candidates : list[int]
+        The numbers of candidates to benchmark.
+
+    queries_count : int, default: 100
+        The number of sampled queries per list size.
+
+    k : int, default: 20
+        The number of recommendations.
+
+    seed : int, default: 0
+        Seed of the random generator used for sampling queries.
+
+    Returns
+    -------
+    list[dict]
+        Report row per list size and number of candidates with the ranks of the full and reduced matrices, the mean
+        recall, the share of queries with missed recommendations, and mean times of exact scoring of the catalog and of
+        finding and scoring candidates.
+    """
+    matrix = storage.matrix(columns)
+    matrix_reduced = storage.matrix(columns, np.float32, low_rank=True)
+    index = LowRankCandidates(matrix_reduced, RBFEngine.row_norms(matrix_reduced))
+    report = []
+
+    for list_size in list_sizes:
+        queries = [sample_profile(storage, list_size, seed + query)[0] for query in range(queries_count)]
+        exact_top, exact_time = [], 0.0
+
+        for indexes in queries:
+            result_vector, elapsed = score('rbf_kernel', indexes, np.ones(indexes.shape[0], dtype=np.uint8), matrix)
+            kth_score = np.partition(result_vector, result_vector.shape[0] - k)[result_vector.shape[0] - k]
+            exact_top.append(np.flatnonzero(result_vector >= kth_score))
+            exact_time += elapsed
+
+        for n_candidates in candidates:
+            recalls = []
+            time_start = perf_counter()
+
+            for indexes, top in zip(queries, exact_top):
+                ones = np.ones(indexes.shape[0], dtype=np.uint8)
+                query_candidates = index.query(indexes, ones, n_candidates)
+                vector_utility = VectorUtility(SimilarityMethod('rbf_kernel', 'numpy'), Precision('float32'))
+                vector_utility.accumulate_candidates(indexes, ones, ones.sum(dtype=np.uint32), matrix, query_candidates)
+                recalls.append(np.isin(top, query_candidates).mean())
+
+            report.append(
+                {
+                    'list_size': list_size,
+                    'candidates': n_candidates,
+                    'features': matrix.shape[1],
+                    'reduced_features': index.matrix.shape[1],
+                    'recall': float(np.mean(recalls)),
+                    'missed_queries': float(np.mean(np.array(recalls) < 1)),
+                    'exact_time': exact_time / queries_count,
+                    'ann_time': (perf_counter() - time_start) / queries_count,
+                },
+            )
+
+    log_report('Nearest neighbours index vs exact RBF kernel', report)
+    return report
+
+
+def _minmax(vector: NDArray) -> NDArray:
+    """Scale vector to the range of 0 to 1 as recommendations are.
+
+    Parameters
+    ----------
+    vector : NDArray
+        Vector of scores.
+
+    Returns
+    -------
+    NDArray
+        Scaled vector. Constant vectors are scaled to zeros.
+    """
+    vector_range = vector.max() - vector.min()
+    return (vector - vector.min()) / (vector_range or 1)
+
+
+def log_report(title: str, report: list[dict]):
+    """Log benchmark report as a table.
+
+    Parameters
+    ----------
+    title : str
+        Title of the report.
+
+    report : list[dict]
+        Report rows with the same keys.
+    """
+    if not report:
+        return
+
+    header = list(report[0].keys())
+    rows = [
+        ['{value:.4f}'.format(value=value) if isinstance(value, float) else str(value) for value in row.values()]
+        for row in report
+    ]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+
+    lines = [title, '  '.join(name.ljust(width) for name, width in zip(header, widths)).rstrip()]
+    lines.extend('  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+    logger.info('\n'.join(lines))
@@ -0,0 +1,314 @@
+"""Profile centroids module.
+
+Provides the `ProfileCentroids` cache that replaces feature rows of a huge list of user's titles with a bounded number
+of weighted centroids found by mini-batch k-means, so RBF scoring costs centroids x N kernel evaluations instead of
+titles x N. The number of centroids is chosen by the error of scores on a sample of the catalog.
+"""
+
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from typing import final
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+from scipy.sparse import issparse
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics.pairwise import rbf_kernel
+
+
+@final
+class ProfileCentroids(object):
+    """Cache of weighted centroids of feature rows of user's titles for the RBF kernel.
+
+    Since `|x_i - y|^2 = |c - y|^2 + |x_i - c|^2 + 2 (x_i - c)(c - y)` and the last term averages out over titles of a
+    centroid `c`, the sum of `w_i k(x_i, y)` over its titles is approximated by `W k(c, y)` with the weight
+    `W = sum of w_i k(x_i, c)`. Unlike the plain sum of scores, such weights do not overestimate the similarity of the
+    spread titles. Starting with `min_centroids`, the number of centroids is doubled until the largest error of scores
+    on a sample of catalog titles, relative to the range of their exact scores (recommendations are min-max scaled), is
+    at most `tolerance`. If it is not reached with `max_centroids`, the profile is not reduced and scored exactly.
+    Results are cached by the contents of feature rows and scores, so they do not depend on feature groups or the data
+    mart version.
+
+    Attributes
+    ----------
+    max_centroids : int
+        The maximum number of centroids.
+
+    tolerance : float
+        The maximum error of scores of the sample of catalog titles relative to the range of their exact scores.
+
+    max_profiles : int
+        The maximum number of profiles to keep centroids for. The least recently used profiles are evicted first.
+
+    min_titles : int
+        The minimum number of user's titles to reduce. Profiles of at most `max_centroids` titles are never reduced.
+
+    min_centroids : int
+        The initial number of centroids.
+
+    sample_size : int
+        The number of catalog titles the error is measured on.
+
+    gamma : float, optional
+        Coefficient of the RBF kernel. If None, `1 / n_features` is used, the same as in `RBFEngine`.
+
+    seed : int
+        Seed of k-means and of the sample of catalog titles.
+
+    profiles : OrderedDict[str, tuple[NDArray[np.float32], NDArray[np.float64]] | None]
+        Centroids and their weights keyed by fingerprint of the profile. None marks profiles that are not reduced.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the ProfileCentroids class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the ProfileCentroids class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not ProfileCentroids:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(  # noqa: WPS211
+        self,
+        max_centroids: int,
+        tolerance: float,
+        max_profiles: int,
+        min_titles: int = 0,
+        min_centroids: int = 16,
+        sample_size: int = 512,
+        gamma: float | None = None,
+        seed: int = 0,
+    ):
+        """Initialize the cache with the given parameters.
+
+        Parameters
+        ----------
+        max_centroids : int
+            The maximum number of centroids.
+
+        tolerance : float
+            The maximum error of scores of the sample of catalog titles relative to the range of their exact scores.
+
+        max_profiles : int
+            The maximum number of profiles to keep centroids for.
+
+        min_titles : int, default: 0
+            The minimum number of user's titles to reduce.
+
+        min_centroids : int, default: 16
+            The initial number of centroids.
+
+        sample_size : int, default: 512
+            The number of catalog titles the error is measured on.
+
+        gamma : float, optional
+            Coefficient of the RBF kernel. If None, `1 / n_features` is used.
+
+        seed : int, default: 0
+            Seed of k-means and of the sample of catalog titles.
+        """
+        self._max_centroids: int = max_centroids
+        self._tolerance: float = tolerance
+        self._max_profiles: int = max_profiles
+        self._min_titles: int = max(min_titles, max_centroids + 1)
+        self._min_centroids: int = min(min_centroids, max_centroids)
+        self._sample_size: int = sample_size
+        self._gamma: float | None = gamma
+        self._seed: int = seed
+        self._profiles: OrderedDict[str, tuple[NDArray[np.float32], NDArray[np.float64]] | None] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'ProfileCentroids(\n',
+                '  max_centroids={max_centroids},\n',
+                '  tolerance={tolerance},\n',
+                '  profiles={profiles},\n',
+                '  max_profiles={max_profiles})',
+            ],
+        )
+
+        return repr_template.format(
+            max_centroids=self._max_centroids,
+            tolerance=self._tolerance,
+            profiles=len(self._profiles),
+            max_profiles=self._max_profiles,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    def reduce(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+    ) -> tuple[NDArray[np.float32], NDArray[np.float64]] | None:
+        """Get weighted centroids of feature rows of user's titles.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features in the compute data type. Might be a sparse CSR matrix.
+
+        Returns
+        -------
+        tuple[NDArray[np.float32], NDArray[np.float64]], optional
+            Centroids in the data type of the matrix and sums of scores of their titles, or None if the profile is too
+            short or is not reduced within the tolerance.
+        """
+        if indexes_include.shape[0] < self._min_titles:
+            return None
+
+        rows = matrix[np.asarray(indexes_include, dtype=np.intp).reshape(-1)]
+        weights = np.asarray(scores, dtype=np.float64).reshape(-1)
+
+        fingerprint = self._fingerprint(rows, weights)
+
+        with self._lock:
+            if fingerprint in self._profiles:
+                self._profiles.move_to_end(fingerprint)
+                return self._profiles[fingerprint]
+
+        reduced = self._fit(rows, weights, matrix)
+
+        with self._lock:
+            self._profiles[fingerprint] = reduced
+
+            if len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+
+        return reduced
+
+    def _fit(
+        self,
+        rows: NDArray[np.float32],
+        weights: NDArray[np.float64],
+        matrix: NDArray[np.float32],
+    ) -> tuple[NDArray[np.float32], NDArray[np.float64]] | None:
+        """Find the smallest number of centroids within the tolerance.
+
+        Parameters
+        ----------
+        rows : NDArray[np.float32]
+            Feature rows of user's titles.
+
+        weights : NDArray[np.float64]
+            Scores of user's titles.
+
+        matrix : NDArray[np.float32]
+            The matrix of features the error is measured on.
+
+        Returns
+        -------
+        tuple[NDArray[np.float32], NDArray[np.float64]], optional
+            Centroids and their weights or None if the tolerance is not reached.
+        """
+        gamma = self._gamma if self._gamma is not None else 1 / max(matrix.shape[1], 1)
+        generator = np.random.default_rng(self._seed)
+        sample_size = min(self._sample_size, matrix.shape[0])
+        sample = matrix[np.sort(generator.choice(matrix.shape[0], sample_size, replace=False))]
+        exact = weights @ rbf_kernel(rows, sample, gamma=gamma)
+        exact_range = max(float(exact.max() - exact.min()), np.finfo(np.float32).eps * float(exact.max()))
+        centroids_count = self._min_centroids
+        error = np.inf
+
+        while True:  # noqa: WPS457
+            kmeans = MiniBatchKMeans(n_clusters=centroids_count, random_state=self._seed, n_init=1)
+            distances = kmeans.fit_transform(rows, sample_weight=weights)
+            labels = np.argmin(distances, axis=1)
+            spread = np.exp(-gamma * distances[np.arange(labels.shape[0]), labels] ** 2)
+            centroids_weights = np.bincount(labels, weights=weights * spread, minlength=centroids_count)
+            is_used = np.bincount(labels, minlength=centroids_count) > 0
+            centroids = kmeans.cluster_centers_[is_used].astype(matrix.dtype)
+            centroids_weights = centroids_weights[is_used]
+
+            approximate = centroids_weights @ rbf_kernel(centroids, sample, gamma=gamma)
+            error = float(np.abs(approximate - exact).max()) / exact_range
+
+            if error <= self._tolerance:
+                logger.info(
+                    'Reduced {titles} titles to {centroids} centroids with error {error:.2e}.'.format(
+                        titles=rows.shape[0],
+                        centroids=centroids.shape[0],
+                        error=error,
+                    ),
+                )
+                return centroids, centroids_weights
+
+            if centroids_count >= self._max_centroids:
+                break
+
+            centroids_count = min(centroids_count * 2, self._max_centroids)
+
+        logger.info(
+            'Titles {titles} are scored exactly, error of {max_centroids} centroids {error:.2e}.'.format(
+                titles=rows.shape[0],
+                max_centroids=self._max_centroids,
+                error=error,
+            ),
+        )
+        return None
+
+    @staticmethod
+    def _fingerprint(rows: NDArray[np.float32], weights: NDArray[np.float64]) -> str:
+        """Calculate a fingerprint of feature rows and scores of user's titles.
+
+        Parameters
+        ----------
+        rows : NDArray[np.float32]
+            Feature rows of user's titles. Might be a sparse CSR matrix.
+
+        weights : NDArray[np.float64]
+            Scores of user's titles.
+
+        Returns
+        -------
+        str
+            Hex digest of rows and scores.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str((rows.shape, rows.dtype.str)).encode())
+
+        if issparse(rows):
+            rows = rows.tocsr()
+            digest.update(rows.indptr.tobytes())
+            digest.update(rows.indices.tobytes())
+            digest.update(rows.data.tobytes())
+        else:
+            digest.update(np.ascontiguousarray(rows).tobytes())
+
+        digest.update(weights.tobytes())
+        return digest.hexdigest()
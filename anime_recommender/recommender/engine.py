@@ -0,0 +1,314 @@
+"""Recommendation engine module.
+
+Provides the long-lived `RecommendationEngine` that owns catalog-side artifacts (`Catalog`) and caches shared between
+requests, and serves concurrent requests. Per-request state (user's titles, scores and the result vector) lives in a
+`Recommender` and a `VectorUtility` created for every request, so the engine itself is never mutated by scoring.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, final
+
+from anime_recommender.client import IClient
+from anime_recommender.config import config
+from anime_recommender.recommender.centroids import ProfileCentroids
+from anime_recommender.recommender.recommender import (
+    Catalog,
+    GroupScores,
+    KernelScores,
+    Precision,
+    Recommender,
+    RecommenderConfig,
+    ResultCache,
+    SimilarityMethod,
+    TitleScores,
+    VectorUtility,
+)
+from anime_recommender.recommender.result import RecommendationResult
+from anime_recommender.recommender.shards import ShardedCatalog
+from anime_recommender.storage.IStorage import IStorage
+
+
+@final
+class RecommendationEngine(object):
+    """Thread-safe recommendation engine shared by requests of the process.
+
+    Catalogs are built once per combination of feature groups, similarity method, precision and representation (full or
+    low-rank matrix of features) and reused by all requests until the storage snapshot changes. Catalogs of different
+    combinations are built concurrently. Requests for the same new combination arriving at once may each create its
+    catalog, but artifacts are cached by the storage, which builds every artifact once while the other requests wait
+    for it, and the first created catalog is kept. Every request pins the currently loaded version of the data mart
+    once (`IStorage.pin`) and reads only that version, so a reload of the data mart in the middle of a request does not
+    mix versions.
+
+    Attributes
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving matrices of features and titles' information.
+
+    group_scores : GroupScores, optional
+        Cache of per-feature-group partial score vectors shared between requests.
+
+    title_scores : TitleScores, optional
+        Accumulators of similarity rows of titles kept between requests in title mode per session.
+
+    result_cache : ResultCache, optional
+        Cache of recommendations shared between requests.
+
+    profile_centroids : ProfileCentroids, optional
+        Cache of weighted centroids of huge lists shared between requests.
+
+    kernel_scores : KernelScores, optional
+        Cache of recommendation vectors of similarity methods sharing a pass over the catalog, so switching between
+        RBF and linear kernels for the same lists does not rescore the catalog.
+
+    shards : ShardedCatalog, optional
+        Catalog scored by shards of titles in worker processes or on other hosts. Pages of recommendations are merged
+        from top-k lists of shards.
+
+    max_catalogs : int
+        The maximum number of catalogs to keep. The least recently used catalogs are evicted first.
+
+    catalogs : OrderedDict[tuple, Catalog]
+        Catalogs keyed by `Catalog.key`.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the RecommendationEngine class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the RecommendationEngine class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not RecommendationEngine:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(  # noqa: WPS211
+        self,
+        storage: IStorage,
+        group_scores: GroupScores | None = None,
+        title_scores: TitleScores | None = None,
+        result_cache: ResultCache | None = None,
+        profile_centroids: ProfileCentroids | None = None,
+        max_catalogs: int | None = None,
+        kernel_scores: KernelScores | None = None,
+        shards: ShardedCatalog | None = None,
+    ):
+        """Initialize the engine with the given parameters.
+
+        Parameters
+        ----------
+        storage : IStorage
+            IStorage interface implementation.
+
+        group_scores : GroupScores, optional
+            Cache of per-feature-group partial score vectors.
+
+        title_scores : TitleScores, optional
+            Accumulators of similarity rows of titles kept between requests in title mode per session.
+
+        result_cache : ResultCache, optional
+            Cache of recommendations.
+
+        profile_centroids : ProfileCentroids, optional
+            Cache of weighted centroids of huge lists.
+
+        max_catalogs : int, optional
+            The maximum number of catalogs to keep. If None, `config.engine_catalogs` is used.
+
+        kernel_scores : KernelScores, optional
+            Cache of recommendation vectors of similarity methods sharing a pass over the catalog.
+
+        shards : ShardedCatalog, optional
+            Catalog scored by shards of titles.
+        """
+        self._storage: IStorage = storage
+        self._group_scores: GroupScores | None = group_scores
+        self._title_scores: TitleScores | None = title_scores
+        self._result_cache: ResultCache | None = result_cache
+        self._profile_centroids: ProfileCentroids | None = profile_centroids
+        self._max_catalogs: int = max_catalogs if max_catalogs is not None else config.engine_catalogs
+        self._kernel_scores: KernelScores | None = kernel_scores
+        self._shards: ShardedCatalog | None = shards
+        self._catalogs: OrderedDict[tuple, Catalog] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'RecommendationEngine(\n',
+                '  catalogs={catalogs},\n',
+                '  max_catalogs={max_catalogs},\n',
+                '  shards={shards},\n',
+                '  storage={storage})',
+            ],
+        )
+
+        return repr_template.format(
+            catalogs=len(self._catalogs),
+            max_catalogs=self._max_catalogs,
+            shards=self._shards,
+            storage=self._storage,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def storage(self) -> IStorage:
+        """Return the storage instance of the engine.
+
+        Returns
+        -------
+        IStorage
+            IStorage interface implementation.
+        """
+        return self._storage
+
+    def catalog(
+        self,
+        columns: list[str],
+        similarity_method: SimilarityMethod,
+        precision: Precision,
+        low_rank: bool = False,
+        storage: IStorage | None = None,
+    ) -> Catalog:
+        """Get catalog-side artifacts of the combination, building them on first use.
+
+        Parameters
+        ----------
+        columns : list[str]
+            Feature groups to include in the calculation.
+
+        similarity_method : SimilarityMethod
+            The similarity method to use.
+
+        precision : Precision
+            Numeric precision of calculations.
+
+        low_rank : bool, default: False
+            Whether to build the catalog from the matrix of reduced features.
+
+        storage : IStorage, optional
+            Storage pinned to the version of the data mart of the request (see `IStorage.pin`). If None, the currently
+            loaded version of the storage of the engine is pinned.
+
+        Returns
+        -------
+        Catalog
+            Shared catalog of the combination built from the version of the data mart of the storage.
+        """
+        storage = storage if storage is not None else self._storage.pin()
+        key = Catalog.key(columns, similarity_method, precision, low_rank)
+        snapshot = storage.snapshot
+
+        with self._lock:
+            catalog = self._catalogs.get(key)
+
+            if catalog is not None and catalog.snapshot == snapshot:
+                self._catalogs.move_to_end(key)
+                return catalog
+
+        catalog = Catalog(storage, columns, similarity_method, precision, low_rank)
+
+        with self._lock:
+            if any(cached.snapshot != snapshot for cached in self._catalogs.values()):
+                self._catalogs.clear()
+
+            catalog = self._catalogs.setdefault(key, catalog)
+            self._catalogs.move_to_end(key)
+
+            while len(self._catalogs) > self._max_catalogs:
+                self._catalogs.popitem(last=False)
+
+            return catalog
+
+    def recommend(  # noqa: WPS211
+        self,
+        client: IClient,
+        recommender_config: RecommenderConfig,
+        similarity_method: SimilarityMethod,
+        k: int | None = None,
+        offset: int = 0,
+        precision: Precision | None = None,
+        session: Hashable | None = None,
+        storage: IStorage | None = None,
+    ) -> RecommendationResult:
+        """Generate recommendations for a single request.
+
+        Parameters
+        ----------
+        client : IClient
+            IClient interface implementation providing user's lists of the request.
+
+        recommender_config : RecommenderConfig
+            Recommender configuration of the request.
+
+        similarity_method : SimilarityMethod
+            The similarity method to use.
+
+        k : int, optional
+            The number of recommendations to return. If None, all titles are returned.
+
+        offset : int, default: 0
+            The number of top recommendations to skip. Used for paging together with `k`.
+
+        precision : Precision, optional
+            Numeric precision of calculations. If None, `config.precision` is used.
+
+        session : Hashable, optional
+            Identifier of the session keying the accumulator of similarity rows of titles in title mode. If None, the
+            client is used.
+
+        storage : IStorage, optional
+            Storage pinned to the version of the data mart the request should read (see `IStorage.pin`), e.g. to join
+            titles' information of the same version to recommendations. If None, the currently loaded version of the
+            storage of the engine is pinned.
+
+        Returns
+        -------
+        RecommendationResult
+            Recommended titles with their scores.
+        """
+        precision = precision if precision is not None else Precision(config.precision)
+        storage = storage.pin() if storage is not None else self._storage.pin()
+        recommender = Recommender(
+            client,
+            storage,
+            recommender_config,
+            VectorUtility(similarity_method, precision),
+            self._group_scores,
+            self._title_scores,
+            self._result_cache,
+            self.catalog(
+                recommender_config.columns, similarity_method, precision, recommender_config.low_rank, storage
+            ),
+            self._profile_centroids,
+            self._kernel_scores,
+            self._shards,
+            session,
+        )
+
+        return recommender.recommend(k, offset)
@@ -0,0 +1,279 @@
+"""Kernels module.
+
+Provides the optional `NumbaBackend` of `SimilarityMethod` that scores the catalog with compiled fused kernels. Every
+kernel computes dot products (or distances), the kernel function, score weighting and the column reduction in one
+parallel pass over rows of the catalog, so no chunk x N matrix is materialised. Numba is an optional dependency: if it
+is not installed, the backend is unavailable and the NumPy path of `VectorUtility` is used.
+"""
+
+from typing import Callable, final
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.sparse import issparse
+
+try:
+    import numba
+except ImportError:  # pragma: no cover
+    numba = None
+
+prange = numba.prange if numba is not None else range
+
+
+def _linear_dense(rows, weights, matrix, out):
+    """Score dense matrix with the linear kernel. The weighted sum of rows (profile vector) is built first."""
+    profile = np.zeros(matrix.shape[1], dtype=np.float64)
+
+    for row in range(rows.shape[0]):
+        for feature in range(rows.shape[1]):
+            profile[feature] += weights[row] * rows[row, feature]
+
+    for title in prange(matrix.shape[0]):
+        total = 0.0
+
+        for feature in range(matrix.shape[1]):
+            total += matrix[title, feature] * profile[feature]
+
+        out[title] = total
+
+
+def _linear_sparse(rows, weights, data, indices, indptr, out):
+    """Score CSR matrix with the linear kernel. The weighted sum of rows (profile vector) is built first."""
+    profile = np.zeros(rows.shape[1], dtype=np.float64)
+
+    for row in range(rows.shape[0]):
+        for feature in range(rows.shape[1]):
+            profile[feature] += weights[row] * rows[row, feature]
+
+    for title in prange(out.shape[0]):
+        total = 0.0
+
+        for position in range(indptr[title], indptr[title + 1]):
+            total += data[position] * profile[indices[position]]
+
+        out[title] = total
+
+
+def _rbf_dense(rows, weights, matrix, gamma, out):
+    """Score dense matrix with the RBF kernel. Squared distances are summed from differences of features."""
+    for title in prange(matrix.shape[0]):
+        total = 0.0
+
+        for row in range(rows.shape[0]):
+            distance = 0.0
+
+            for feature in range(matrix.shape[1]):
+                difference = rows[row, feature] - matrix[title, feature]
+                distance += difference * difference
+
+            total += weights[row] * np.exp(-gamma * distance)
+
+        out[title] = total
+
+
+def _rbf_sparse(rows, rows_norms, weights, data, indices, indptr, row_norms, gamma, out):
+    """Score CSR matrix with the RBF kernel. Squared distances are expanded as `|x|^2 + |y|^2 - 2 x y`."""
+    for title in prange(out.shape[0]):
+        total = 0.0
+
+        for row in range(rows.shape[0]):
+            dot = 0.0
+
+            for position in range(indptr[title], indptr[title + 1]):
+                dot += data[position] * rows[row, indices[position]]
+
+            distance = max(rows_norms[row] + row_norms[title] - 2 * dot, 0.0)
+            total += weights[row] * np.exp(-gamma * distance)
+
+        out[title] = total
+
+
+@final
+class NumbaBackend(object):
+    """Kernel backend scoring the catalog with Numba-compiled fused kernels.
+
+    Kernels are compiled on first use per data type of the matrix and cached on disk. Every title of the catalog is
+    scored by one thread of the Numba thread pool (its size is controlled by `NUMBA_NUM_THREADS`) against all titles of
+    the user at once, and sums are accumulated in float64. Linear methods and methods using a feature map are scored
+    with the linear kernel (the matrix is expected to be already mapped), `rbf_kernel` with the RBF kernel.
+
+    Attributes
+    ----------
+    name : str
+        Name of the backend.
+
+    linear_methods : frozenset[str]
+        Names of similarity methods scored with the fused linear kernel.
+
+    rbf_methods : frozenset[str]
+        Names of similarity methods scored with the fused RBF kernel.
+    """
+
+    name: str = 'numba'
+    linear_methods: frozenset[str] = frozenset(['linear_kernel', 'rbf_kernel_rff', 'cosine'])
+    rbf_methods: frozenset[str] = frozenset(['rbf_kernel'])
+
+    _kernels: dict[str, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the NumbaBackend class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the NumbaBackend class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not NumbaBackend:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(self):
+        """Initialize the backend.
+
+        Raises
+        ------
+        ImportError
+            If Numba is not installed.
+        """
+        if not self.is_available():
+            raise ImportError('Numba is required for the {name} kernel backend.'.format(name=self.name))
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return 'NumbaBackend(threads={threads})'.format(threads=numba.get_num_threads())
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @staticmethod
+    def is_available() -> bool:
+        """Return whether Numba is installed.
+
+        Returns
+        -------
+        bool
+            True if the backend can be used, False otherwise.
+        """
+        return numba is not None
+
+    def supports(self, similarity_method: str) -> bool:
+        """Return whether the similarity method has a fused kernel.
+
+        Parameters
+        ----------
+        similarity_method : str
+            Name of the similarity method.
+
+        Returns
+        -------
+        bool
+            True if the similarity method is scored by the backend, False otherwise.
+        """
+        return similarity_method in self.linear_methods or similarity_method in self.rbf_methods
+
+    def score(
+        self,
+        similarity_method: str,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+        row_norms: NDArray[np.float32] | None = None,
+        gamma: float | None = None,
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised sum of weighted similarity rows of user's titles in one pass over the catalog.
+
+        Parameters
+        ----------
+        similarity_method : str
+            Name of the similarity method, one of `linear_methods` or `rbf_methods`.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features in the compute data type. Might be a sparse CSR matrix.
+
+        row_norms : NDArray[np.float32], optional
+            Squared norms of rows of the matrix of features. Used by the RBF kernel for sparse matrices only and
+            calculated if None.
+
+        gamma : float, optional
+            Coefficient of the RBF kernel. If None, `1 / n_features` is used, the same as in `sklearn`.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Vector of recommendations in the data type of the matrix.
+        """
+        dtype = np.promote_types(matrix.dtype, np.float32)
+        indexes_include = np.asarray(indexes_include, dtype=np.intp).reshape(-1)
+        weights = np.asarray(scores, dtype=np.float64).reshape(-1)
+        out = np.empty((matrix.shape[0],), dtype=dtype)
+        gamma = gamma if gamma is not None else 1 / max(matrix.shape[1], 1)
+
+        if issparse(matrix):
+            matrix = matrix.tocsr()
+            rows = np.ascontiguousarray(matrix[indexes_include].toarray(), dtype=dtype)
+            sparse_arrays = (matrix.data.astype(dtype, copy=False), matrix.indices, matrix.indptr)
+
+            if similarity_method in self.linear_methods:
+                self._kernel(_linear_sparse)(rows, weights, *sparse_arrays, out)
+                return out
+
+            row_norms = row_norms if row_norms is not None else np.asarray(matrix.multiply(matrix).sum(axis=1))
+            row_norms = np.asarray(row_norms, dtype=np.float64).reshape(-1)
+            rows_norms = row_norms[indexes_include]
+            self._kernel(_rbf_sparse)(rows, rows_norms, weights, *sparse_arrays, row_norms, gamma, out)
+            return out
+
+        matrix = np.ascontiguousarray(matrix, dtype=dtype)
+        rows = np.take(matrix, indexes_include, axis=0)
+
+        if similarity_method in self.linear_methods:
+            self._kernel(_linear_dense)(rows, weights, matrix, out)
+        else:
+            self._kernel(_rbf_dense)(rows, weights, matrix, gamma, out)
+
+        return out
+
+    def _kernel(self, function: Callable) -> Callable:
+        """Compile the kernel function once per process.
+
+        Parameters
+        ----------
+        function : Callable
+            Python implementation of the kernel.
+
+        Returns
+        -------
+        Callable
+            Compiled parallel kernel.
+        """
+        name = function.__name__
+
+        if name not in self._kernels:
+            self._kernels[name] = numba.njit(parallel=True, fastmath=True, cache=True)(function)
+
+        return self._kernels[name]
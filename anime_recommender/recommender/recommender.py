@@ -5,19 +5,38 @@ individual titles. The main component of this module is the `Recommender` class
 various similarity metrics, user lists, and anime features.
 """
 
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial
 from inspect import getattr_static
-from typing import Callable, final
+from math import ceil
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, Callable, Hashable, final
 
 import numpy as np
 from attr import dataclass
+from loguru import logger
 from numpy.typing import NDArray
-from sklearn.metrics.pairwise import linear_kernel, rbf_kernel
+from scipy.sparse import csr_matrix, issparse
+from sklearn.metrics.pairwise import cosine_similarity, linear_kernel, rbf_kernel
 from sklearn.preprocessing import minmax_scale
 
 from anime_recommender.client import IClient
 from anime_recommender.config import config
+from anime_recommender.recommender.ann import LowRankCandidates
+from anime_recommender.recommender.centroids import ProfileCentroids
+from anime_recommender.recommender.kernels import NumbaBackend
 from anime_recommender.recommender.recommender_interface import IRecommender, IVectorUtility
-from anime_recommender.storage import IStorage
+from anime_recommender.recommender.result import RecommendationResult
+from anime_recommender.recommender.topk import BlockTopK
+from anime_recommender.recommender.unique import UniqueRows
+from anime_recommender.recommender.workspace import Workspace, worker_pool
+from anime_recommender.storage.IStorage import IStorage
+
+if TYPE_CHECKING:
+    from anime_recommender.recommender.shards import ShardedCatalog
 
 
 class SimilarityMethod(object):
@@ -30,20 +49,76 @@ class SimilarityMethod(object):
 
     rbf_kernel : Callable[[NDArray, NDArray], NDArray]
         Radial basis function kernel function.
+
+    rbf_kernel_rff : Callable[[NDArray, NDArray], NDArray]
+        Radial basis function kernel function approximated with random Fourier features during scoring.
+
+    cosine : Callable[[NDArray, NDArray], NDArray]
+        Cosine similarity function. Scored as the linear kernel of the L2-normalised matrix of features.
+
+    linear_methods : frozenset[str]
+        Names of similarity methods that are linear in their first argument. For such methods the weighted sum of
+        similarity rows equals the similarity with the weighted sum of feature rows, so the whole user's list collapses
+        into a single profile vector.
+
+    row_norms_methods : frozenset[str]
+        Names of similarity methods scored by `RBFEngine` from precomputed squared row norms of the matrix of features.
+
+    feature_map_methods : frozenset[str]
+        Names of similarity methods that are linear in a mapped feature space. The matrix of features is mapped once
+        per combination of feature groups (see `feature_map`) and then scored the same way as linear methods, through a
+        single profile vector.
+
+    backends : frozenset[str]
+        Names of kernel backends. `numpy` scores through `sklearn` kernels, `RBFEngine` and BLAS products, `numba`
+        through fused compiled kernels of `NumbaBackend` (requires Numba installed).
+
+    backend : str
+        Name of the kernel backend in use. Falls back to `numpy` if Numba is not installed.
     """
 
     linear_kernel = linear_kernel
     rbf_kernel = rbf_kernel
+    rbf_kernel_rff = rbf_kernel
+    cosine = cosine_similarity
 
-    def __init__(self, similarity_method: str):
+    linear_methods: frozenset[str] = frozenset(['linear_kernel'])
+    row_norms_methods: frozenset[str] = frozenset(['rbf_kernel'])
+    feature_map_methods: frozenset[str] = frozenset(['rbf_kernel_rff', 'cosine'])
+    backends: frozenset[str] = frozenset(['numpy', 'numba'])
+
+    def __init__(self, similarity_method: str, backend: str | None = None):
         """Initialize the similarity method class with the given parameters.
 
         Parameters
         ----------
         similarity_method : str
             The similarity method to use for calculating the recommendation vector.
+
+        backend : str, optional
+            The kernel backend, one of `backends`. If None, `config.kernel_backend` is used.
+
+        Raises
+        ------
+        ValueError
+            If the kernel backend is unknown.
         """
+        backend = backend if backend is not None else config.kernel_backend
+
+        if backend not in self.backends:
+            raise ValueError(
+                'Unknown kernel backend {backend}, expected one of {backends}.'.format(
+                    backend=backend,
+                    backends=sorted(self.backends),
+                ),
+            )
+
+        if backend == NumbaBackend.name and not NumbaBackend.is_available():
+            logger.warning('Numba is not installed, falling back to numpy kernel backend.')
+            backend = 'numpy'
+
         self._similarity_method = similarity_method
+        self._backend: str = backend
 
     @property
     def similarity_method(self) -> Callable:
@@ -56,6 +131,94 @@ class SimilarityMethod(object):
         """
         return getattr_static(self, self._similarity_method)
 
+    @property
+    def name(self) -> str:
+        """Return the name of the similarity method.
+
+        Returns
+        -------
+        str
+            The name of the similarity method.
+        """
+        return self._similarity_method
+
+    @property
+    def backend(self) -> str:
+        """Return the name of the kernel backend.
+
+        Returns
+        -------
+        str
+            The name of the kernel backend in use.
+        """
+        return self._backend
+
+    @property
+    def kernel_backend(self) -> NumbaBackend | None:
+        """Return the fused kernel backend scoring the similarity method.
+
+        Returns
+        -------
+        NumbaBackend, optional
+            The backend or None if the similarity method is scored by the NumPy path.
+        """
+        if self._backend != NumbaBackend.name:
+            return None
+
+        kernel_backend = NumbaBackend()
+
+        return kernel_backend if kernel_backend.supports(self._similarity_method) else None
+
+    @property
+    def is_linear(self) -> bool:
+        """Return whether the similarity method is linear in its first argument.
+
+        Returns
+        -------
+        bool
+            True if the recommendation vector can be computed from a single profile vector, False otherwise.
+        """
+        return self._similarity_method in self.linear_methods
+
+    @property
+    def uses_row_norms(self) -> bool:
+        """Return whether the similarity method is scored from precomputed squared row norms.
+
+        Returns
+        -------
+        bool
+            True if the similarity method is scored by `RBFEngine`, False otherwise.
+        """
+        return self._similarity_method in self.row_norms_methods
+
+    @property
+    def uses_feature_map(self) -> bool:
+        """Return whether the similarity method is linear in a mapped feature space.
+
+        Returns
+        -------
+        bool
+            True if the matrix of features should be mapped before scoring it through a profile vector, False otherwise.
+        """
+        return self._similarity_method in self.feature_map_methods
+
+    @property
+    def feature_map(self) -> 'RandomFourierFeatures | RowNormalizer | None':
+        """Return the map of the matrix of features for similarity methods that are linear in a mapped feature space.
+
+        Returns
+        -------
+        RandomFourierFeatures | RowNormalizer, optional
+            The feature map or None if the similarity method does not use one.
+        """
+        if self._similarity_method == 'rbf_kernel_rff':
+            return RandomFourierFeatures(config.rff_components)
+
+        if self._similarity_method == 'cosine':
+            return RowNormalizer()
+
+        return None
+
     def __repr__(self) -> str:
         """Return the string representation of the class.
 
@@ -67,12 +230,14 @@ class SimilarityMethod(object):
         repr_template = ''.join(
             [
                 'SimilarityMethod(\n',
-                '  similarity_method={similarity_method})',
+                '  similarity_method={similarity_method},\n',
+                '  backend={backend})',
             ],
         )
 
         return repr_template.format(
             similarity_method=self._similarity_method,
+            backend=self._backend,
         )
 
     def __str__(self) -> str:
@@ -86,6 +251,131 @@ class SimilarityMethod(object):
         return self.__repr__()
 
 
+@final
+class Precision(object):
+    """Numeric precision of the matrix of features and similarity calculations.
+
+    Attributes
+    ----------
+    modes : dict[str, tuple[type, type]]
+        Storage and compute data types per precision mode. In the `float16` mode the matrix of features is stored in
+        float16 (half the memory of float32), but converted to float32 for calculations and accumulation, since float16
+        arithmetic is emulated and slow on most CPUs and float16 accumulators reorder titles with close scores.
+
+    precision : str
+        The precision mode, one of `modes` keys.
+    """
+
+    modes: dict[str, tuple[type, type]] = {  # noqa: WPS407
+        'float16': (np.float16, np.float32),
+        'float32': (np.float32, np.float32),
+        'float64': (np.float64, np.float64),
+    }
+
+    def __init__(self, precision: str):
+        """Initialize the precision class with the given parameters.
+
+        Parameters
+        ----------
+        precision : str
+            The precision mode, one of `float16`, `float32` or `float64`.
+
+        Raises
+        ------
+        ValueError
+            If the precision mode is unknown.
+        """
+        if precision not in self.modes:
+            raise ValueError(
+                'Unknown precision {precision}, expected one of {modes}.'.format(
+                    precision=precision,
+                    modes=list(self.modes),
+                ),
+            )
+
+        self._precision: str = precision
+
+    @property
+    def name(self) -> str:
+        """Return the name of the precision mode.
+
+        Returns
+        -------
+        str
+            The name of the precision mode.
+        """
+        return self._precision
+
+    @property
+    def storage_dtype(self) -> np.dtype:
+        """Return the data type of the matrix of features.
+
+        Returns
+        -------
+        np.dtype
+            The data type the matrix of features is stored in.
+        """
+        return np.dtype(self.modes[self._precision][0])
+
+    @property
+    def compute_dtype(self) -> np.dtype:
+        """Return the data type of similarity calculations and accumulated results.
+
+        Returns
+        -------
+        np.dtype
+            The data type of calculations.
+        """
+        return np.dtype(self.modes[self._precision][1])
+
+    def compute(self, matrix: NDArray, workspace: Workspace | None = None) -> NDArray:
+        """Convert the matrix to the compute data type. Matrices already in the compute data type are not copied.
+
+        Parameters
+        ----------
+        matrix : NDArray
+            Dense array or scipy sparse matrix.
+
+        workspace : Workspace, optional
+            Workspace providing the buffer for the converted dense matrix. If None, a new array is allocated.
+
+        Returns
+        -------
+        NDArray
+            The matrix in the compute data type.
+        """
+        if matrix.dtype == self.compute_dtype:
+            return matrix
+
+        if workspace is None or issparse(matrix):
+            return matrix.astype(self.compute_dtype)
+
+        converted = workspace.buffer('compute_matrix', matrix.shape, self.compute_dtype)
+        np.copyto(converted, matrix)
+
+        return converted
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return 'Precision(precision={precision})'.format(precision=self._precision)
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+
 @dataclass
 class RecommenderConfig(object):
     """Recommender configuration class.
@@ -115,6 +405,14 @@ class RecommenderConfig(object):
 
     titles : list[str], optional
         List of titles to include in the calculation.
+
+    column_weights : dict[str, float], optional
+        Weights of feature groups from `columns`. Groups missing from the dictionary have the weight of 1. Applied to
+        linear similarity methods scored with `GroupScores` or `BlockTopK`.
+
+    low_rank : bool
+        Whether to score titles in the reduced space of truncated SVD factors of feature groups (`LowRankFactors`)
+        instead of the full matrix of features.
     """
 
     columns: list[str]
@@ -125,6 +423,8 @@ class RecommenderConfig(object):
     scale_range: tuple[float, float] = (1, 10)
     is_titles: bool = False
     titles: list[str] | None = None
+    column_weights: dict[str, float] | None = None
+    low_rank: bool = False
 
     def __repr__(self) -> str:
         """Return the string representation of the class.
@@ -144,7 +444,9 @@ class RecommenderConfig(object):
                 '  scaled={scaled},\n',
                 '  scale_range={scale_range},\n',
                 '  is_titles={is_titles},\n',
-                '  titles={titles})',
+                '  titles={titles},\n',
+                '  column_weights={column_weights},\n',
+                '  low_rank={low_rank})',
             ],
         )
 
@@ -157,46 +459,2293 @@ class RecommenderConfig(object):
             scale_range=self.scale_range,
             is_titles=self.is_titles,
             titles=self.titles,
+            column_weights=self.column_weights,
+            low_rank=self.low_rank,
         )
 
     def __str__(self) -> str:
         """Return the string representation of the class.
 
-        Returns
-        -------
-        str
-            The string representation of the class.
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+
+@final
+class RBFEngine(object):
+    """Radial basis function kernel scoring engine working in the data type of the matrix of features.
+
+    The squared euclidean distance between rows is expanded as `|x|^2 + |y|^2 - 2 x y`, where squared row norms of the
+    catalog are precomputed once per combination of feature groups (see `row_norms`). For every chunk of user's titles
+    the dot products, the kernel function, score weighting and column sum are evaluated in place in `Workspace` buffers
+    reused across chunks and requests, so no chunk x N temporaries are allocated per chunk. Sparse CSR matrices of
+    features are supported through sparse-dense products. The weighted sum of the same dot products is the linear
+    kernel score, so it can be emitted by the same pass (see `accumulate`).
+
+    Attributes
+    ----------
+    gamma : float, optional
+        Coefficient of the RBF kernel. If None, `1 / n_features` is used, the same as in `sklearn`.
+    """
+
+    def __init__(self, gamma: float | None = None):
+        """Initialize the engine with the given parameters.
+
+        Parameters
+        ----------
+        gamma : float, optional
+            Coefficient of the RBF kernel. If None, `1 / n_features` is used.
+        """
+        self._gamma: float | None = gamma
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return 'RBFEngine(gamma={gamma})'.format(gamma=self._gamma)
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @staticmethod
+    def row_norms(matrix: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Calculate squared euclidean norms of matrix rows.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features. Might be a sparse CSR matrix.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Squared norm of every row of the matrix, in float64 for float64 matrices and in float32 otherwise.
+        """
+        dtype = np.promote_types(matrix.dtype, np.float32)
+
+        if issparse(matrix):
+            return np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=dtype).reshape(-1)
+
+        return np.einsum('ij,ij->i', matrix, matrix, dtype=dtype)
+
+    def accumulate(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+        row_norms: NDArray[np.float32],
+        chunk_size: int,
+        workers: int = 1,
+        rows: NDArray[np.float32] | None = None,
+        linear_vector: NDArray[np.float32] | None = None,
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised sum of weighted RBF similarity rows of user's titles.
+
+        With more than one worker, chunks are scored in waves of `workers` chunks on the shared thread pool (NumPy and
+        BLAS release the GIL), every thread using buffers of its own `Workspace`. Chunk vectors are summed in the order
+        of chunks, so the result does not depend on the number of workers.
+
+        If `rows` are given, `indexes_include` refer to them instead of the matrix, e.g. to score centroids of user's
+        titles found by `ProfileCentroids`.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features in float32 or float64. Calculations are performed in the same data type.
+
+        row_norms : NDArray[np.float32]
+            Squared norms of rows of the matrix of features.
+
+        chunk_size : int
+            The number of user's titles processed at once.
+
+        workers : int, default: 1
+            The number of threads scoring chunks.
+
+        rows : NDArray[np.float32], optional
+            Dense feature rows scored against the matrix. If None, rows of the matrix itself are scored.
+
+        linear_vector : NDArray[np.float32], optional
+            Vector in the data type of the matrix the unnormalised sum of weighted linear similarity rows is added to.
+            It is calculated from the dot products of the chunks before the kernel function is applied, so the linear
+            kernel costs a single product of scores and dot products per chunk instead of a separate pass.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Vector of recommendations.
+        """
+        dtype = matrix.dtype
+        gamma = dtype.type(self._gamma if self._gamma is not None else 1 / max(matrix.shape[1], 1))
+        scores = scores.reshape(-1).astype(dtype)
+        row_norms = row_norms.astype(dtype, copy=False)
+        rows = rows.astype(dtype, copy=False) if rows is not None else matrix
+        rows_norms = self.row_norms(rows) if rows is not matrix else row_norms
+        chunk_size = min(chunk_size, indexes_include.shape[0])
+        range_starts = range(0, indexes_include.shape[0], chunk_size)
+        wave_size = workers if workers > 1 and len(range_starts) > 1 else 1
+        chunk_vectors = Workspace.current().buffer('chunk_vectors', (wave_size, matrix.shape[0]), dtype)
+        linear_vectors = None
+
+        if linear_vector is not None:
+            linear_vectors = Workspace.current().buffer('linear_vectors', (wave_size, matrix.shape[0]), dtype)
+
+        def score_chunk(slot: int, range_start: int):  # noqa: WPS430
+            self._score_chunk(
+                indexes_include[range_start : range_start + chunk_size],
+                scores[range_start : range_start + chunk_size],
+                matrix,
+                row_norms,
+                rows,
+                rows_norms,
+                gamma,
+                Workspace.current(),
+                chunk_vectors[slot],
+                linear_vectors[slot] if linear_vectors is not None else None,
+            )
+
+        result_vector = np.zeros((matrix.shape[0],), dtype=dtype)
+
+        for wave_start in range(0, len(range_starts), wave_size):
+            wave = range_starts[wave_start : wave_start + wave_size]
+
+            if wave_size > 1:
+                list(worker_pool(workers).map(score_chunk, range(len(wave)), wave))
+            else:
+                score_chunk(0, wave[0])
+
+            for slot in range(len(wave)):
+                result_vector += chunk_vectors[slot]
+
+                if linear_vectors is not None:
+                    linear_vector += linear_vectors[slot]
+
+        return result_vector
+
+    @staticmethod
+    def _score_chunk(  # noqa: WPS211
+        indexes_chunk: NDArray[np.uint32],
+        scores_chunk: NDArray[np.float32],
+        matrix: NDArray[np.float32],
+        row_norms: NDArray[np.float32],
+        rows: NDArray[np.float32],
+        rows_norms: NDArray[np.float32],
+        gamma: np.float32,
+        workspace: Workspace,
+        out: NDArray[np.float32],
+        linear_out: NDArray[np.float32] | None = None,
+    ):
+        """Calculate weighted sum of RBF similarity rows for a chunk of user's titles.
+
+        Parameters
+        ----------
+        indexes_chunk : NDArray[np.uint32]
+            The indexes of the titles in the chunk.
+
+        scores_chunk : NDArray[np.float32]
+            The scores of the titles in the chunk.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        row_norms : NDArray[np.float32]
+            Squared norms of rows of the matrix of features.
+
+        rows : NDArray[np.float32]
+            Rows the indexes of the chunk refer to, the matrix of features itself or dense rows.
+
+        rows_norms : NDArray[np.float32]
+            Squared norms of `rows`.
+
+        gamma : np.float32
+            Coefficient of the RBF kernel.
+
+        workspace : Workspace
+            Workspace of the current thread providing buffers for gathered rows and kernel values.
+
+        out : NDArray[np.float32]
+            Vector the recommendations of the chunk are written to.
+
+        linear_out : NDArray[np.float32], optional
+            Vector the linear kernel scores of the chunk are written to, if given.
+        """
+        rows_count, (catalog_size, features_count) = indexes_chunk.shape[0], matrix.shape
+        kernel_chunk = workspace.buffer('kernel', (rows_count, catalog_size), matrix.dtype)
+        norms_chunk = np.take(rows_norms, indexes_chunk, out=workspace.buffer('norms', (rows_count,), matrix.dtype))
+
+        if issparse(rows):
+            rows_chunk = rows[indexes_chunk].toarray()
+        else:
+            rows_chunk = workspace.buffer('rows', (rows_count, features_count), matrix.dtype)
+            np.take(rows, indexes_chunk, axis=0, out=rows_chunk)
+
+        if issparse(matrix):
+            np.copyto(kernel_chunk, (matrix @ rows_chunk.T).T)
+        else:
+            np.matmul(rows_chunk, matrix.T, out=kernel_chunk)
+
+        if linear_out is not None:
+            np.matmul(scores_chunk, kernel_chunk, out=linear_out)
+
+        kernel_chunk *= -2
+        kernel_chunk += norms_chunk[:, None]
+        kernel_chunk += row_norms
+        np.maximum(kernel_chunk, 0, out=kernel_chunk)
+        kernel_chunk *= -gamma
+        np.exp(kernel_chunk, out=kernel_chunk)
+        np.matmul(scores_chunk, kernel_chunk, out=out)
+
+
+@final
+class RandomFourierFeatures(object):
+    """Random Fourier features map approximating the RBF kernel.
+
+    Maps rows of the matrix of features to `z(x) = sqrt(2 / D) cos(x W + b)`, where columns of `W` are drawn from
+    `N(0, 2 gamma I)` and `b` from `U(0, 2 pi)`, so that `z(x) z(y)` approximates `exp(-gamma |x - y|^2)`. The summed
+    RBF similarity of user's titles then becomes a single dot product of the summed mapped rows with the mapped catalog.
+
+    Attributes
+    ----------
+    n_components : int
+        Dimension `D` of the mapped feature space.
+
+    gamma : float, optional
+        Coefficient of the RBF kernel. If None, `1 / n_features` is used, the same as for the exact kernel.
+
+    seed : int
+        Seed of the random generator. Fixed seed keeps the mapping and therefore recommendations reproducible.
+    """
+
+    def __init__(self, n_components: int, gamma: float | None = None, seed: int = 0):
+        """Initialize the map with the given parameters.
+
+        Parameters
+        ----------
+        n_components : int
+            Dimension of the mapped feature space.
+
+        gamma : float, optional
+            Coefficient of the RBF kernel. If None, `1 / n_features` is used.
+
+        seed : int, default: 0
+            Seed of the random generator.
+        """
+        self._n_components: int = n_components
+        self._gamma: float | None = gamma
+        self._seed: int = seed
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'RandomFourierFeatures(\n',
+                '  n_components={n_components},\n',
+                '  gamma={gamma},\n',
+                '  seed={seed})',
+            ],
+        )
+
+        return repr_template.format(
+            n_components=self._n_components,
+            gamma=self._gamma,
+            seed=self._seed,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def key(self) -> tuple:
+        """Return the key identifying the mapped matrix among artifacts of the same matrix of features.
+
+        Returns
+        -------
+        tuple
+            Name and parameters of the map.
+        """
+        return 'random_fourier_features', self._n_components, self._gamma, self._seed
+
+    def transform(self, matrix: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Map the matrix of features to the random Fourier feature space.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            C-contiguous matrix of mapped features, in float64 for float64 matrices and in float32 otherwise.
+        """
+        gamma = self._gamma if self._gamma is not None else 1 / max(matrix.shape[1], 1)
+        dtype = np.promote_types(matrix.dtype, np.float32)
+        generator = np.random.default_rng(self._seed)
+        weights = generator.normal(scale=np.sqrt(2 * gamma), size=(matrix.shape[1], self._n_components))
+        offsets = generator.uniform(0, 2 * np.pi, size=self._n_components)
+
+        mapped = np.asarray(matrix.astype(dtype, copy=False) @ weights.astype(dtype), dtype=dtype)
+        mapped += offsets.astype(dtype)
+        np.cos(mapped, out=mapped)
+        mapped *= dtype.type(np.sqrt(2 / self._n_components))
+        mapped.flags.writeable = False
+
+        return mapped
+
+
+@final
+class RowNormalizer(object):
+    """L2 normalisation of rows of the matrix of features.
+
+    The linear kernel of the normalised matrix is the cosine similarity of the original one, so cosine is scored through
+    a single profile vector on the normalised matrix, cached by storage alongside the original one. Rows with many
+    features (e.g. long-running titles with many tags) no longer dominate recommendations as with the linear kernel.
+    """
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return 'RowNormalizer()'
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def key(self) -> tuple:
+        """Return the key identifying the normalised matrix among artifacts of the same matrix of features.
+
+        Returns
+        -------
+        tuple
+            Name of the map.
+        """
+        return ('l2_normalized',)
+
+    def transform(self, matrix: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Normalise rows of the matrix of features to unit L2 norm. Rows without features are kept zero.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features. Might be a sparse CSR matrix.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Normalised matrix of the same data type and format.
+        """
+        norms = np.sqrt(RBFEngine.row_norms(matrix))
+        norms[norms == 0] = 1
+
+        if issparse(matrix):
+            return csr_matrix(matrix.multiply(1 / norms[:, None]), dtype=matrix.dtype)
+
+        normalized = np.ascontiguousarray(matrix / norms[:, None], dtype=matrix.dtype)
+        normalized.flags.writeable = False
+
+        return normalized
+
+
+class VectorUtility(IVectorUtility):  # noqa: WPS214
+    """A utility class for calculating recommendation vector.
+
+    Attributes
+    ----------
+    memory_budget_bytes : int
+        Memory budget in bytes for chunked calculations. The chunk size is derived from it per request.
+
+    chunk_size : int
+        The size of the chunks to process, derived from the memory budget on the last chunked calculation.
+
+    matrix_size : int, default: 0
+            The size of the matrix to process.
+
+    precision : Precision
+        Numeric precision of calculations. The result vector is accumulated in its compute data type.
+
+    result_vector : NDArray[np.float32]
+        The result vector of the calculation.
+
+    row_norms : NDArray[np.float32], optional
+        Squared norms of rows of the matrix of features. Required by similarity methods scored by `RBFEngine`.
+
+    unique_rows : UniqueRows, optional
+        Distinct rows of the matrix of features. If set, titles are scored through their distinct rows.
+
+    profile_centroids : ProfileCentroids, optional
+        Cache of weighted centroids of user's titles. If set, huge lists are scored by `RBFEngine` through centroids.
+
+    shares_dot_products : bool, default: False
+        Whether similarity methods scored by `RBFEngine` also emit the linear kernel vector from the same dot products.
+
+    shared_vectors : dict[str, NDArray[np.float32]]
+        Recommendation vectors of the last `accumulate_chunked_results` keyed by the similarity method name, including
+        vectors of other similarity methods emitted by the same pass.
+    """
+
+    def __init__(self, similarity_method: SimilarityMethod, precision: Precision | None = None):
+        """Initialize the utility class with the given parameters.
+
+        Parameters
+        ----------
+        similarity_method : SimilarityMethod
+            SimilarityMethod class that provides the similarity method function.
+
+        precision : Precision, optional
+            Numeric precision of calculations. If None, `config.precision` is used.
+        """
+        self._similarity_method: SimilarityMethod = similarity_method
+        self._precision: Precision = precision if precision is not None else Precision(config.precision)
+        self._matrix_size: int = 0
+        self._result_vector: NDArray[np.float32] = np.zeros((self._matrix_size,), dtype=self._precision.compute_dtype)
+        self._memory_budget_bytes: int = config.memory_budget_bytes
+        self._chunk_size: int = 1
+        self._row_norms: NDArray[np.float32] | None = None
+        self._unique_rows: UniqueRows | None = None
+        self._profile_centroids: ProfileCentroids | None = None
+        self._shares_dot_products: bool = False
+        self._linear_vector: NDArray[np.float32] | None = None
+        self._shared_vectors: dict[str, NDArray[np.float32]] = {}
+        self._rbf_engine: RBFEngine = RBFEngine()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'VectorUtility(\n',
+                '  similarity_method={similarity_method},\n',
+                '  precision={precision},\n',
+                '  memory_budget_bytes={memory_budget_bytes},\n',
+                '  chunk_size={chunk_size})',
+            ],
+        )
+
+        return repr_template.format(
+            similarity_method=self._similarity_method,
+            precision=self._precision,
+            memory_budget_bytes=self._memory_budget_bytes,
+            chunk_size=self._chunk_size,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def similarity_method(self) -> SimilarityMethod:
+        """Return the similarity method used for calculation.
+
+        Returns
+        -------
+        SimilarityMethod
+            SimilarityMethod class that provides the similarity method function.
+        """
+        return self._similarity_method
+
+    @property
+    def precision(self) -> Precision:
+        """Return the numeric precision of calculations.
+
+        Returns
+        -------
+        Precision
+            Precision class that provides storage and compute data types.
+        """
+        return self._precision
+
+    @property
+    def result_vector(self) -> NDArray[np.float32]:
+        """Return the result vector of the calculation.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            The result vector of the calculation in the compute data type of the precision.
+        """
+        return self._result_vector
+
+    @result_vector.setter
+    def result_vector(self, result_vector: NDArray):
+        self._matrix_size = result_vector.shape[0]
+        self._result_vector = result_vector.astype(self._precision.compute_dtype)
+
+    @property
+    def row_norms(self) -> NDArray[np.float32] | None:
+        """Return squared norms of rows of the matrix of features.
+
+        Returns
+        -------
+        NDArray[np.float32], optional
+            Squared norms of rows of the matrix of features.
+        """
+        return self._row_norms
+
+    @row_norms.setter
+    def row_norms(self, row_norms: NDArray[np.float32]):
+        self._row_norms = row_norms
+
+    @property
+    def unique_rows(self) -> UniqueRows | None:
+        """Return distinct rows of the matrix of features.
+
+        Returns
+        -------
+        UniqueRows, optional
+            Index of distinct rows of the matrix of features.
+        """
+        return self._unique_rows
+
+    @unique_rows.setter
+    def unique_rows(self, unique_rows: UniqueRows | None):
+        self._unique_rows = unique_rows
+
+    @property
+    def profile_centroids(self) -> ProfileCentroids | None:
+        """Return the cache of weighted centroids of user's titles.
+
+        Returns
+        -------
+        ProfileCentroids, optional
+            Cache of weighted centroids used for similarity methods scored by `RBFEngine`.
+        """
+        return self._profile_centroids
+
+    @profile_centroids.setter
+    def profile_centroids(self, profile_centroids: ProfileCentroids | None):
+        self._profile_centroids = profile_centroids
+
+    @property
+    def shares_dot_products(self) -> bool:
+        """Return whether the linear kernel vector is emitted by passes of `RBFEngine`.
+
+        Returns
+        -------
+        bool
+            True if dot products of `RBFEngine` chunks are shared with the linear kernel.
+        """
+        return self._shares_dot_products
+
+    @shares_dot_products.setter
+    def shares_dot_products(self, shares_dot_products: bool):
+        self._shares_dot_products = shares_dot_products
+
+    @property
+    def shared_vectors(self) -> dict[str, NDArray[np.float32]]:
+        """Return recommendation vectors of the last chunked calculation.
+
+        Returns
+        -------
+        dict[str, NDArray[np.float32]]
+            Normalised vectors keyed by the similarity method name. Besides the vector of the similarity method,
+            contains the linear kernel vector if it was emitted by the same pass.
+        """
+        return self._shared_vectors
+
+    @property
+    def matrix_size(self) -> int:
+        """Return the size of the matrix to process.
+
+        Returns
+        -------
+        int
+            The size of the matrix to process.
+        """
+        return self._matrix_size
+
+    @matrix_size.setter
+    def matrix_size(self, matrix_size: int):
+        self._matrix_size = matrix_size
+        self._result_vector = np.zeros((matrix_size,), dtype=self._precision.compute_dtype)
+
+    def accumulate_chunked_results(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        scores_sum: np.uint32,
+        matrix: NDArray[np.float32],
+    ):
+        """Calculate the accumulated recommendation vector by processing chunks of indexes and scores.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        scores_sum : np.uint32
+            The sum of the scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+        """
+        result_vector = self.score(indexes_include, scores, matrix)
+        result_vector /= result_vector.dtype.type(scores_sum)
+        self._result_vector = result_vector
+        self._shared_vectors = {self._similarity_method.name: result_vector}
+
+        if self._linear_vector is not None:
+            linear_vector = self._linear_vector.astype(result_vector.dtype)
+            linear_vector /= linear_vector.dtype.type(scores_sum)
+            self._shared_vectors['linear_kernel'] = linear_vector
+
+    def accumulate_candidates(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        scores_sum: np.uint32,
+        matrix: NDArray[np.float32],
+        candidates: NDArray[np.intp],
+    ):
+        """Calculate the recommendation vector exactly for candidate titles only.
+
+        Titles other than candidates are scored `-inf`, so they are never recommended.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        scores_sum : np.uint32
+            The sum of the scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        candidates : NDArray[np.intp]
+            The indexes of candidate titles, e.g. found by `LowRankCandidates`.
+        """
+        compute_dtype = self._precision.compute_dtype
+        scores = scores.reshape(-1).astype(compute_dtype)
+        matrix_include = self._precision.compute(matrix[indexes_include])
+        matrix_candidates = self._precision.compute(matrix[candidates])
+
+        if self._similarity_method.is_linear or self._similarity_method.uses_feature_map:
+            candidate_scores = matrix_candidates @ (scores @ matrix_include)
+        else:
+            similarity_method = self._similarity_method.similarity_method
+            candidate_scores = scores @ similarity_method(matrix_include, matrix_candidates).astype(compute_dtype)
+
+        self._matrix_size = matrix.shape[0]
+        self._result_vector = np.full((matrix.shape[0],), -np.inf, dtype=compute_dtype)
+        self._result_vector[candidates] = np.asarray(candidate_scores).reshape(-1) / compute_dtype.type(scores_sum)
+
+    def score(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised sum of weighted similarity rows of the given titles.
+
+        Unlike `accumulate_chunked_results`, the result vector of the class is not changed, which allows to combine
+        results of several calls (e.g. to apply deltas of added or removed titles).
+
+        If the similarity method has a fused kernel in its kernel backend (see `SimilarityMethod.kernel_backend`), the
+        catalog is scored by the backend in one pass, otherwise by the NumPy path.
+
+        If `unique_rows` is set for the matrix, scores of user's titles are summed per distinct row, distinct rows of
+        user's titles are scored against distinct rows of the catalog and the result is broadcast back to titles.
+
+        If `shares_dot_products` is set and the catalog is scored by `RBFEngine` with user's titles themselves (not
+        their centroids), the unnormalised linear kernel vector of the same pass is kept for `shared_vectors`.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features, converted to the compute data type of the precision if needed.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Unnormalised vector of recommendations in the compute data type of the precision.
+        """
+        unique_rows = self._unique_rows
+        self._linear_vector = None
+
+        if unique_rows is None or unique_rows.titles_count != matrix.shape[0]:
+            return self._score(indexes_include, scores, matrix, self._row_norms)
+
+        rows_include, weights = unique_rows.collapse(indexes_include, scores)
+        row_norms = self._row_norms[unique_rows.representatives] if self._row_norms is not None else None
+        result_vector = self._score(rows_include, weights.reshape(-1, 1), unique_rows.rows, row_norms)
+
+        if self._linear_vector is not None:
+            self._linear_vector = unique_rows.broadcast(self._linear_vector)
+
+        return unique_rows.broadcast(result_vector)
+
+    def _score(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+        row_norms: NDArray[np.float32] | None,
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised sum of weighted similarity rows of the given rows of the matrix.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the rows to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the rows to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        row_norms : NDArray[np.float32], optional
+            Squared norms of rows of the matrix. Calculated if None and required by the similarity method.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Unnormalised vector of recommendations in the compute data type of the precision.
+        """
+        compute_dtype = self._precision.compute_dtype
+        kernel_backend = self._similarity_method.kernel_backend
+
+        if kernel_backend is not None:
+            return kernel_backend.score(
+                self._similarity_method.name,
+                indexes_include,
+                scores,
+                self._precision.compute(matrix, Workspace.current()),
+                row_norms,
+            )
+
+        if self._similarity_method.is_linear or self._similarity_method.uses_feature_map:
+            return self._calculate_profile_vector(indexes_include, scores, matrix)
+
+        if self._similarity_method.uses_row_norms:
+            return self._score_rbf(indexes_include, scores, matrix, row_norms)
+
+        self._chunk_size = self._estimate_chunk_size(indexes_include.shape[0], matrix)
+
+        return self._score_chunks(indexes_include, scores, self._precision.compute(matrix, Workspace.current()))
+
+    def _score_chunks(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised sum of weighted similarity rows with the similarity method callable chunk by chunk.
+
+        With more than one `config.chunk_workers`, chunks are scored in waves of that many chunks on the shared thread
+        pool, every thread using buffers of its own `Workspace`, the same way as by `RBFEngine.accumulate`. Chunk
+        vectors are summed in the order of chunks, so the result does not depend on the number of workers.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the rows to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the rows to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features in the compute data type.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Unnormalised vector of recommendations in the compute data type of the precision.
+        """
+        compute_dtype = self._precision.compute_dtype
+        workers = config.chunk_workers
+        num_iterations: int = max(ceil(indexes_include.shape[0] / self._chunk_size), 1)
+        wave_size = workers if workers > 1 and num_iterations > 1 else 1
+        chunk_vectors = Workspace.current().buffer('chunk_vectors', (wave_size, matrix.shape[0]), compute_dtype)
+
+        def score_chunk(slot: int, iteration_num: int):  # noqa: WPS430
+            indexes_chunk, scores_chunk = self._get_iteration_chunk(iteration_num, indexes_include, scores)
+            self._calculate_vector(indexes_chunk, scores_chunk, matrix, Workspace.current(), chunk_vectors[slot])
+
+        result_vector = np.zeros((matrix.shape[0],), dtype=compute_dtype)
+
+        for wave_start in range(1, num_iterations + 1, wave_size):
+            wave = range(wave_start, min(wave_start + wave_size, num_iterations + 1))
+
+            if wave_size > 1:
+                list(worker_pool(workers).map(score_chunk, range(len(wave)), wave))
+            else:
+                score_chunk(0, wave[0])
+
+            for slot in range(len(wave)):
+                result_vector += chunk_vectors[slot]
+
+        return result_vector
+
+    def _score_rbf(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+        row_norms: NDArray[np.float32] | None,
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised sum of weighted RBF similarity rows with `RBFEngine`.
+
+        If `profile_centroids` is set and reduces user's titles within its tolerance, centroids are scored instead of
+        user's titles. Otherwise, if `shares_dot_products` is set, the linear kernel vector is emitted by the same pass.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the rows to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the rows to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        row_norms : NDArray[np.float32], optional
+            Squared norms of rows of the matrix. Calculated if None.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Unnormalised vector of recommendations in the compute data type of the precision.
+        """
+        matrix_compute = self._precision.compute(matrix, Workspace.current())
+        centroids = None
+
+        if self._profile_centroids is not None:
+            reduced = self._profile_centroids.reduce(indexes_include, scores, matrix_compute)
+
+            if reduced is not None:
+                centroids, scores = reduced
+                indexes_include = np.arange(centroids.shape[0], dtype=np.intp)
+
+        self._chunk_size = self._estimate_chunk_size(indexes_include.shape[0], matrix)
+
+        if self._shares_dot_products and centroids is None:
+            self._linear_vector = np.zeros((matrix_compute.shape[0],), dtype=matrix_compute.dtype)
+
+        return self._rbf_engine.accumulate(
+            indexes_include,
+            scores,
+            matrix_compute,
+            row_norms if row_norms is not None else RBFEngine.row_norms(matrix_compute),
+            self._chunk_size,
+            config.chunk_workers,
+            centroids,
+            self._linear_vector,
+        )
+
+    def extract_sorted_recommendations(
+        self,
+        storage: IStorage,
+        indexes_include: NDArray[np.uint32],
+        indexes_exclude: NDArray[np.uint32],
+        k: int | None = None,
+        offset: int = 0,
+    ) -> RecommendationResult:
+        """Extract the top sorted recommendations from the result vector.
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to use for retrieving titles' information.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        indexes_exclude : NDArray[np.uint32]
+            The indexes of the titles to exclude from the calculation.
+
+        k : int, optional
+            The number of recommendations to extract. If None, all titles are sorted and returned.
+
+        offset : int, default: 0
+            The number of top recommendations to skip. Used for paging together with `k`.
+
+        Returns
+        -------
+        RecommendationResult
+            Recommended titles with their scores. If `k` is None, all titles other than included and excluded ones are
+            returned unsorted and sorted lazily by the result.
+        """
+        if k is not None:
+            return self._extract_top_recommendations(storage, indexes_include, indexes_exclude, k, offset)
+
+        is_valid = np.ones(self._result_vector.shape[0], dtype=bool)
+        is_valid[np.concatenate([indexes_include, indexes_exclude]).astype(np.intp)] = False
+        result_indexes = np.flatnonzero(is_valid)
+
+        if not result_indexes.shape[0]:
+            return RecommendationResult.empty()
+
+        scaled_scores = minmax_scale(self._result_vector[result_indexes])
+        item_ids = storage.info.id.values[result_indexes]
+
+        return RecommendationResult(item_ids, scaled_scores, result_indexes)
+
+    def extract_pruned_recommendations(  # noqa: WPS211
+        self,
+        storage: IStorage,
+        block_top_k: BlockTopK,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        scores_sum: np.uint32,
+        matrix: NDArray[np.float32],
+        indexes_exclude: NDArray[np.uint32],
+        k: int,
+        offset: int = 0,
+        column_weights: dict[str, float] | None = None,
+    ) -> RecommendationResult:
+        """Extract a page of top recommendations of a linear similarity method scoring only blocks of the catalog.
+
+        The profile vector is calculated the same way as by `score`, and blocks of titles that cannot enter the page are
+        skipped by `BlockTopK`, so recommendations are the same as of `accumulate_chunked_results` followed by
+        `extract_sorted_recommendations`. The result vector of the class is not changed.
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to use for retrieving titles' information.
+
+        block_top_k : BlockTopK
+            Index of blocks fitted for the matrix of features.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        scores_sum : np.uint32
+            The sum of the scores of the titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        indexes_exclude : NDArray[np.uint32]
+            The indexes of the titles to exclude from the calculation.
+
+        k : int
+            The number of recommendations to extract.
+
+        offset : int, default: 0
+            The number of top recommendations to skip.
+
+        column_weights : dict[str, float], optional
+            Weights of feature groups. Groups missing from the dictionary have the weight of 1.
+
+        Returns
+        -------
+        RecommendationResult
+            Sorted page of recommended titles with their scores.
+        """
+        compute_dtype = self._precision.compute_dtype
+        profile_vector = scores.reshape(-1).astype(compute_dtype) @ self._precision.compute(matrix[indexes_include])
+        profile_vector = np.asarray(profile_vector, dtype=compute_dtype).reshape(-1)
+
+        if column_weights:
+            weights = [column_weights.get(group, 1) for group in block_top_k.groups]
+            profile_vector *= np.asarray(weights, dtype=compute_dtype)
+
+        indexes_invalid = np.concatenate([indexes_include, indexes_exclude]).astype(np.intp)
+        result_indexes, result_scores, score_min, score_max = block_top_k.search(
+            profile_vector,
+            scores_sum,
+            indexes_invalid,
+            offset + k,
+        )
+
+        if offset >= result_indexes.shape[0]:
+            return RecommendationResult.empty()
+
+        score_min, score_max = np.float32(score_min), np.float32(score_max)
+        scaled_scores = result_scores[offset:].astype(np.float32) - score_min
+        scaled_scores /= score_max - score_min or 1
+        item_ids = storage.info.id.values[result_indexes[offset:]]
+
+        return RecommendationResult(item_ids, scaled_scores, result_indexes[offset:], is_sorted=True)
+
+    def _extract_top_recommendations(
+        self,
+        storage: IStorage,
+        indexes_include: NDArray[np.uint32],
+        indexes_exclude: NDArray[np.uint32],
+        k: int,
+        offset: int,
+    ) -> RecommendationResult:
+        """Extract a page of top recommendations using partial selection.
+
+        Excluded titles are masked in the result vector in place, so neither the sorted result vector nor its filtered
+        copy is materialised. The score of the `offset + k`-th title plus a safety margin (`config.top_k_margin`) is
+        found with `np.argpartition`, and only titles scored at least as high are sorted by score and then by index.
+        Titles tied with it are all kept, so pages cut a group of tied titles in the same place as the fully sorted
+        result and consecutive pages neither overlap nor skip titles. Titles scored `-inf` (e.g. not among candidates of
+        `accumulate_candidates`) are never recommended.
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to use for retrieving titles' information.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        indexes_exclude : NDArray[np.uint32]
+            The indexes of the titles to exclude from the calculation.
+
+        k : int
+            The number of recommendations to extract.
+
+        offset : int
+            The number of top recommendations to skip.
+
+        Returns
+        -------
+        RecommendationResult
+            Sorted page of recommended titles with their scores.
+        """
+        combined_indexes = np.concatenate([indexes_include, indexes_exclude]).astype(np.intp)
+        valid_count = self._result_vector.shape[0] - np.unique(combined_indexes).shape[0]
+        range_end = min(offset + k, valid_count)
+
+        if offset >= range_end:
+            return RecommendationResult.empty()
+
+        self._result_vector[combined_indexes] = np.inf
+        score_min = np.float32(self._result_vector.min())
+
+        if np.isneginf(score_min):
+            is_unscored = np.isneginf(self._result_vector)
+            valid_count -= np.count_nonzero(is_unscored)
+            range_end = min(offset + k, valid_count)
+            score_min = np.float32(self._result_vector.min(where=~is_unscored, initial=np.inf))
+
+            if offset >= range_end:
+                self._result_vector[combined_indexes] = -np.inf
+                return RecommendationResult.empty()
+
+        self._result_vector[combined_indexes] = -np.inf
+        score_max = np.float32(self._result_vector.max())
+
+        kth = min(range_end + config.top_k_margin, valid_count) - 1
+        partition_start = self._result_vector.shape[0] - 1 - kth
+        kth_score = self._result_vector[np.argpartition(self._result_vector, partition_start)[partition_start]]
+        candidates = np.flatnonzero(self._result_vector >= kth_score)
+        candidates = candidates[np.lexsort((candidates, -self._result_vector[candidates]))]
+        result_indexes = candidates[offset:range_end]
+
+        scaled_scores = self._result_vector[result_indexes].astype(np.float32) - score_min
+        scaled_scores /= score_max - score_min or 1
+        item_ids = storage.info.id.values[result_indexes]
+
+        return RecommendationResult(item_ids, scaled_scores, result_indexes, is_sorted=True)
+
+    def _estimate_chunk_size(self, rows_count: int, matrix: NDArray[np.float32]) -> int:
+        """Derive the chunk size from the memory budget, the size of the matrix and the similarity method.
+
+        The estimate counts temporaries allocated per row of a chunk by every worker: gathered features of user's titles
+        and chunk x N kernel values. `RBFEngine` keeps one kernel buffer per worker (plus a copy for sparse matrices),
+        and `sklearn` kernels of the other methods produce one kernel matrix per worker. All of them are in the compute
+        data type of the precision. The result vector, per-chunk vectors and the copy of the matrix converted to the
+        compute data type (if it is stored in another one) are counted as a fixed part of the peak.
+
+        Parameters
+        ----------
+        rows_count : int
+            The number of user's titles to process.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        Returns
+        -------
+        int
+            The chunk size in range from 1 to `rows_count`.
+        """
+        catalog_size, features_count = matrix.shape
+        compute_itemsize = self._precision.compute_dtype.itemsize
+        fixed_bytes = 0
+
+        if matrix.dtype != self._precision.compute_dtype:
+            fixed_bytes = catalog_size * features_count * compute_itemsize
+
+        workers = max(config.chunk_workers, 1)
+        kernel_copies = 2 if self._similarity_method.uses_row_norms and issparse(matrix) else 1
+        row_bytes = workers * (catalog_size * kernel_copies + features_count) * compute_itemsize
+        fixed_bytes += catalog_size * compute_itemsize * (workers + 1)
+
+        chunk_size = int(min(max((self._memory_budget_bytes - fixed_bytes) // row_bytes, 1), max(rows_count, 1)))
+
+        logger.info(
+            'Chunk size {chunk_size} for {rows_count} titles, estimated peak {peak_bytes} bytes.'.format(
+                chunk_size=chunk_size,
+                rows_count=rows_count,
+                peak_bytes=fixed_bytes + chunk_size * row_bytes,
+            ),
+        )
+
+        return chunk_size
+
+    def _calculate_vector(  # noqa: WPS211
+        self,
+        indexes: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+        workspace: Workspace,
+        out: NDArray[np.float32],
+    ) -> NDArray[np.float32]:
+        """Calculate vector of recommendations for given indexes and scores with the similarity method callable.
+
+        This is the path of similarity methods scored neither through a profile vector nor by `RBFEngine`. Rows of
+        the chunk are gathered into a `Workspace` buffer and the weighted column sum of kernel values is written to
+        `out` by a single product, so no weighted copy of the kernel matrix is made. The kernel matrix itself is
+        allocated by the callable (`sklearn` kernels have no output parameter), and it is not copied if it is already
+        in the compute data type.
+
+        Parameters
+        ----------
+        indexes : NDArray[np.uint32]
+            Indexes of titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            Scores of titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features in the compute data type. Might be a sparse CSR matrix.
+
+        workspace : Workspace
+            Workspace of the current thread providing the buffer for gathered rows.
+
+        out : NDArray[np.float32]
+            Vector the recommendations of the chunk are written to.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Vector of recommendations, i.e. `out`.
+        """
+        compute_dtype = self._precision.compute_dtype
+        similarity_method = self._similarity_method.similarity_method
+
+        if issparse(matrix):
+            rows_chunk = matrix[indexes]
+        else:
+            rows_chunk = workspace.buffer('rows', (indexes.shape[0], matrix.shape[1]), matrix.dtype)
+            np.take(matrix, indexes, axis=0, out=rows_chunk)
+
+        similarity_score = np.asarray(similarity_method(rows_chunk, matrix), dtype=compute_dtype)
+
+        return np.matmul(scores.reshape(-1).astype(compute_dtype), similarity_score, out=out)
+
+    def _calculate_profile_vector(
+        self,
+        indexes: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        matrix: NDArray[np.float32],
+    ) -> NDArray[np.float32]:
+        """Calculate vector of recommendations for linear similarity methods.
+
+        The weighted sum of the user's feature rows (profile vector) is computed first and then multiplied by the
+        matrix of features, which gives the same result as summing weighted similarity rows chunk by chunk, but without
+        chunk x N intermediate matrices. If the matrix is stored in a data type other than the compute one, it is
+        converted in blocks of rows within the memory budget, so no full-size copy is created.
+
+        Parameters
+        ----------
+        indexes : NDArray[np.uint32]
+            Indexes of titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            Scores of titles to include in the calculation.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Vector of recommendations.
+        """
+        compute_dtype = self._precision.compute_dtype
+        profile_vector = scores.reshape(-1).astype(compute_dtype) @ self._precision.compute(matrix[indexes])
+
+        if matrix.dtype == compute_dtype or issparse(matrix):
+            return np.asarray(self._precision.compute(matrix) @ profile_vector, dtype=compute_dtype)
+
+        block_size = max(self._memory_budget_bytes // max(matrix.shape[1] * compute_dtype.itemsize, 1), 1)
+        result_vector = np.empty((matrix.shape[0],), dtype=compute_dtype)
+
+        for block_start in range(0, matrix.shape[0], block_size):
+            block = matrix[block_start : block_start + block_size].astype(compute_dtype)
+            np.matmul(block, profile_vector, out=result_vector[block_start : block_start + block_size])
+
+        return result_vector
+
+    def _get_iteration_chunk(
+        self,
+        iteration_num: int,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+    ) -> tuple[NDArray[np.uint32], NDArray[np.uint8]]:
+        """Get the indexes and scores for a specific chunk iteration.
+
+        Parameters
+        ----------
+        iteration_num : int
+            The iteration number for which to retrieve the chunk data.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        Returns
+        -------
+        tuple[NDArray[np.uint32], NDArray[np.uint8]]
+            The indexes and scores for the specified iteration.
+        """
+        range_start = (iteration_num - 1) * self._chunk_size
+        range_end = iteration_num * self._chunk_size
+
+        indexes_chunk = indexes_include[range_start:range_end]
+        scores_chunk = scores[range_start:range_end]
+
+        return indexes_chunk, scores_chunk
+
+
+def profile_fingerprint(indexes: NDArray[np.uint32], scores: NDArray) -> str:
+    """Calculate a canonical fingerprint of user profile.
+
+    Parameters
+    ----------
+    indexes : NDArray[np.uint32]
+        Indexes of titles included in the profile.
+
+    scores : NDArray
+        Scores of titles included in the profile.
+
+    Returns
+    -------
+    str
+        Hex digest of indexes and scores.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(indexes, dtype=np.uint32).tobytes())
+    digest.update(np.ascontiguousarray(scores, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+@final
+class GroupScores(object):
+    """Cache of per-feature-group partial score vectors for linear similarity methods.
+
+    Feature groups (`column_name` values of metadata) split the matrix of features into disjoint column blocks, so the
+    linear kernel score of the catalog is the sum of per-group scores. Partial score vectors are kept per user profile,
+    and toggling or reweighting groups only recombines them in O(N x groups) instead of rescoring the catalog.
+
+    Attributes
+    ----------
+    storage : IStorage
+        The storage instance to use for retrieving per-group matrices of features.
+
+    max_profiles : int
+        The maximum number of user profiles to keep partial score vectors for. The least recently used profiles are
+        evicted first.
+
+    profiles : OrderedDict[tuple[str, str, str], dict[str, NDArray[np.float32]]]
+        Unnormalised partial score vectors per feature group keyed by profile fingerprint, precision and storage
+        snapshot. Vectors are read-only, and are calculated outside of the lock and added under it.
+    """
+
+    def __init__(self, storage: IStorage, max_profiles: int):
+        """Initialize the cache with the given parameters.
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to use for retrieving per-group matrices of features.
+
+        max_profiles : int
+            The maximum number of user profiles to keep partial score vectors for.
+        """
+        self._storage: IStorage = storage
+        self._max_profiles: int = max_profiles
+        self._profiles: OrderedDict[tuple[str, str, str], dict[str, NDArray[np.float32]]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'GroupScores(\n',
+                '  profiles={profiles},\n',
+                '  max_profiles={max_profiles})',
+            ],
+        )
+
+        return repr_template.format(
+            profiles=len(self._profiles),
+            max_profiles=self._max_profiles,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    def combine(  # noqa: WPS211
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        scores_sum: np.uint32,
+        columns: list[str],
+        column_weights: dict[str, float] | None = None,
+        precision: Precision | None = None,
+        storage: IStorage | None = None,
+    ) -> NDArray[np.float32]:
+        """Calculate the recommendation vector as a weighted sum of per-group partial score vectors.
+
+        Partial score vectors missing for the profile are calculated and cached, the rest are reused.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        scores_sum : np.uint32
+            The sum of the scores of the titles to include in the calculation.
+
+        columns : list[str]
+            Feature groups to combine.
+
+        column_weights : dict[str, float], optional
+            Weights of feature groups. Groups missing from the dictionary have the weight of 1.
+
+        precision : Precision, optional
+            Numeric precision of calculations. If None, `float32` is used.
+
+        storage : IStorage, optional
+            Storage pinned to the version of the data mart of the request (see `IStorage.pin`). If None, the currently
+            loaded version of the storage of the class is pinned.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            The recommendation vector in the compute data type of the precision.
+        """
+        precision = precision if precision is not None else Precision('float32')
+        storage = storage if storage is not None else self._storage.pin()
+        column_weights = column_weights or {}
+        key = (profile_fingerprint(indexes_include, scores), precision.name, storage.snapshot)
+
+        with self._lock:
+            missing = [column for column in columns if column not in self._partials(key)]
+
+        calculated = {
+            column: self._calculate_partial(storage, column, indexes_include, scores, precision) for column in missing
+        }
+
+        with self._lock:
+            partials = self._partials(key)
+
+            for column, partial in calculated.items():
+                partials.setdefault(column, partial)
+
+            vectors = [partials[column] for column in columns]
+
+        compute_dtype = precision.compute_dtype
+        result_vector = np.zeros((storage.info.shape[0],), dtype=compute_dtype)
+
+        for column, vector in zip(columns, vectors):
+            result_vector += compute_dtype.type(column_weights.get(column, 1)) * vector
+
+        result_vector /= compute_dtype.type(scores_sum)
+        return result_vector
+
+    def _partials(self, key: tuple[str, str, str]) -> dict[str, NDArray]:
+        """Get partial score vectors of the profile, registering the profile if it is not cached yet.
+
+        Must be called under the lock, the returned dictionary is changed only under it.
+
+        Parameters
+        ----------
+        key : tuple[str, str, str]
+            Fingerprint of the profile, name of the precision and storage snapshot.
+
+        Returns
+        -------
+        dict[str, NDArray]
+            Partial score vectors keyed by feature group.
+        """
+        if key not in self._profiles:
+            self._profiles[key] = {}
+
+            if len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+
+        self._profiles.move_to_end(key)
+        return self._profiles[key]
+
+    def _calculate_partial(  # noqa: WPS211
+        self,
+        storage: IStorage,
+        column: str,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        precision: Precision,
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised partial score vector of a single feature group.
+
+        Parameters
+        ----------
+        storage : IStorage
+            Storage pinned to the version of the data mart of the request.
+
+        column : str
+            Feature group to calculate the partial score vector for.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles included in the profile.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles included in the profile.
+
+        precision : Precision
+            Numeric precision of calculations.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Read-only partial score vector in the compute data type of the precision.
+        """
+        compute_dtype = precision.compute_dtype
+        matrix = storage.matrix([column], precision.storage_dtype)
+        profile_vector = scores.reshape(-1).astype(compute_dtype) @ precision.compute(matrix[indexes_include])
+        partial = np.asarray(precision.compute(matrix) @ np.asarray(profile_vector).reshape(-1), dtype=compute_dtype)
+        partial.flags.writeable = False
+
+        return partial
+
+
+@final
+class TitleScores(object):
+    """Unnormalised accumulators of similarity rows of titles kept between recommendations in title mode per session.
+
+    Sums of per-title similarity rows are additive, so adding or removing a title from the item searchbar is applied as
+    a delta of its similarity row instead of rescoring the catalog for the whole title set. Every session (e.g. a browser
+    session of the web app, identified by its `session_id` store) has its own accumulator, so sessions choosing
+    different titles do not replace each other's accumulators and rescore their title sets.
+    An accumulator is recomputed from scratch when feature groups, the similarity method, the precision, the
+    representation of the matrix of features or the storage snapshot change, when the delta is not smaller than the new
+    title set, or after `max_deltas` deltas, so that rounding errors of repeated additions and subtractions do not
+    accumulate.
+
+    Accumulators are replaced rather than updated in place, so scoring runs outside of the lock. Concurrent requests of
+    the same session are scored against the same previous accumulator, and the last one is kept.
+
+    Attributes
+    ----------
+    max_sessions : int
+        The maximum number of sessions to keep accumulators for. The least recently used sessions are evicted first.
+
+    max_deltas : int
+        The number of deltas after which an accumulator is recomputed from scratch.
+
+    sessions : OrderedDict[Hashable, tuple[tuple, NDArray[np.intp], NDArray[np.float32], int]]
+        Key (feature groups, the similarity method, the precision, the low-rank flag and the storage snapshot), sorted
+        indexes of included titles, unnormalised sum of their similarity rows and the number of deltas applied since it
+        was recomputed, per session.
+    """
+
+    def __init__(self, max_sessions: int = 32, max_deltas: int = 64):
+        """Initialize empty accumulators.
+
+        Parameters
+        ----------
+        max_sessions : int, default: 32
+            The maximum number of sessions to keep accumulators for.
+
+        max_deltas : int, default: 64
+            The number of deltas after which an accumulator is recomputed from scratch.
+        """
+        self._max_sessions: int = max_sessions
+        self._max_deltas: int = max_deltas
+        self._sessions: OrderedDict[Hashable, tuple[tuple, NDArray[np.intp], NDArray[np.float32], int]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'TitleScores(\n',
+                '  sessions={sessions},\n',
+                '  max_sessions={max_sessions},\n',
+                '  max_deltas={max_deltas})',
+            ],
+        )
+
+        return repr_template.format(
+            sessions=len(self._sessions),
+            max_sessions=self._max_sessions,
+            max_deltas=self._max_deltas,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    def update(  # noqa: WPS211
+        self,
+        session: Hashable,
+        columns: list[str],
+        indexes_include: NDArray[np.uint32],
+        matrix: NDArray[np.float32],
+        vector_utility: VectorUtility,
+        snapshot: str,
+        low_rank: bool = False,
+    ) -> NDArray[np.float32]:
+        """Update the accumulator of the session for the new title set and return it.
+
+        Parameters
+        ----------
+        session : Hashable
+            Identifier of the session.
+
+        columns : list[str]
+            Feature groups of the matrix of features.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles in the new title set.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        vector_utility : VectorUtility
+            VectorUtility class used to score added and removed titles.
+
+        snapshot : str
+            Storage snapshot the matrix of features was built from.
+
+        low_rank : bool, default: False
+            Whether the matrix of features is the matrix of reduced features.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Copy of the unnormalised sum of similarity rows of the new title set.
+        """
+        key = (
+            frozenset(columns),
+            vector_utility.similarity_method.name,
+            vector_utility.precision.name,
+            low_rank,
+            snapshot,
+        )
+        indexes = np.unique(np.asarray(indexes_include, dtype=np.intp))
+
+        with self._lock:
+            previous = self._sessions.get(session)
+
+        accumulator, deltas = self._accumulate(previous, key, indexes, matrix, vector_utility)
+
+        with self._lock:
+            self._sessions[session] = (key, indexes, accumulator, deltas)
+            self._sessions.move_to_end(session)
+
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+
+        return accumulator.copy()
+
+    def _accumulate(
+        self,
+        previous: tuple[tuple, NDArray[np.intp], NDArray[np.float32], int] | None,
+        key: tuple,
+        indexes: NDArray[np.intp],
+        matrix: NDArray[np.float32],
+        vector_utility: VectorUtility,
+    ) -> tuple[NDArray[np.float32], int]:
+        """Calculate the new accumulator from the previous one of the session.
+
+        Parameters
+        ----------
+        previous : tuple[tuple, NDArray[np.intp], NDArray[np.float32], int], optional
+            The key, the indexes, the accumulator and the number of deltas of the session, if any.
+
+        key : tuple
+            The key of the new accumulator.
+
+        indexes : NDArray[np.intp]
+            Sorted unique indexes of the titles in the new title set.
+
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        vector_utility : VectorUtility
+            VectorUtility class used to score titles.
+
+        Returns
+        -------
+        tuple[NDArray[np.float32], int]
+            The new accumulator and the number of deltas applied since it was recomputed from scratch.
+        """
+        if previous is None or previous[0] != key or previous[3] >= self._max_deltas:
+            return vector_utility.score(indexes, np.ones((indexes.shape[0], 1)), matrix), 0
+
+        _, previous_indexes, accumulator, deltas = previous
+        indexes_added = np.setdiff1d(indexes, previous_indexes, assume_unique=True)
+        indexes_removed = np.setdiff1d(previous_indexes, indexes, assume_unique=True)
+
+        if indexes_added.shape[0] + indexes_removed.shape[0] >= indexes.shape[0]:
+            return vector_utility.score(indexes, np.ones((indexes.shape[0], 1)), matrix), 0
+
+        if indexes_added.shape[0]:
+            accumulator = accumulator + vector_utility.score(
+                indexes_added,
+                np.ones((indexes_added.shape[0], 1)),
+                matrix,
+            )
+
+        if indexes_removed.shape[0]:
+            accumulator = accumulator - vector_utility.score(
+                indexes_removed,
+                np.ones((indexes_removed.shape[0], 1)),
+                matrix,
+            )
+
+        return accumulator, deltas + 1
+
+
+@final
+class KernelScores(object):
+    """Cache of recommendation vectors of similarity methods sharing a pass over the catalog.
+
+    `RBFEngine` computes dot products of user's titles with the catalog, and their weighted sum is the linear kernel
+    vector, so a pass scoring the RBF kernel emits both vectors (see `VectorUtility.shares_dot_products`). Vectors are
+    kept per profile, combination of feature groups, precision, representation and version of the data mart, so
+    switching the similarity method of the same profile reuses the vector instead of rescoring the catalog.
+
+    Attributes
+    ----------
+    max_profiles : int
+        The maximum number of profiles to keep vectors for. The least recently used profiles are evicted first.
+
+    profiles : OrderedDict[str, dict[str, NDArray[np.float32]]]
+        Normalised recommendation vectors keyed by fingerprint and then by the similarity method name.
+    """
+
+    def __init__(self, max_profiles: int):
+        """Initialize the cache with the given parameters.
+
+        Parameters
+        ----------
+        max_profiles : int
+            The maximum number of profiles to keep vectors for.
+        """
+        self._max_profiles: int = max_profiles
+        self._profiles: OrderedDict[str, dict[str, NDArray[np.float32]]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'KernelScores(\n',
+                '  profiles={profiles},\n',
+                '  max_profiles={max_profiles})',
+            ],
+        )
+
+        return repr_template.format(
+            profiles=len(self._profiles),
+            max_profiles=self._max_profiles,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @staticmethod
+    def fingerprint(
+        catalog_key: tuple,
+        snapshot: str,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray,
+    ) -> str:
+        """Calculate a fingerprint of the profile scored against the catalog.
+
+        Parameters
+        ----------
+        catalog_key : tuple
+            Key of the catalog (`Catalog.key`). The similarity method of the key is ignored.
+
+        snapshot : str
+            Storage snapshot of the catalog.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles included in the profile.
+
+        scores : NDArray
+            The scores of the titles included in the profile.
+
+        Returns
+        -------
+        str
+            Hex digest of the inputs.
+        """
+        canonical = repr((sorted(catalog_key[0]), catalog_key[2:], snapshot))
+        digest = hashlib.blake2b(canonical.encode(), digest_size=16)
+        digest.update(profile_fingerprint(indexes_include, scores).encode())
+
+        return digest.hexdigest()
+
+    def get(self, fingerprint: str, similarity_method: str) -> NDArray[np.float32] | None:
+        """Get a copy of the cached recommendation vector.
+
+        Parameters
+        ----------
+        fingerprint : str
+            Fingerprint of the profile and the catalog.
+
+        similarity_method : str
+            Name of the similarity method.
+
+        Returns
+        -------
+        NDArray[np.float32], optional
+            Copy of the normalised recommendation vector or None if it is not cached.
+        """
+        with self._lock:
+            vectors = self._profiles.get(fingerprint)
+
+            if vectors is None or similarity_method not in vectors:
+                return None
+
+            self._profiles.move_to_end(fingerprint)
+            return vectors[similarity_method].copy()
+
+    def put(self, fingerprint: str, vectors: dict[str, NDArray[np.float32]]):
+        """Cache copies of recommendation vectors of the profile.
+
+        Parameters
+        ----------
+        fingerprint : str
+            Fingerprint of the profile and the catalog.
+
+        vectors : dict[str, NDArray[np.float32]]
+            Normalised recommendation vectors keyed by the similarity method name.
+        """
+        with self._lock:
+            cached = self._profiles.setdefault(fingerprint, {})
+            cached.update({name: vector.copy() for name, vector in vectors.items()})
+            self._profiles.move_to_end(fingerprint)
+
+            if len(self._profiles) > self._max_profiles:
+                self._profiles.popitem(last=False)
+
+
+@final
+class ResultCache(object):
+    """Bounded least recently used cache of recommendations with time to live.
+
+    Recommendations are fully determined by `RecommenderConfig`, `SimilarityMethod`, `Precision`, contents of user's
+    lists and the version of the data mart, so they are cached under a canonical fingerprint of these inputs (see
+    `fingerprint`). The cache is cleared when the storage snapshot changes.
+
+    Attributes
+    ----------
+    max_entries : int
+        The maximum number of cached recommendations. The least recently used ones are evicted first.
+
+    ttl : float
+        Time to live of cached recommendations in seconds.
+
+    entries : OrderedDict[str, tuple[float, RecommendationResult]]
+        Expiration time and recommendations keyed by fingerprint.
+
+    snapshot : str, optional
+        Storage snapshot cached recommendations were calculated for.
+
+    hits : int
+        Number of requests served from the cache.
+
+    misses : int
+        Number of requests that required calculating recommendations.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        """Initialize the cache with the given parameters.
+
+        Parameters
+        ----------
+        max_entries : int
+            The maximum number of cached recommendations.
+
+        ttl : float
+            Time to live of cached recommendations in seconds.
+        """
+        self._max_entries: int = max_entries
+        self._ttl: float = ttl
+        self._entries: OrderedDict[str, tuple[float, RecommendationResult]] = OrderedDict()
+        self._snapshot: str | None = None
+        self._hits: int = 0
+        self._misses: int = 0
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'ResultCache(\n',
+                '  entries={entries},\n',
+                '  max_entries={max_entries},\n',
+                '  ttl={ttl},\n',
+                '  hit_ratio={hit_ratio})',
+            ],
+        )
+
+        return repr_template.format(
+            entries=len(self._entries),
+            max_entries=self._max_entries,
+            ttl=self._ttl,
+            hit_ratio=self.hit_ratio,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def hits(self) -> int:
+        """Return the number of requests served from the cache.
+
+        Returns
+        -------
+        int
+            The number of hits.
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Return the number of requests that required calculating recommendations.
+
+        Returns
+        -------
+        int
+            The number of misses.
+        """
+        return self._misses
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the share of requests served from the cache.
+
+        Returns
+        -------
+        float
+            Hit ratio in range from 0 to 1. 0 if there were no requests.
+        """
+        requests_count = self._hits + self._misses
+        return self._hits / requests_count if requests_count else 0.0
+
+    @staticmethod
+    def fingerprint(  # noqa: WPS211
+        recommender_config: RecommenderConfig,
+        similarity_method: SimilarityMethod,
+        precision: Precision,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray,
+        indexes_exclude: NDArray[np.uint32],
+        k: int | None,
+        offset: int,
+    ) -> str:
+        """Calculate canonical fingerprint of recommendation inputs.
+
+        Order of feature groups, lists and titles does not affect the fingerprint.
+
+        Parameters
+        ----------
+        recommender_config : RecommenderConfig
+            Recommender configuration.
+
+        similarity_method : SimilarityMethod
+            The similarity method.
+
+        precision : Precision
+            Numeric precision of calculations.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray
+            The scores of the titles to include in the calculation.
+
+        indexes_exclude : NDArray[np.uint32]
+            The indexes of the titles to exclude from the calculation.
+
+        k : int, optional
+            The number of recommendations.
+
+        offset : int
+            The number of top recommendations to skip.
+
+        Returns
+        -------
+        str
+            Hex digest of the inputs.
+        """
+        canonical = json.dumps(
+            {
+                'columns': sorted(recommender_config.columns),
+                'lists_include': sorted(recommender_config.lists_include or []),
+                'lists_exclude': sorted(recommender_config.lists_exclude or []),
+                'weighted': bool(recommender_config.weighted),
+                'scaled': bool(recommender_config.scaled),
+                'scale_range': [float(bound) for bound in recommender_config.scale_range or []],
+                'is_titles': bool(recommender_config.is_titles),
+                'titles': sorted(recommender_config.titles or []),
+                'column_weights': sorted((recommender_config.column_weights or {}).items()),
+                'low_rank': bool(recommender_config.low_rank),
+                'similarity_method': similarity_method.name,
+                'precision': precision.name,
+                'profile': profile_fingerprint(indexes_include, scores),
+                'exclude': profile_fingerprint(np.unique(indexes_exclude), np.array([], dtype=np.float32)),
+                'k': k,
+                'offset': offset,
+            },
+            sort_keys=True,
+            default=str,
+        )
+
+        return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+    def get(self, fingerprint: str, snapshot: str) -> RecommendationResult | None:
+        """Get cached recommendations.
+
+        Parameters
+        ----------
+        fingerprint : str
+            Fingerprint of recommendation inputs.
+
+        snapshot : str
+            Current storage snapshot. If it differs from the one of cached recommendations, the cache is cleared.
+
+        Returns
+        -------
+        RecommendationResult, optional
+            Copy of cached recommendations or None if they are missing or expired.
+        """
+        with self._lock:
+            self._validate_snapshot(snapshot)
+            entry = self._entries.get(fingerprint)
+
+            if entry is None or entry[0] < monotonic():
+                self._entries.pop(fingerprint, None)
+                self._misses += 1
+                return None
+
+            self._hits += 1
+            self._entries.move_to_end(fingerprint)
+            return entry[1].copy()
+
+    def put(self, fingerprint: str, snapshot: str, recommendations: RecommendationResult):
+        """Cache recommendations.
+
+        Parameters
+        ----------
+        fingerprint : str
+            Fingerprint of recommendation inputs.
+
+        snapshot : str
+            Storage snapshot recommendations were calculated for.
+
+        recommendations : RecommendationResult
+            Recommendations to cache.
+        """
+        with self._lock:
+            self._validate_snapshot(snapshot)
+            self._entries[fingerprint] = (monotonic() + self._ttl, recommendations.copy())
+            self._entries.move_to_end(fingerprint)
+
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached recommendations. Counters are preserved."""
+        with self._lock:
+            self._entries.clear()
+
+    def _validate_snapshot(self, snapshot: str):
+        """Clear the cache if the storage snapshot has changed.
+
+        Parameters
+        ----------
+        snapshot : str
+            Current storage snapshot.
         """
-        return self.__repr__()
+        if self._snapshot != snapshot:
+            self._entries.clear()
+            self._snapshot = snapshot
 
 
-class VectorUtility(IVectorUtility):  # noqa: WPS214
-    """A utility class for calculating recommendation vector.
+@final
+class Catalog(object):
+    """Catalog-side artifacts of one combination of feature groups, similarity method, precision and representation.
+
+    Artifacts depend on the data mart only, so they are shared by requests and never modified: the matrix of features
+    (mapped if the similarity method uses a feature map), squared row norms, distinct rows and indexes. Everything that
+    depends on the request (user's titles, scores and the result vector) is kept by `Recommender` and `VectorUtility`.
+    In low-rank mode all artifacts are built from the matrix of reduced features (`IStorage.low_rank_factors`).
 
     Attributes
     ----------
-    chunk_size : np.uint16
-        The size of the chunks to process.
+    storage : IStorage
+        The storage instance the artifacts are cached by, pinned to the version of the data mart they were built from.
 
-    matrix_size : int, default: 0
-            The size of the matrix to process.
+    columns : list[str]
+        Feature groups of the matrix of features.
 
-    result_vector : NDArray[np.float16]
-        The result vector of the calculation.
+    similarity_method : SimilarityMethod
+        The similarity method the artifacts are built for.
+
+    precision : Precision
+        Numeric precision the artifacts are built for.
+
+    low_rank : bool
+        Whether the artifacts are built from the matrix of reduced features.
+
+    snapshot : str
+        Storage snapshot the artifacts were built from.
+
+    matrix : NDArray[np.float32]
+        Matrix of features, mapped if the similarity method uses a feature map.
+
+    row_norms : NDArray[np.float32], optional
+        Squared norms of rows of the matrix of features if required by the similarity method.
+
+    unique_rows : UniqueRows, optional
+        Index of distinct rows of the matrix of features if distinct rows are at most `config.unique_rows_max_ratio`
+        of titles, e.g. when only low-cardinality feature groups are selected.
+
+    block_top_k : BlockTopK, optional
+        Index of blocks of titles for linear similarity methods if `config.top_k_block_size` is positive.
     """
 
-    def __init__(self, similarity_method: SimilarityMethod):
-        """Initialize the utility class with the given parameters.
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the Catalog class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the Catalog class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not Catalog:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(  # noqa: WPS211
+        self,
+        storage: IStorage,
+        columns: list[str],
+        similarity_method: SimilarityMethod,
+        precision: Precision,
+        low_rank: bool = False,
+    ):
+        """Build or get cached artifacts from the storage.
 
         Parameters
         ----------
+        storage : IStorage
+            IStorage interface implementation. The currently loaded version of the data mart is pinned.
+
+        columns : list[str]
+            Feature groups to include in the calculation.
+
         similarity_method : SimilarityMethod
-            SimilarityMethod class that provides the similarity method function.
+            The similarity method to use.
+
+        precision : Precision
+            Numeric precision of calculations.
+
+        low_rank : bool, default: False
+            Whether to build the artifacts from the matrix of reduced features.
         """
+        storage = storage.pin()
+        self._storage: IStorage = storage
+        self._columns: list[str] = list(columns)
         self._similarity_method: SimilarityMethod = similarity_method
-        self._matrix_size: int = 0
-        self._result_vector: NDArray[np.float16] = np.zeros((self._matrix_size,), dtype=np.float16)
-        self._chunk_size: np.uint16 = np.uint16(config.chunk_size)
+        self._precision: Precision = precision
+        self._low_rank: bool = low_rank
+        self._snapshot: str = storage.snapshot
+
+        storage_dtype = precision.storage_dtype
+        self._matrix: NDArray[np.float32] = storage.matrix(self._columns, storage_dtype, low_rank)
+
+        if similarity_method.uses_feature_map:
+            feature_map = similarity_method.feature_map
+            self._matrix = storage.matrix_artifact(
+                self._columns,
+                feature_map.key,
+                feature_map.transform,
+                storage_dtype,
+                low_rank,
+            )
+
+        self._row_norms: NDArray[np.float32] | None = None
+
+        if similarity_method.uses_row_norms:
+            self._row_norms = storage.matrix_artifact(
+                self._columns,
+                'row_norms',
+                RBFEngine.row_norms,
+                storage_dtype,
+                low_rank,
+            )
+
+        self._unique_rows: UniqueRows | None = self._query_unique_rows()
+        self._block_top_k: BlockTopK | None = None
+
+        if similarity_method.is_linear and config.top_k_block_size > 0:
+            block_top_k = BlockTopK(config.top_k_block_size)
+
+            if low_rank:
+                groups = storage.low_rank_groups(self._columns)
+            else:
+                metadata = storage.metadata
+                groups = metadata[metadata.column_name.isin(self._columns)].column_name.values
+
+            self._block_top_k = storage.matrix_artifact(
+                self._columns,
+                block_top_k.key,
+                partial(block_top_k.fit, groups=groups),
+                storage_dtype,
+                low_rank,
+            )
 
     def __repr__(self) -> str:
         """Return the string representation of the class.
@@ -208,15 +2757,25 @@ class VectorUtility(IVectorUtility):  # noqa: WPS214
         """
         repr_template = ''.join(
             [
-                'VectorUtility(\n',
+                'Catalog(\n',
+                '  columns={columns},\n',
                 '  similarity_method={similarity_method},\n',
-                '  chunk_size={chunk_size})',
+                '  precision={precision},\n',
+                '  low_rank={low_rank},\n',
+                '  matrix_shape={matrix_shape},\n',
+                '  unique_rows={unique_rows},\n',
+                '  block_top_k={block_top_k})',
             ],
         )
 
         return repr_template.format(
+            columns=self._columns,
             similarity_method=self._similarity_method,
-            chunk_size=self._chunk_size,
+            precision=self._precision,
+            low_rank=self._low_rank,
+            matrix_shape=self._matrix.shape,
+            unique_rows=self._unique_rows.rows_count if self._unique_rows is not None else None,
+            block_top_k=self._block_top_k is not None,
         )
 
     def __str__(self) -> str:
@@ -229,152 +2788,157 @@ class VectorUtility(IVectorUtility):  # noqa: WPS214
         """
         return self.__repr__()
 
-    @property
-    def matrix_size(self) -> int:
-        """Return the size of the matrix to process.
-
-        Returns
-        -------
-        int
-            The size of the matrix to process.
-        """
-        return self._matrix_size
-
-    @matrix_size.setter
-    def matrix_size(self, matrix_size: int):
-        self._matrix_size = matrix_size
-        self._result_vector = np.zeros((matrix_size,), dtype=np.float16)
-
-    def accumulate_chunked_results(
-        self,
-        indexes_include: NDArray[np.uint32],
-        scores: NDArray[np.uint8],
-        scores_sum: np.uint32,
-        matrix: NDArray[np.float64],
-    ):
-        """Calculate the accumulated recommendation vector by processing chunks of indexes and scores.
+    @staticmethod
+    def key(
+        columns: list[str],
+        similarity_method: SimilarityMethod,
+        precision: Precision,
+        low_rank: bool = False,
+    ) -> tuple:
+        """Return the key identifying artifacts of the combination.
 
         Parameters
         ----------
-        indexes_include : NDArray[np.uint32]
-            The indexes of the titles to include in the calculation.
+        columns : list[str]
+            Feature groups of the matrix of features.
 
-        scores : NDArray[np.uint8]
-            The scores of the titles to include in the calculation.
+        similarity_method : SimilarityMethod
+            The similarity method.
 
-        scores_sum : np.uint32
-            The sum of the scores of the titles to include in the calculation.
+        precision : Precision
+            Numeric precision of calculations.
 
-        matrix : NDArray[np.float64]
-            The matrix of features.
-        """
-        num_iterations: int = max(
-            int(np.round(indexes_include.shape[0] / self._chunk_size)),
-            1,
-        )
+        low_rank : bool, default: False
+            Whether the artifacts are built from the matrix of reduced features.
 
-        for iteration_num in range(1, num_iterations + 1):
-            indexes_chunk, scores_chunk = self._get_iteration_chunk(iteration_num, indexes_include, scores)
-            self._result_vector += self._calculate_vector(indexes_chunk, scores_chunk, matrix)
+        Returns
+        -------
+        tuple
+            Feature groups, names of the similarity method and the precision, and the low-rank flag.
+        """
+        return frozenset(columns), similarity_method.name, precision.name, low_rank
 
-        self._result_vector = (self._result_vector / scores_sum).astype(np.float16)
+    @property
+    def snapshot(self) -> str:
+        """Return the storage snapshot the artifacts were built from.
 
-    def extract_sorted_recommendations(
-        self,
-        storage: IStorage,
-        indexes_include: NDArray[np.uint32],
-        indexes_exclude: NDArray[np.uint32],
-    ) -> NDArray[np.float32]:
-        """Extract the top sorted recommendations from the result vector.
+        Returns
+        -------
+        str
+            Identifier of the version of the data mart.
+        """
+        return self._snapshot
 
-        Parameters
-        ----------
-        storage : IStorage
-            The storage instance to use for retrieving titles' information.
+    @property
+    def low_rank(self) -> bool:
+        """Return whether the artifacts are built from the matrix of reduced features.
 
-        indexes_include : NDArray[np.uint32]
-            The indexes of the titles to include in the calculation.
+        Returns
+        -------
+        bool
+            The low-rank flag of the catalog.
+        """
+        return self._low_rank
 
-        indexes_exclude : NDArray[np.uint32]
-            The indexes of the titles to exclude from the calculation.
+    @property
+    def matrix(self) -> NDArray[np.float32]:
+        """Return the matrix of features.
 
         Returns
         -------
         NDArray[np.float32]
-            An array containing the top recommended items indexes and their scores.
+            Matrix of features in the storage data type, mapped if the similarity method uses a feature map.
         """
-        index_sorted = np.argsort(-self._result_vector)
-        combined_indexes = np.union1d(indexes_include, indexes_exclude)
-        result_indexes = index_sorted[~np.isin(index_sorted, combined_indexes)]
-
-        scaled_scores = minmax_scale(self._result_vector[result_indexes])
-        scaled_scores = scaled_scores.reshape(-1, 1).astype(np.float32)
-
-        item_ids = storage.info.iloc[result_indexes]
-        item_ids = item_ids.id.values.reshape(-1, 1).astype(np.float32)
+        return self._matrix
 
-        return np.hstack([item_ids, scaled_scores])
+    @property
+    def row_norms(self) -> NDArray[np.float32] | None:
+        """Return squared norms of rows of the matrix of features.
 
-    def _calculate_vector(
-        self,
-        indexes: NDArray[np.uint32],
-        scores: NDArray[np.uint8],
-        matrix: NDArray[np.float64],
-    ) -> NDArray[np.float16]:
-        """Calculate vector of recommendations for given indexes and scores.
+        Returns
+        -------
+        NDArray[np.float32], optional
+            Squared row norms if required by the similarity method.
+        """
+        return self._row_norms
 
-        Parameters
-        ----------
-        indexes : NDArray[np.uint32]
-            Indexes of titles to include in the calculation.
+    @property
+    def unique_rows(self) -> UniqueRows | None:
+        """Return distinct rows of the matrix of features.
 
-        scores : NDArray[np.uint8]
-            Scores of titles to include in the calculation.
+        Returns
+        -------
+        UniqueRows, optional
+            Index of distinct rows if it pays off.
+        """
+        return self._unique_rows
 
-        matrix : NDArray[np.float64]
-            The matrix of features.
+    @property
+    def block_top_k(self) -> BlockTopK | None:
+        """Return the index of blocks of titles.
 
         Returns
         -------
-        NDArray[np.float16]
-            Vector of recommendations.
+        BlockTopK, optional
+            Index of blocks of titles if enabled for the similarity method.
         """
-        similarity_method = self._similarity_method.similarity_method
-        similarity_score = similarity_method(matrix[indexes], matrix).astype(np.float16) * scores
+        return self._block_top_k
 
-        return similarity_score.sum(axis=0).T
+    def ann_index(self) -> LowRankCandidates:
+        """Get the approximate nearest neighbours index of the catalog.
 
-    def _get_iteration_chunk(
-        self,
-        iteration_num: int,
-        indexes_include: NDArray[np.uint32],
-        scores: NDArray[np.uint8],
-    ) -> tuple[NDArray[np.uint32], NDArray[np.uint8]]:
-        """Get the indexes and scores for a specific chunk iteration.
+        The index is the matrix of reduced features of the feature groups, loaded from `config.low_rank_path` (or
+        factorised) on first use only, since it is used in title mode for a few titles. In low-rank mode the whole
+        catalog is already scored with reduced features, so the index is not available.
 
-        Parameters
-        ----------
-        iteration_num : int
-            The iteration number for which to retrieve the chunk data.
+        Returns
+        -------
+        LowRankCandidates
+            Index over the cached matrix of reduced features and its row norms.
 
-        indexes_include : NDArray[np.uint32]
-            The indexes of the titles to include in the calculation.
+        Raises
+        ------
+        ValueError
+            If the catalog is built from the matrix of reduced features.
+        """
+        if self._low_rank:
+            raise ValueError('Approximate nearest neighbours index is not available in low-rank mode.')
 
-        scores : NDArray[np.uint8]
-            The scores of the titles to include in the calculation.
+        matrix = self._storage.matrix(self._columns, np.float32, low_rank=True)
+        row_norms = self._storage.matrix_artifact(self._columns, 'row_norms', RBFEngine.row_norms, np.float32, True)
+
+        return LowRankCandidates(matrix, row_norms)
+
+    def _query_unique_rows(self) -> UniqueRows | None:
+        """Get distinct rows of the matrix of features cached per combination of feature groups.
 
         Returns
         -------
-        tuple[NDArray[np.uint32], NDArray[np.uint8]]
-            The indexes and scores for the specified iteration.
+        UniqueRows, optional
+            Index of distinct rows or None if it is disabled or distinct rows are too many to pay off.
         """
-        range_start = (iteration_num - 1) * self._chunk_size
-        range_end = iteration_num * self._chunk_size
+        if config.unique_rows_max_ratio <= 0:
+            return None
+
+        unique_rows = UniqueRows()
+        key, fit = unique_rows.key, unique_rows.fit
+
+        if self._similarity_method.uses_feature_map:
+            key = key + self._similarity_method.feature_map.key
+            fit = partial(unique_rows.fit, transform=self._similarity_method.feature_map.transform)
+
+        unique_rows = self._storage.matrix_artifact(
+            self._columns,
+            key,
+            fit,
+            self._precision.storage_dtype,
+            self._low_rank,
+        )
 
-        indexes_chunk = indexes_include[range_start:range_end]
-        scores_chunk = scores[range_start:range_end]
+        if unique_rows.rows_count > config.unique_rows_max_ratio * unique_rows.titles_count:
+            return None
 
-        return indexes_chunk, scores_chunk
+        return unique_rows
 
 
 @final
@@ -402,9 +2966,47 @@ class Recommender(IRecommender):
         Sum of user's scores for titles to include in the calculation. If `weighted` is False or `is_titles` is True,
         the attribute is 1.
 
-    matrix : NDArray[np.float64]
-        Matrix of features for all titles in the storage. Selected from storage with method `select` on premise that
+    matrix : NDArray[np.float32]
+        Matrix of features for all titles in the storage. Selected from storage with method `matrix` on premise that
         `columns` have at least one feature.
+
+    catalog : Catalog
+        Catalog-side artifacts of the request: the matrix of features, row norms, distinct rows and indexes.
+
+    group_scores : GroupScores, optional
+        Cache of per-feature-group partial score vectors. If given and the similarity method is linear, the
+        recommendation vector is combined from cached partial score vectors.
+
+    title_scores : TitleScores, optional
+        Accumulators of similarity rows of titles kept between recommendations per session. If given and `is_titles`
+        is True, the recommendation vector is updated with deltas of added and removed titles (unless `group_scores` is
+        used).
+
+    result_cache : ResultCache, optional
+        Cache of recommendations. If given, recommendations for the same inputs are returned without calculation.
+
+    kernel_scores : KernelScores, optional
+        Cache of recommendation vectors of similarity methods sharing a pass over the catalog. If given, RBF passes
+        also emit the linear kernel vector, and cached vectors of the profile are used instead of scoring. Not used if
+        `column_weights` are set, since weights are applied by `GroupScores` and `BlockTopK` only.
+
+    ann_index : LowRankCandidates, optional
+        Approximate nearest neighbours index used if `is_titles` is True, at most `config.ann_max_titles` titles are
+        chosen and the similarity method is not scored through a profile vector (such methods take a single product
+        anyway). Only candidate neighbours of chosen titles are scored exactly. If candidates are too few to fill the
+        requested page, the whole catalog is scored.
+
+    block_top_k : BlockTopK, optional
+        Index of blocks of titles used for linear similarity methods if `config.top_k_block_size` is positive. Pages
+        of recommendations are then found by scoring only blocks of titles that can enter them.
+
+    shards : ShardedCatalog, optional
+        Catalog scored by shards of titles. If given, pages of recommendations are merged from top-k lists of shards
+        unless the recommendation vector of the profile is cached by `kernel_scores`. Not used in low-rank mode, if
+        `column_weights` are set or shards are sliced from another snapshot of the storage.
+
+    session : Hashable
+        Identifier of the session keying the accumulator of `title_scores`.
     """
 
     def __init_subclass__(cls, **kwargs):
@@ -425,12 +3027,20 @@ class Recommender(IRecommender):
         if cls is not Recommender:
             raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
 
-    def __init__(
+    def __init__(  # noqa: WPS211
         self,
         client: IClient,
         storage: IStorage,
         recommender_config: RecommenderConfig,
         vector_utility: VectorUtility,
+        group_scores: GroupScores | None = None,
+        title_scores: TitleScores | None = None,
+        result_cache: ResultCache | None = None,
+        catalog: Catalog | None = None,
+        profile_centroids: ProfileCentroids | None = None,
+        kernel_scores: KernelScores | None = None,
+        shards: 'ShardedCatalog | None' = None,
+        session: Hashable | None = None,
     ):
         """Initialize the Recommender with the given parameters.
 
@@ -440,24 +3050,54 @@ class Recommender(IRecommender):
             IClient interface implementation.
 
         storage : IStorage
-            IStorage interface implementation.
+            IStorage interface implementation. The currently loaded version of the data mart is pinned, so the whole
+            request reads the same version (see `IStorage.pin`). It should match the version of `catalog`.
 
         recommender_config : RecommenderConfig
             Recommender configuration class containing all other parameters from UI.
 
         vector_utility : VectorUtility
             VectorUtility class providing methods for calculating vector of recommendations.
+
+        group_scores : GroupScores, optional
+            Cache of per-feature-group partial score vectors.
+
+        title_scores : TitleScores, optional
+            Accumulators of similarity rows of titles kept between recommendations in title mode per session.
+
+        result_cache : ResultCache, optional
+            Cache of recommendations.
+
+        catalog : Catalog, optional
+            Catalog-side artifacts of the feature groups, the similarity method and the precision of the vector utility,
+            e.g. shared by `RecommendationEngine`. If None, artifacts are looked up in the storage.
+
+        profile_centroids : ProfileCentroids, optional
+            Cache of weighted centroids of user's titles passed to the vector utility.
+
+        kernel_scores : KernelScores, optional
+            Cache of recommendation vectors of similarity methods sharing a pass over the catalog.
+
+        shards : ShardedCatalog, optional
+            Catalog scored by shards of titles.
+
+        session : Hashable, optional
+            Identifier of the session keying the accumulator of `title_scores`. If None, the client is used.
         """
         self._client: IClient = client
-        self._storage: IStorage = storage
+        self._storage: IStorage = storage.pin()
         self._recommender_config: RecommenderConfig = recommender_config
         self._vector_utility: VectorUtility = vector_utility
+        self._group_scores: GroupScores | None = group_scores
+        self._title_scores: TitleScores | None = title_scores
+        self._session: Hashable = session if session is not None else client
+        self._result_cache: ResultCache | None = result_cache
 
         self._indexes_include: NDArray[np.uint32]
         self._indexes_exclude: NDArray[np.uint32]
         self._scores: NDArray[np.uint8]
         self._scores_sum: np.uint32
-        self._matrix: NDArray[np.float64]
+        self._matrix: NDArray[np.float32]
 
         if recommender_config.is_titles:
             storage_info = self._storage.info
@@ -496,11 +3136,38 @@ class Recommender(IRecommender):
             else np.uint32(1)  # noqa: WPS221
         )
 
-        storage_metadata = self._storage.metadata
-        storage_data = self._storage.data
-        metadata_indexes = storage_metadata[storage_metadata.column_name.isin(recommender_config.columns)].index
-        self._matrix = storage_data.iloc[:, metadata_indexes].values
+        self._catalog: Catalog = (
+            catalog
+            if catalog is not None
+            else Catalog(
+                self._storage,
+                recommender_config.columns,
+                vector_utility.similarity_method,
+                vector_utility.precision,
+                recommender_config.low_rank,
+            )
+        )
+        self._matrix = self._catalog.matrix
         self._vector_utility.matrix_size = self._matrix.shape[0]
+        self._vector_utility.row_norms = self._catalog.row_norms
+        self._vector_utility.unique_rows = self._catalog.unique_rows
+        self._vector_utility.profile_centroids = profile_centroids
+
+        column_weights = (recommender_config.column_weights or {}).values()
+        is_unweighted = all(weight == 1 for weight in column_weights)
+        self._kernel_scores: KernelScores | None = kernel_scores if is_unweighted else None
+        self._vector_utility.shares_dot_products = self._kernel_scores is not None
+
+        is_sharded = shards is not None and shards.snapshot == self._catalog.snapshot and not self._catalog.low_rank
+        self._shards: ShardedCatalog | None = shards if is_sharded and is_unweighted else None
+
+        similarity_method = self._vector_utility.similarity_method
+        is_few_titles = 0 < self._indexes_include.shape[0] <= config.ann_max_titles
+        is_profile_vector = similarity_method.is_linear or similarity_method.uses_feature_map
+        is_ann = recommender_config.is_titles and is_few_titles and not is_profile_vector and not self._catalog.low_rank
+
+        self._ann_index: LowRankCandidates | None = self._catalog.ann_index() if is_ann else None
+        self._block_top_k: BlockTopK | None = self._catalog.block_top_k
 
     def __repr__(self) -> str:
         """Return a representation of the Recommender object.
@@ -547,26 +3214,207 @@ class Recommender(IRecommender):
         """
         return self.__repr__()
 
-    def recommend(self) -> NDArray[np.float32]:
+    def recommend(self, k: int | None = None, offset: int = 0) -> RecommendationResult:
         """Generate recommendations based on the provided indexes and scores.
 
+        Parameters
+        ----------
+        k : int, optional
+            The number of recommendations to return. If None, all titles are returned.
+
+        offset : int, default: 0
+            The number of top recommendations to skip. Used for paging together with `k`.
+
         Returns
         -------
-        NDArray[np.float32]
-            Array of recommended items. An empty array is returned if there are no indexes to consider.
+        RecommendationResult
+            Recommended titles with their scores. An empty result is returned if there are no indexes to consider.
         """
         if self._indexes_include.shape[0]:
-            self._vector_utility.accumulate_chunked_results(
+            fingerprint = None
+
+            if self._result_cache is not None:
+                fingerprint = ResultCache.fingerprint(
+                    self._recommender_config,
+                    self._vector_utility.similarity_method,
+                    self._vector_utility.precision,
+                    self._indexes_include,
+                    self._scores,
+                    self._indexes_exclude,
+                    k,
+                    offset,
+                )
+                recommendations = self._result_cache.get(fingerprint, self._catalog.snapshot)
+
+                if recommendations is not None:
+                    return recommendations
+
+            kernel_fingerprint, shared_vector = self._query_shared_vector()
+
+            if shared_vector is None and self._shards is not None and k is not None:
+                recommendations = self._shards.recommend(
+                    self._storage,
+                    self._recommender_config.columns,
+                    self._vector_utility.similarity_method,
+                    self._vector_utility.precision,
+                    self._indexes_include,
+                    self._scores,
+                    self._indexes_exclude,
+                    k,
+                    offset,
+                )
+            elif shared_vector is None and self._block_top_k is not None and k is not None:
+                recommendations = self._vector_utility.extract_pruned_recommendations(
+                    self._storage,
+                    self._block_top_k,
+                    self._indexes_include,
+                    self._scores,
+                    self._scores_sum,
+                    self._matrix,
+                    self._indexes_exclude,
+                    k,
+                    offset,
+                    self._recommender_config.column_weights,
+                )
+            else:
+                self._calculate_result_vector(k, offset, shared_vector, kernel_fingerprint)
+                recommendations = self._vector_utility.extract_sorted_recommendations(
+                    self._storage,
+                    self._indexes_include,
+                    self._indexes_exclude,
+                    k,
+                    offset,
+                )
+
+            if fingerprint is not None:
+                self._result_cache.put(fingerprint, self._catalog.snapshot, recommendations)
+
+            if Workspace.hooks:
+                Workspace.report()
+
+            return recommendations
+
+        return RecommendationResult.empty()
+
+    def _calculate_result_vector(
+        self,
+        k: int | None,
+        offset: int,
+        shared_vector: NDArray[np.float32] | None = None,
+        kernel_fingerprint: str | None = None,
+    ):
+        """Calculate the recommendation vector of the vector utility.
+
+        Parameters
+        ----------
+        k : int, optional
+            The number of recommendations to return.
+
+        offset : int
+            The number of top recommendations to skip.
+
+        shared_vector : NDArray[np.float32], optional
+            Recommendation vector of the profile cached by `KernelScores`. If given, it is used as is.
+
+        kernel_fingerprint : str, optional
+            Fingerprint of the profile in `KernelScores`. If given, vectors of a pass over the whole catalog are cached.
+        """
+        if shared_vector is not None:
+            self._vector_utility.result_vector = shared_vector
+            return
+
+        candidates = self._query_candidates(k, offset)
+
+        is_group_scores = self._group_scores is not None and self._vector_utility.similarity_method.is_linear
+
+        if is_group_scores and not self._catalog.low_rank:
+            self._vector_utility.result_vector = self._group_scores.combine(
+                self._indexes_include,
+                self._scores,
+                self._scores_sum,
+                self._recommender_config.columns,
+                self._recommender_config.column_weights,
+                self._vector_utility.precision,
+                self._storage,
+            )
+        elif candidates is not None:
+            self._vector_utility.accumulate_candidates(
                 self._indexes_include,
                 self._scores,
                 self._scores_sum,
                 self._matrix,
+                candidates,
             )
-
-            return self._vector_utility.extract_sorted_recommendations(
-                self._storage,
+        elif self._title_scores is not None and self._recommender_config.is_titles:
+            self._vector_utility.result_vector = self._title_scores.update(
+                self._session,
+                self._recommender_config.columns,
+                self._indexes_include,
+                self._matrix,
+                self._vector_utility,
+                self._catalog.snapshot,
+                self._catalog.low_rank,
+            )
+        else:
+            self._vector_utility.accumulate_chunked_results(
                 self._indexes_include,
-                self._indexes_exclude,
+                self._scores,
+                self._scores_sum,
+                self._matrix,
             )
 
-        return np.array([])
+            if kernel_fingerprint is not None:
+                self._kernel_scores.put(kernel_fingerprint, self._vector_utility.shared_vectors)
+
+    def _query_shared_vector(self) -> tuple[str | None, NDArray[np.float32] | None]:
+        """Find the recommendation vector of the profile emitted by an earlier pass over the catalog.
+
+        Returns
+        -------
+        tuple[str | None, NDArray[np.float32] | None]
+            Fingerprint of the profile in `KernelScores` and the cached vector of the similarity method, if any. Both
+            are None if `kernel_scores` is not used.
+        """
+        if self._kernel_scores is None:
+            return None, None
+
+        similarity_method = self._vector_utility.similarity_method
+        fingerprint = KernelScores.fingerprint(
+            Catalog.key(
+                self._recommender_config.columns,
+                similarity_method,
+                self._vector_utility.precision,
+                self._catalog.low_rank,
+            ),
+            self._catalog.snapshot,
+            self._indexes_include,
+            self._scores,
+        )
+
+        return fingerprint, self._kernel_scores.get(fingerprint, similarity_method.name)
+
+    def _query_candidates(self, k: int | None, offset: int) -> NDArray[np.intp] | None:
+        """Find candidate titles with the approximate nearest neighbours index.
+
+        Parameters
+        ----------
+        k : int, optional
+            The number of recommendations to return.
+
+        offset : int
+            The number of top recommendations to skip.
+
+        Returns
+        -------
+        NDArray[np.intp], optional
+            The indexes of candidate titles or None if the index is not used or candidates are too few to fill the page.
+        """
+        if self._ann_index is None or k is None:
+            return None
+
+        candidates = self._ann_index.query(self._indexes_include, self._scores, config.ann_candidates)
+
+        if candidates.shape[0] < self._indexes_include.shape[0] + offset + k + config.top_k_margin:
+            return None
+
+        return candidates
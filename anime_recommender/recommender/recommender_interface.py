@@ -8,6 +8,7 @@ from abc import ABCMeta, abstractmethod
 import numpy as np
 from numpy.typing import NDArray
 
+from anime_recommender.recommender.result import RecommendationResult
 from anime_recommender.storage.IStorage import IStorage
 
 
@@ -20,7 +21,7 @@ class IVectorUtility(object, metaclass=ABCMeta):
         indexes_include: NDArray[np.uint32],
         scores: NDArray[np.uint8],
         scores_sum: np.uint32,
-        matrix: NDArray[np.float64],
+        matrix: NDArray[np.float32],
     ):
         """Calculate the accumulated recommendation vector by processing chunks of indexes and scores.
 
@@ -35,7 +36,7 @@ class IVectorUtility(object, metaclass=ABCMeta):
         scores_sum : np.uint32
             The sum of the scores of the titles to include in the calculation.
 
-        matrix : NDArray[np.float64]
+        matrix : NDArray[np.float32]
             The matrix of features.
         """
 
@@ -45,7 +46,9 @@ class IVectorUtility(object, metaclass=ABCMeta):
         storage: IStorage,
         indexes_include: NDArray[np.uint32],
         indexes_exclude: NDArray[np.uint32],
-    ) -> NDArray[np.float32]:
+        k: int | None = None,
+        offset: int = 0,
+    ) -> RecommendationResult:
         """Extract the top sorted recommendations from the result vector.
 
         Parameters
@@ -59,10 +62,16 @@ class IVectorUtility(object, metaclass=ABCMeta):
         indexes_exclude : NDArray[np.uint32]
             The indexes of the titles to exclude from the calculation.
 
+        k : int, optional
+            The number of recommendations to extract. If None, all titles are returned.
+
+        offset : int, default: 0
+            The number of top recommendations to skip. Used for paging together with `k`.
+
         Returns
         -------
-        NDArray[np.float32]
-            An array containing the top recommended items indexes and their scores.
+        RecommendationResult
+            Recommended titles with their scores.
         """
 
 
@@ -70,11 +79,19 @@ class IRecommender(object, metaclass=ABCMeta):
     """A recommender system interface."""
 
     @abstractmethod
-    def recommend(self) -> NDArray[np.float32]:
+    def recommend(self, k: int | None = None, offset: int = 0) -> RecommendationResult:
         """Generate recommendations based on the provided indexes and scores.
 
+        Parameters
+        ----------
+        k : int, optional
+            The number of recommendations to return. If None, all titles are returned.
+
+        offset : int, default: 0
+            The number of top recommendations to skip. Used for paging together with `k`.
+
         Returns
         -------
-        NDArray[np.float32]
-            Array of recommended items. An empty array is returned if there are no indexes to consider.
+        RecommendationResult
+            Recommended titles with their scores. An empty result is returned if there are no indexes to consider.
         """
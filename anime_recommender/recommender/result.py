@@ -0,0 +1,283 @@
+"""Recommendation result module.
+
+Provides the `RecommendationResult` class, a compact container of recommended titles returned by recommenders. Ids
+are kept as int32 and scores as float32 in separate arrays, so AniList ids are exact. Titles are sorted lazily, only as
+far as requested pages need.
+"""
+
+from typing import final
+
+import numpy as np
+import pandas as pd
+from numpy.typing import NDArray
+from pandas import DataFrame
+
+
+@final
+class RecommendationResult(object):
+    """Recommended titles with their scores.
+
+    Attributes
+    ----------
+    ids : NDArray[np.int32]
+        External (AniList) ids of recommended titles.
+
+    scores : NDArray[np.float32]
+        Scores of recommended titles in range from 0 to 1.
+
+    indexes : NDArray[np.int32]
+        Internal indexes of recommended titles, i.e. positions of titles in the storage's info.
+
+    is_sorted : bool
+        Whether titles are sorted by score (descending) and then by internal index. Unsorted results are sorted on
+        first access to the arrays and pages are selected partially.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the RecommendationResult class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the RecommendationResult class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not RecommendationResult:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(
+        self,
+        ids: NDArray[np.int32],
+        scores: NDArray[np.float32],
+        indexes: NDArray[np.int32],
+        is_sorted: bool = False,
+    ):
+        """Initialize the RecommendationResult with the given parameters.
+
+        Parameters
+        ----------
+        ids : NDArray[np.int32]
+            External ids of recommended titles.
+
+        scores : NDArray[np.float32]
+            Scores of recommended titles.
+
+        indexes : NDArray[np.int32]
+            Internal indexes of recommended titles.
+
+        is_sorted : bool, default: False
+            Whether titles are already sorted by score and then by internal index.
+        """
+        self._ids: NDArray[np.int32] = np.asarray(ids, dtype=np.int32)
+        self._scores: NDArray[np.float32] = np.asarray(scores, dtype=np.float32)
+        self._indexes: NDArray[np.int32] = np.asarray(indexes, dtype=np.int32)
+        self._is_sorted: bool = is_sorted
+
+    def __repr__(self) -> str:
+        """Return a representation of the RecommendationResult object.
+
+        Returns
+        -------
+        str
+            A representation of the RecommendationResult object.
+        """
+        repr_template = ''.join(
+            [
+                'RecommendationResult(\n',
+                '  size={size},\n',
+                '  is_sorted={is_sorted})',
+            ],
+        )
+
+        return repr_template.format(
+            size=len(self),
+            is_sorted=self._is_sorted,
+        )
+
+    def __str__(self) -> str:
+        """Return a string representation of the RecommendationResult object.
+
+        Returns
+        -------
+        str
+            A string representation of the RecommendationResult object.
+        """
+        return self.__repr__()
+
+    def __len__(self) -> int:
+        """Return the number of recommended titles.
+
+        Returns
+        -------
+        int
+            The number of recommended titles.
+        """
+        return self._ids.shape[0]
+
+    @classmethod
+    def empty(cls) -> 'RecommendationResult':
+        """Create result without titles.
+
+        Returns
+        -------
+        RecommendationResult
+            Empty result.
+        """
+        return cls(
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.float32),
+            np.empty(0, dtype=np.int32),
+            is_sorted=True,
+        )
+
+    @property
+    def ids(self) -> NDArray[np.int32]:
+        """Return external ids of recommended titles in the sorted order.
+
+        Returns
+        -------
+        NDArray[np.int32]
+            External ids of recommended titles.
+        """
+        self._sort()
+        return self._ids
+
+    @property
+    def scores(self) -> NDArray[np.float32]:
+        """Return scores of recommended titles in the sorted order.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Scores of recommended titles.
+        """
+        self._sort()
+        return self._scores
+
+    @property
+    def indexes(self) -> NDArray[np.int32]:
+        """Return internal indexes of recommended titles in the sorted order.
+
+        Returns
+        -------
+        NDArray[np.int32]
+            Internal indexes of recommended titles.
+        """
+        self._sort()
+        return self._indexes
+
+    @property
+    def is_sorted(self) -> bool:
+        """Return whether titles are sorted.
+
+        Returns
+        -------
+        bool
+            True if titles are sorted, False otherwise.
+        """
+        return self._is_sorted
+
+    def page(self, offset: int, k: int) -> 'RecommendationResult':
+        """Select a page of top recommendations.
+
+        If the result is not sorted yet, only titles scored at least as high as the `offset + k`-th one are selected
+        with `np.argpartition` and sorted, so titles tied at the end of the page are ordered by index as in the sorted
+        result.
+
+        Parameters
+        ----------
+        offset : int
+            The number of top recommendations to skip.
+
+        k : int
+            The number of recommendations in the page.
+
+        Returns
+        -------
+        RecommendationResult
+            Sorted page of recommendations. Arrays are views of the arrays of the result if it is sorted.
+        """
+        range_end = min(offset + k, len(self))
+
+        if offset >= range_end:
+            return RecommendationResult.empty()
+
+        if self._is_sorted:
+            page_range = slice(offset, range_end)
+            return RecommendationResult(
+                self._ids[page_range],
+                self._scores[page_range],
+                self._indexes[page_range],
+                is_sorted=True,
+            )
+
+        candidates = np.arange(len(self))
+
+        if range_end < len(self):
+            kth_score = self._scores[np.argpartition(-self._scores, range_end - 1)[range_end - 1]]
+            candidates = np.flatnonzero(self._scores >= kth_score)
+
+        candidates = candidates[np.lexsort((self._indexes[candidates], -self._scores[candidates]))][offset:range_end]
+
+        return RecommendationResult(
+            self._ids[candidates],
+            self._scores[candidates],
+            self._indexes[candidates],
+            is_sorted=True,
+        )
+
+    def copy(self) -> 'RecommendationResult':
+        """Return a deep copy of the result.
+
+        Returns
+        -------
+        RecommendationResult
+            Copy of the result.
+        """
+        return RecommendationResult(self._ids.copy(), self._scores.copy(), self._indexes.copy(), self._is_sorted)
+
+    def to_frame(self) -> DataFrame:
+        """Return DataFrame view of ids and scores of recommended titles in the sorted order.
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with `id` and `proba` columns backed by arrays of the result.
+        """
+        return DataFrame({'id': self.ids, 'proba': self.scores}, copy=False)
+
+    def join(self, info: DataFrame) -> DataFrame:
+        """Join titles' information to recommended titles.
+
+        Only rows of recommended titles are gathered from the info, so the join should be used on a page of the result.
+
+        Parameters
+        ----------
+        info : DataFrame
+            Titles' information indexed by internal indexes (storage's `info`).
+
+        Returns
+        -------
+        DataFrame
+            DataFrame with `id` and `proba` columns followed by other columns of the info.
+        """
+        titles_info = info.iloc[self.indexes].drop(columns='id').reset_index(drop=True)
+
+        return pd.concat([self.to_frame(), titles_info], axis=1)
+
+    def _sort(self):
+        """Sort titles by score (descending) and then by internal index, if they are not sorted yet."""
+        if self._is_sorted:
+            return
+
+        order = np.lexsort((self._indexes, -self._scores))
+        self._ids = self._ids[order]
+        self._scores = self._scores[order]
+        self._indexes = self._indexes[order]
+        self._is_sorted = True
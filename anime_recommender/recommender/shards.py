@@ -0,0 +1,1000 @@
+"""Catalog shards module.
+
+Provides `CatalogShard`, a contiguous range of titles of the data mart scored on its own, transports delivering
+requests to shards held by worker processes (`ProcessTransport`) or by shard servers on other hosts
+(`SocketTransport`, `serve_shard`), and `ShardedCatalog` merging per-shard top-k lists of recommendations into the
+global top-k. Shards hold only their rows, so the catalog side of scoring grows with the number of shards, not with the
+memory of a single process or host.
+"""
+
+import os
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.connection import Client, Connection, Listener
+from threading import Lock, Thread
+from typing import Any, final
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+from scipy.sparse import csr_matrix, issparse
+
+from anime_recommender.config import config
+from anime_recommender.recommender.recommender import Precision, RBFEngine, SimilarityMethod
+from anime_recommender.recommender.result import RecommendationResult
+from anime_recommender.storage import IStorage
+from anime_recommender.storage.MatrixCache import MatrixCache
+
+
+@final
+class CatalogShard(object):
+    """Contiguous range of titles of the data mart scored independently of other shards.
+
+    The shard keeps all feature columns of its titles and builds matrices of combinations of feature groups (mapped if
+    the similarity method uses a feature map) and squared row norms from them on first use, the same way as `Catalog`
+    does for the whole catalog. Feature maps are row-wise and the RBF coefficient depends on the number of features
+    only, so scores of a shard are the scores of its titles in the whole catalog.
+
+    Shards answer messages, tuples starting with the message name (see `handle`), so the same protocol is served to
+    worker processes and over sockets. Indexes of titles in messages and answers are indexes in the whole catalog.
+
+    Attributes
+    ----------
+    matrix : NDArray[np.float32]
+        All feature columns of titles of the shard in the order of metadata rows. Might be a sparse CSR matrix.
+
+    groups : NDArray[np.object_]
+        Feature group of every column of the matrix.
+
+    start : int
+        Index of the first title of the shard in the catalog.
+
+    snapshot : str
+        Storage snapshot the shard was sliced from.
+
+    matrix_cache : MatrixCache
+        Byte-budgeted cache of matrices and row norms of combinations of feature groups.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the CatalogShard class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the CatalogShard class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not CatalogShard:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(self, matrix: NDArray[np.float32], groups: NDArray[np.object_], start: int, snapshot: str):
+        """Initialize the shard with the given parameters.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            All feature columns of titles of the shard. Might be a sparse CSR matrix.
+
+        groups : NDArray[np.object_]
+            Feature group of every column of the matrix.
+
+        start : int
+            Index of the first title of the shard in the catalog.
+
+        snapshot : str
+            Storage snapshot the shard was sliced from.
+        """
+        self._matrix: NDArray[np.float32] = matrix
+        self._groups: NDArray[np.object_] = np.asarray(groups, dtype=object)
+        self._start: int = start
+        self._snapshot: str = snapshot
+        self._matrix_cache: MatrixCache = MatrixCache(config.matrix_cache_bytes)
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'CatalogShard(\n',
+                '  start={start},\n',
+                '  stop={stop},\n',
+                '  matrix_shape={matrix_shape},\n',
+                '  snapshot={snapshot})',
+            ],
+        )
+
+        return repr_template.format(
+            start=self._start,
+            stop=self.stop,
+            matrix_shape=self._matrix.shape,
+            snapshot=self._snapshot,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @staticmethod
+    def slice(storage: IStorage, index: int, shards_count: int) -> 'CatalogShard':
+        """Slice a shard of titles of the storage.
+
+        Titles are split into `shards_count` contiguous ranges of equal size (up to one title).
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to slice titles from.
+
+        index : int
+            Index of the shard, from 0 to `shards_count - 1`.
+
+        shards_count : int
+            The number of shards.
+
+        Returns
+        -------
+        CatalogShard
+            Shard with a copy of feature columns of its titles.
+
+        Raises
+        ------
+        ValueError
+            If the index is out of range of shards.
+        """
+        if not 0 <= index < shards_count:
+            raise ValueError(
+                'Shard index {index} is out of range of {shards_count} shards.'.format(
+                    index=index,
+                    shards_count=shards_count,
+                ),
+            )
+
+        storage = storage.pin()
+        groups = storage.metadata.column_name.values
+        matrix = storage.matrix(list(dict.fromkeys(groups)), np.float32)
+        start = matrix.shape[0] * index // shards_count
+        stop = matrix.shape[0] * (index + 1) // shards_count
+        shard_matrix = csr_matrix(matrix[start:stop]) if issparse(matrix) else np.array(matrix[start:stop])
+
+        return CatalogShard(shard_matrix, groups, start, storage.snapshot)
+
+    @staticmethod
+    def split(storage: IStorage, shards_count: int) -> list['CatalogShard']:
+        """Split titles of the storage into shards.
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to split titles of.
+
+        shards_count : int
+            The number of shards.
+
+        Returns
+        -------
+        list[CatalogShard]
+            Shards in the order of their titles.
+        """
+        return [CatalogShard.slice(storage, index, shards_count) for index in range(shards_count)]
+
+    @property
+    def start(self) -> int:
+        """Return the index of the first title of the shard.
+
+        Returns
+        -------
+        int
+            Index of the first title in the catalog.
+        """
+        return self._start
+
+    @property
+    def stop(self) -> int:
+        """Return the index following the last title of the shard.
+
+        Returns
+        -------
+        int
+            Index of the first title of the next shard in the catalog.
+        """
+        return self._start + self._matrix.shape[0]
+
+    @property
+    def snapshot(self) -> str:
+        """Return the storage snapshot the shard was sliced from.
+
+        Returns
+        -------
+        str
+            Identifier of the version of the data mart.
+        """
+        return self._snapshot
+
+    def handle(self, message: tuple) -> Any:
+        """Answer a message of the shard protocol.
+
+        Messages are:
+
+        - `('info',)`, answered with the start, the stop and the snapshot of the shard;
+        - `('profile', key, indexes, weights)`, answered with the weighted sum of (mapped) feature rows of the given
+          titles owned by the shard, used by similarity methods scored through a profile vector;
+        - `('rows', key, indexes)`, answered with the positions of the given titles owned by the shard and their
+          feature rows in the compute data type, used by other similarity methods;
+        - `('top_k', key, payload, indexes_invalid, count)`, answered with the indexes and the scores of the top
+          `count` titles of the shard sorted by score and then by index, and the minimum, the maximum and the number of
+          scores of valid titles. The payload is the profile vector or a tuple of feature rows and their weights.
+
+        The key is a tuple of feature groups and names of the similarity method and the precision.
+
+        Parameters
+        ----------
+        message : tuple
+            The message.
+
+        Returns
+        -------
+        Any
+            The answer to the message.
+
+        Raises
+        ------
+        ValueError
+            If the message is unknown.
+        """
+        name, arguments = message[0], message[1:]
+
+        if name == 'info':
+            return self._start, self.stop, self._snapshot
+
+        if name == 'profile':
+            return self._profile(*arguments)
+
+        if name == 'rows':
+            return self._rows(*arguments)
+
+        if name == 'top_k':
+            return self._top_k(*arguments)
+
+        raise ValueError('Unknown shard message {name}.'.format(name=name))
+
+    def _artifacts(self, key: tuple) -> tuple[NDArray[np.float32], NDArray[np.float32] | None]:
+        """Get the matrix of features and squared row norms of the shard for the key.
+
+        Parameters
+        ----------
+        key : tuple
+            Feature groups and names of the similarity method and the precision.
+
+        Returns
+        -------
+        tuple[NDArray[np.float32], NDArray[np.float32] | None]
+            The matrix in the storage data type, mapped if the similarity method uses a feature map, and squared row
+            norms if the similarity method is scored by `RBFEngine`.
+        """
+        columns, similarity_method, precision = key[0], SimilarityMethod(key[1], 'numpy'), Precision(key[2])
+        matrix = self._matrix_cache.get(
+            (frozenset(columns), precision.storage_dtype.str),
+            lambda: self._select(columns, precision.storage_dtype),
+        )
+
+        if similarity_method.uses_feature_map:
+            feature_map = similarity_method.feature_map
+            matrix = self._matrix_cache.get(
+                (frozenset(columns), precision.storage_dtype.str, feature_map.key),
+                lambda: feature_map.transform(matrix),
+            )
+
+        if not similarity_method.uses_row_norms:
+            return matrix, None
+
+        return matrix, self._matrix_cache.get(
+            (frozenset(columns), precision.storage_dtype.str, 'row_norms'),
+            lambda: RBFEngine.row_norms(matrix),
+        )
+
+    def _select(self, columns: list[str], dtype: np.dtype) -> NDArray[np.float32]:
+        """Gather feature columns of selected groups, the same way as the storage does.
+
+        Parameters
+        ----------
+        columns : list[str]
+            Feature groups to select.
+
+        dtype : np.dtype
+            Data type of the matrix. Sparse matrices do not support float16, so float32 is used instead.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            C-contiguous read-only matrix of selected features or a CSR matrix.
+        """
+        column_indexes = np.flatnonzero(np.isin(self._groups, columns))
+
+        if issparse(self._matrix):
+            return csr_matrix(self._matrix[:, column_indexes], dtype=np.promote_types(dtype, np.float32))
+
+        matrix = np.ascontiguousarray(self._matrix[:, column_indexes], dtype=dtype)
+        matrix.flags.writeable = False
+        return matrix
+
+    def _owned(self, indexes: NDArray[np.intp]) -> NDArray[np.intp]:
+        """Select indexes of titles owned by the shard.
+
+        Parameters
+        ----------
+        indexes : NDArray[np.intp]
+            Indexes of titles in the catalog.
+
+        Returns
+        -------
+        NDArray[np.intp]
+            Positions of the given indexes that belong to the shard.
+        """
+        indexes = np.asarray(indexes, dtype=np.intp).reshape(-1)
+        return np.flatnonzero((indexes >= self._start) & (indexes < self.stop))
+
+    def _profile(self, key: tuple, indexes: NDArray[np.intp], weights: NDArray[np.float64]) -> NDArray[np.float32]:
+        """Calculate the weighted sum of feature rows of titles owned by the shard.
+
+        Parameters
+        ----------
+        key : tuple
+            Feature groups and names of the similarity method and the precision.
+
+        indexes : NDArray[np.intp]
+            Indexes of user's titles in the catalog.
+
+        weights : NDArray[np.float64]
+            Scores of user's titles.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Partial profile vector in the compute data type.
+        """
+        matrix, _ = self._artifacts(key)
+        precision = Precision(key[2])
+        positions = self._owned(indexes)
+        rows = precision.compute(matrix[np.asarray(indexes, dtype=np.intp)[positions] - self._start])
+        weights = np.asarray(weights).reshape(-1)[positions].astype(precision.compute_dtype)
+
+        return np.asarray(weights @ rows, dtype=precision.compute_dtype).reshape(-1)
+
+    def _rows(self, key: tuple, indexes: NDArray[np.intp]) -> tuple[NDArray[np.intp], NDArray[np.float32]]:
+        """Gather dense feature rows of titles owned by the shard.
+
+        Parameters
+        ----------
+        key : tuple
+            Feature groups and names of the similarity method and the precision.
+
+        indexes : NDArray[np.intp]
+            Indexes of user's titles in the catalog.
+
+        Returns
+        -------
+        tuple[NDArray[np.intp], NDArray[np.float32]]
+            Positions of owned titles among the given indexes and their feature rows in the compute data type.
+        """
+        matrix, _ = self._artifacts(key)
+        positions = self._owned(indexes)
+        rows = Precision(key[2]).compute(matrix[np.asarray(indexes, dtype=np.intp)[positions] - self._start])
+
+        return positions, rows.toarray() if issparse(rows) else np.asarray(rows)
+
+    def _top_k(
+        self,
+        key: tuple,
+        payload: NDArray[np.float32] | tuple[NDArray[np.float32], NDArray[np.float64]],
+        indexes_invalid: NDArray[np.intp],
+        count: int,
+    ) -> tuple[NDArray[np.intp], NDArray[np.float32], float, float, int]:
+        """Score titles of the shard and select the top of them.
+
+        Parameters
+        ----------
+        key : tuple
+            Feature groups and names of the similarity method and the precision.
+
+        payload : NDArray[np.float32] | tuple[NDArray[np.float32], NDArray[np.float64]]
+            The profile vector or feature rows of user's titles and their weights.
+
+        indexes_invalid : NDArray[np.intp]
+            Indexes of titles in the catalog that are never recommended (included and excluded ones).
+
+        count : int
+            The number of titles to select. All titles tied with the last selected one are selected as well, so the
+            merged top ranks tied titles by their indexes across shards the same way as the unsharded catalog.
+
+        Returns
+        -------
+        tuple[NDArray[np.intp], NDArray[np.float32], float, float, int]
+            Indexes of selected titles in the catalog sorted by descending score and index, their scores, the minimum,
+            the maximum and the number of scores of valid titles of the shard.
+        """
+        result_vector = self._score(key, payload)
+        indexes_invalid = np.asarray(indexes_invalid, dtype=np.intp).reshape(-1)
+        is_valid = np.ones((result_vector.shape[0],), dtype=bool)
+        is_valid[indexes_invalid[self._owned(indexes_invalid)] - self._start] = False
+        valid_count = int(np.count_nonzero(is_valid))
+
+        if not valid_count:
+            return np.empty((0,), dtype=np.intp), np.empty((0,), dtype=result_vector.dtype), np.inf, -np.inf, 0
+
+        score_min = float(result_vector.min(where=is_valid, initial=np.inf))
+        score_max = float(result_vector.max(where=is_valid, initial=-np.inf))
+        result_vector[~is_valid] = -np.inf
+
+        count = min(count, valid_count)
+        partition_start = result_vector.shape[0] - count
+        kth_score = result_vector[np.argpartition(result_vector, partition_start)[partition_start]]
+        candidates = np.flatnonzero((result_vector >= kth_score) & is_valid)
+        candidates = candidates[np.lexsort((candidates, -result_vector[candidates]))]
+
+        return candidates + self._start, result_vector[candidates], score_min, score_max, valid_count
+
+    def _score(
+        self,
+        key: tuple,
+        payload: NDArray[np.float32] | tuple[NDArray[np.float32], NDArray[np.float64]],
+    ) -> NDArray[np.float32]:
+        """Calculate unnormalised recommendation vector of titles of the shard.
+
+        Parameters
+        ----------
+        key : tuple
+            Feature groups and names of the similarity method and the precision.
+
+        payload : NDArray[np.float32] | tuple[NDArray[np.float32], NDArray[np.float64]]
+            The profile vector or feature rows of user's titles and their weights.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Writable vector of recommendations in the compute data type.
+        """
+        matrix, row_norms = self._artifacts(key)
+        similarity_method, precision = SimilarityMethod(key[1], 'numpy'), Precision(key[2])
+        compute_dtype = precision.compute_dtype
+        matrix = precision.compute(matrix)
+
+        if not isinstance(payload, tuple):
+            return np.array(matrix @ payload.astype(compute_dtype), dtype=compute_dtype).reshape(-1)
+
+        rows, weights = payload
+        weights = np.asarray(weights, dtype=compute_dtype).reshape(-1)
+
+        if similarity_method.uses_row_norms:
+            row_bytes = 2 * max(matrix.shape[0], 1) * compute_dtype.itemsize
+            chunk_size = max(min(config.memory_budget_bytes // row_bytes, rows.shape[0]), 1)
+
+            return RBFEngine().accumulate(
+                np.arange(rows.shape[0], dtype=np.intp),
+                weights,
+                matrix,
+                row_norms,
+                chunk_size,
+                rows=rows,
+            )
+
+        similarity_score = similarity_method.similarity_method(rows, matrix)
+
+        return np.array(weights @ np.asarray(similarity_score, dtype=compute_dtype), dtype=compute_dtype).reshape(-1)
+
+
+class IShardTransport(object, metaclass=ABCMeta):
+    """Interface for delivering messages of the shard protocol to all shards of the catalog."""
+
+    @abstractmethod
+    def request(self, message: tuple) -> list:
+        """Send the message to all shards and wait for their answers.
+
+        Parameters
+        ----------
+        message : tuple
+            The message (see `CatalogShard.handle`).
+
+        Returns
+        -------
+        list
+            Answers of shards in the order of shards.
+        """
+
+    @abstractmethod
+    def close(self):
+        """Release processes and connections of the transport."""
+
+
+_process_shard: CatalogShard | None = None
+"""Shard held by the current worker process of `ProcessTransport`."""
+
+
+def _install_shard(shard: CatalogShard):
+    """Keep the shard in the worker process. Used as the initializer of the process pool.
+
+    Parameters
+    ----------
+    shard : CatalogShard
+        Shard of the worker process.
+    """
+    global _process_shard  # noqa: WPS420
+    _process_shard = shard
+
+
+def _handle_message(message: tuple) -> Any:
+    """Answer the message with the shard of the worker process.
+
+    Parameters
+    ----------
+    message : tuple
+        The message.
+
+    Returns
+    -------
+    Any
+        The answer of the shard.
+    """
+    return _process_shard.handle(message)
+
+
+@final
+class ProcessTransport(IShardTransport):
+    """Transport to shards held by worker processes of the local host.
+
+    Every shard is passed once to its own single-process pool when the pool starts, so messages carry only profiles,
+    rows of user's titles and indexes, and the worker keeps artifacts of the shard between requests. Shards are scored
+    in parallel outside of the GIL of the serving process.
+
+    Attributes
+    ----------
+    pools : list[ProcessPoolExecutor]
+        Single-process pools holding shards, in the order of shards.
+    """
+
+    def __init__(self, shards: list[CatalogShard]):
+        """Start a worker process for every shard.
+
+        Parameters
+        ----------
+        shards : list[CatalogShard]
+            Shards of the catalog.
+        """
+        self._pools: list[ProcessPoolExecutor] = [
+            ProcessPoolExecutor(max_workers=1, initializer=_install_shard, initargs=(shard,)) for shard in shards
+        ]
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return 'ProcessTransport(shards={shards})'.format(shards=len(self._pools))
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    def request(self, message: tuple) -> list:
+        futures = [pool.submit(_handle_message, message) for pool in self._pools]
+        return [future.result() for future in futures]
+
+    def close(self):
+        for pool in self._pools:
+            pool.shutdown()
+
+
+def parse_address(address: str) -> tuple[str, int] | str:
+    """Parse the address of a shard server.
+
+    Parameters
+    ----------
+    address : str
+        `host:port` of a TCP socket or a path of a Unix domain socket.
+
+    Returns
+    -------
+    tuple[str, int] | str
+        Address in the format of `multiprocessing.connection`.
+    """
+    host, separator, port = address.rpartition(':')
+
+    if separator and port.isdigit():
+        return host, int(port)
+
+    return address
+
+
+@final
+class SocketTransport(IShardTransport):
+    """Transport to shards served by `serve_shard` on other hosts or processes.
+
+    Connections are authenticated with the shared key. A message is sent to all shards before any answer is received,
+    so shards score in parallel. Requests are serialised by a lock, since every connection carries one request at a
+    time.
+
+    Attributes
+    ----------
+    addresses : list[str]
+        Addresses of shard servers, in the order of shards.
+
+    connections : list[Connection]
+        Connections to shard servers.
+    """
+
+    def __init__(self, addresses: list[str], authkey: bytes):
+        """Connect to shard servers.
+
+        Parameters
+        ----------
+        addresses : list[str]
+            `host:port` of TCP sockets or paths of Unix domain sockets of shard servers.
+
+        authkey : bytes
+            Key shared with shard servers.
+        """
+        self._addresses: list[str] = list(addresses)
+        self._connections: list[Connection] = [
+            Client(parse_address(address), authkey=authkey) for address in self._addresses
+        ]
+        self._lock: Lock = Lock()
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return 'SocketTransport(addresses={addresses})'.format(addresses=self._addresses)
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    def request(self, message: tuple) -> list:
+        """Send the message to all shards and wait for their answers.
+
+        Parameters
+        ----------
+        message : tuple
+            The message (see `CatalogShard.handle`).
+
+        Returns
+        -------
+        list
+            Answers of shards in the order of shards.
+
+        Raises
+        ------
+        RuntimeError
+            If any shard failed to answer the message.
+        """
+        with self._lock:
+            for connection in self._connections:
+                connection.send(message)
+
+            answers = [connection.recv() for connection in self._connections]
+
+        for address, (status, answer) in zip(self._addresses, answers):
+            if status == 'error':
+                raise RuntimeError('Shard {address} failed: {error}'.format(address=address, error=answer))
+
+        return [answer for _, answer in answers]
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+
+
+def serve_shard(shard: CatalogShard, address: str, authkey: bytes):
+    """Serve the shard to `SocketTransport` clients until the process is stopped.
+
+    Every connection is served by its own thread. Errors of messages are sent back to the client instead of closing
+    the connection.
+
+    Parameters
+    ----------
+    shard : CatalogShard
+        Shard to serve.
+
+    address : str
+        `host:port` of the TCP socket or the path of the Unix domain socket to listen on.
+
+    authkey : bytes
+        Key shared with clients.
+    """
+
+    def serve_connection(connection: Connection):  # noqa: WPS430
+        with connection:
+            while True:  # noqa: WPS457
+                try:
+                    message = connection.recv()
+                except EOFError:
+                    return
+
+                try:
+                    connection.send(('ok', shard.handle(message)))
+                except Exception as error:
+                    logger.exception('Shard message failed.')
+                    connection.send(('error', repr(error)))
+
+    with Listener(parse_address(address), authkey=authkey) as listener:
+        logger.info('Serving {shard} on {address}.'.format(shard=shard, address=address))
+
+        while True:  # noqa: WPS457
+            Thread(target=serve_connection, args=(listener.accept(),), daemon=True).start()
+
+
+@final
+class ShardedCatalog(object):
+    """Catalog scored by shards of titles with a merge of per-shard top-k lists.
+
+    Every shard scores its titles and selects the top `offset + k` of them, so the global page is among the merged lists
+    of shards. Lists are sorted by score and then by index, the same order as of unsharded recommendations, and scores
+    are min-max scaled with the minimum and the maximum over all valid titles of all shards. For similarity methods
+    scored through a profile vector, shards send partial sums of feature rows of user's titles they own, otherwise the
+    feature rows themselves, so the serving process does not need the matrix of features.
+
+    Attributes
+    ----------
+    transport : IShardTransport
+        Transport delivering messages to shards.
+
+    snapshot : str
+        Storage snapshot shards were sliced from.
+
+    titles_count : int
+        The number of titles of all shards.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the ShardedCatalog class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the ShardedCatalog class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not ShardedCatalog:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(self, transport: IShardTransport):
+        """Check that shards cover the catalog.
+
+        Parameters
+        ----------
+        transport : IShardTransport
+            Transport delivering messages to shards.
+
+        Raises
+        ------
+        ValueError
+            If shards do not cover a contiguous range of titles from the first one or are sliced from different
+            snapshots.
+        """
+        self._transport: IShardTransport = transport
+        shards_info = transport.request(('info',))
+        ranges = [(start, stop) for start, stop, _ in shards_info]
+        snapshots = {snapshot for _, _, snapshot in shards_info}
+        bounds = [0] + [stop for _, stop in ranges]
+
+        if any(start != bound for (start, _), bound in zip(ranges, bounds)) or len(snapshots) != 1:
+            raise ValueError(
+                'Shards {ranges} of snapshots {snapshots} do not cover the catalog.'.format(
+                    ranges=ranges,
+                    snapshots=sorted(snapshots),
+                ),
+            )
+
+        self._snapshot: str = snapshots.pop()
+        self._titles_count: int = bounds[-1]
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'ShardedCatalog(\n',
+                '  transport={transport},\n',
+                '  titles_count={titles_count},\n',
+                '  snapshot={snapshot})',
+            ],
+        )
+
+        return repr_template.format(
+            transport=self._transport,
+            titles_count=self._titles_count,
+            snapshot=self._snapshot,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def snapshot(self) -> str:
+        """Return the storage snapshot shards were sliced from.
+
+        Returns
+        -------
+        str
+            Identifier of the version of the data mart.
+        """
+        return self._snapshot
+
+    @property
+    def titles_count(self) -> int:
+        """Return the number of titles of all shards.
+
+        Returns
+        -------
+        int
+            The number of titles of the catalog.
+        """
+        return self._titles_count
+
+    def recommend(  # noqa: WPS211
+        self,
+        storage: IStorage,
+        columns: list[str],
+        similarity_method: SimilarityMethod,
+        precision: Precision,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+        indexes_exclude: NDArray[np.uint32],
+        k: int,
+        offset: int = 0,
+    ) -> RecommendationResult:
+        """Extract a page of top recommendations scored by shards.
+
+        Parameters
+        ----------
+        storage : IStorage
+            The storage instance to use for retrieving titles' information.
+
+        columns : list[str]
+            Feature groups to include in the calculation.
+
+        similarity_method : SimilarityMethod
+            The similarity method to use.
+
+        precision : Precision
+            Numeric precision of calculations.
+
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        indexes_exclude : NDArray[np.uint32]
+            The indexes of the titles to exclude from the calculation.
+
+        k : int
+            The number of recommendations to extract.
+
+        offset : int, default: 0
+            The number of top recommendations to skip.
+
+        Returns
+        -------
+        RecommendationResult
+            Sorted page of recommended titles with their scores.
+        """
+        key = (sorted(columns), similarity_method.name, precision.name)
+        indexes_include = np.asarray(indexes_include, dtype=np.intp).reshape(-1)
+        weights = np.asarray(scores, dtype=np.float64).reshape(-1)
+
+        if similarity_method.is_linear or similarity_method.uses_feature_map:
+            payload = np.sum(self._transport.request(('profile', key, indexes_include, weights)), axis=0)
+        else:
+            shards_rows = self._transport.request(('rows', key, indexes_include))
+            positions = np.concatenate([shard_positions for shard_positions, _ in shards_rows])
+            payload = (np.concatenate([rows for _, rows in shards_rows]), weights[positions])
+
+        indexes_invalid = np.concatenate([indexes_include, indexes_exclude]).astype(np.intp)
+        shards_top = self._transport.request(('top_k', key, payload, indexes_invalid, offset + k))
+
+        result_indexes = np.concatenate([shard_top[0] for shard_top in shards_top])
+        result_scores = np.concatenate([shard_top[1] for shard_top in shards_top])
+        order = np.lexsort((result_indexes, -result_scores))[offset : offset + k]
+
+        if not order.shape[0]:
+            return RecommendationResult.empty()
+
+        score_min = np.float32(min(shard_top[2] for shard_top in shards_top))
+        score_max = np.float32(max(shard_top[3] for shard_top in shards_top))
+        scaled_scores = result_scores[order].astype(np.float32) - score_min
+        scaled_scores /= score_max - score_min or 1
+        item_ids = storage.info.id.values[result_indexes[order]]
+
+        return RecommendationResult(item_ids, scaled_scores, result_indexes[order], is_sorted=True)
+
+    def close(self):
+        """Release processes and connections of the transport."""
+        self._transport.close()
+
+
+def create_shards(storage: IStorage) -> ShardedCatalog | None:
+    """Create the sharded catalog configured by `config.shard_addresses` or `config.engine_shards`.
+
+    Parameters
+    ----------
+    storage : IStorage
+        The storage instance to split titles of into local shards.
+
+    Returns
+    -------
+    ShardedCatalog, optional
+        Catalog of shard servers, of local worker processes or None if sharding is disabled.
+
+    Raises
+    ------
+    ValueError
+        If shard servers are configured without the `SHARD_AUTHKEY` environment variable.
+    """
+    if config.shard_addresses:
+        authkey = os.environ.get('SHARD_AUTHKEY')
+
+        if not authkey:
+            raise ValueError('SHARD_AUTHKEY environment variable is required to connect to shard servers.')
+
+        return ShardedCatalog(SocketTransport(config.shard_addresses, authkey.encode()))
+
+    if config.engine_shards > 1:
+        return ShardedCatalog(ProcessTransport(CatalogShard.split(storage, config.engine_shards)))
+
+    return None
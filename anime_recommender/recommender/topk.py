@@ -0,0 +1,476 @@
+"""Block top-k module.
+
+Provides the `BlockTopK` index that finds exact top recommendations of linear similarity methods without scoring the
+whole catalog. The catalog is partitioned into blocks of titles with precomputed per-block bounds of features, the score
+of every block is bounded from above for the current profile vector, and blocks that cannot enter the current top-k are
+skipped. Scored blocks use the same arithmetic as the product with the whole matrix, so top titles and their scores are
+the same as of the brute-force path.
+"""
+
+from typing import final
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+from scipy.sparse import issparse
+
+
+@final
+class BlockTopK(object):
+    """Exact top-k search over blocks of titles for linear similarity methods.
+
+    Titles are ordered lexicographically by presence of the most frequent features, so titles sharing them fall into
+    the same blocks, and the order is cut into blocks of `block_size` titles. Rows of the matrix of features are kept in
+    this order, so blocks and runs of adjacent blocks are scored as contiguous slices. For every block the maximum and
+    minimum of every feature and the maximum number of non-zero features of every feature group (`column_name` of
+    metadata) are kept. For the profile vector `p` the contribution of a feature `f` to the score of any title of the
+    block is at most `c_f = max(p_f max_f, p_f min_f)`, and zero features contribute nothing, so the score is bounded by
+    the sum of the largest positive `c_f` of every group, taking as many of them as there are non-zero features of the
+    group in a title at most (a single one for one-hot encoded groups, e.g. format). Lower bounds are derived the same
+    way and are used to find the minimum score required for scaling of scores.
+
+    Attributes
+    ----------
+    max_density : float
+        The maximum share of features present in the profile vector for which bounds are calculated. Profiles of long
+        lists contain almost all features, so bounds of almost all blocks are above the scores of top titles.
+
+    block_size : int
+        The number of titles in a block. Smaller blocks give tighter bounds at the cost of per-block overhead.
+
+    sort_features : int
+        The number of the most frequent features titles are ordered by.
+
+    order : NDArray[np.intp], optional
+        Permutation of titles. Titles of a block are contiguous.
+
+    matrix : NDArray[np.float32], optional
+        The matrix of features with rows in the order of titles. Might be a sparse CSR matrix.
+
+    upper : NDArray[np.float64], optional
+        Maximum of every feature per block, blocks x features.
+
+    lower : NDArray[np.float64], optional
+        Minimum of every feature per block, blocks x features.
+
+    nonzero : NDArray[np.int32], optional
+        The maximum number of non-zero features of a title per block and feature group, blocks x groups.
+
+    groups : NDArray[np.object_], optional
+        Feature group of every feature (column of the matrix of features).
+    """
+
+    max_density: float = 0.25
+
+    def __init__(self, block_size: int, sort_features: int = 32):
+        """Initialize the index with the given parameters.
+
+        Parameters
+        ----------
+        block_size : int
+            The number of titles in a block.
+
+        sort_features : int, default: 32
+            The number of the most frequent features titles are ordered by.
+        """
+        self._block_size: int = block_size
+        self._sort_features: int = sort_features
+        self._order: NDArray[np.intp] | None = None
+        self._matrix: NDArray[np.float32] | None = None
+        self._upper: NDArray[np.float64] | None = None
+        self._lower: NDArray[np.float64] | None = None
+        self._nonzero: NDArray[np.int32] | None = None
+        self._groups: NDArray[np.object_] | None = None
+        self._column_groups: NDArray[np.intp] | None = None
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'BlockTopK(\n',
+                '  block_size={block_size},\n',
+                '  sort_features={sort_features},\n',
+                '  blocks={blocks})',
+            ],
+        )
+
+        return repr_template.format(
+            block_size=self._block_size,
+            sort_features=self._sort_features,
+            blocks=self._upper.shape[0] if self.is_fitted else 0,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def key(self) -> tuple:
+        """Return the key identifying the index among artifacts of the same matrix of features.
+
+        Returns
+        -------
+        tuple
+            Name and parameters of the index.
+        """
+        return 'block_top_k', self._block_size, self._sort_features
+
+    @property
+    def is_fitted(self) -> bool:
+        """Return whether bounds of blocks are calculated.
+
+        Returns
+        -------
+        bool
+            True if the index is fitted, False otherwise.
+        """
+        return self._order is not None
+
+    @property
+    def groups(self) -> NDArray[np.object_] | None:
+        """Return feature group of every feature.
+
+        Returns
+        -------
+        NDArray[np.object_], optional
+            Feature groups in the order of columns of the matrix of features.
+        """
+        return self._groups
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the index in bytes, including the reordered matrix of features.
+
+        Returns
+        -------
+        int
+            Total size of arrays of the index.
+        """
+        if not self.is_fitted:
+            return 0
+
+        if issparse(self._matrix):
+            matrix_nbytes = self._matrix.data.nbytes + self._matrix.indices.nbytes + self._matrix.indptr.nbytes
+        else:
+            matrix_nbytes = self._matrix.nbytes
+
+        return matrix_nbytes + sum(array.nbytes for array in (self._order, self._upper, self._lower, self._nonzero))
+
+    def fit(self, matrix: NDArray[np.float32], groups: NDArray[np.object_]) -> 'BlockTopK':
+        """Order titles into blocks and calculate bounds of blocks.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features. Might be a sparse CSR matrix.
+
+        groups : NDArray[np.object_]
+            Feature group of every column of the matrix, i.e. `column_name` values of metadata rows of the columns.
+
+        Returns
+        -------
+        BlockTopK
+            The fitted index.
+        """
+        self._groups = np.asarray(groups, dtype=object)
+        self._column_groups = np.unique(self._groups, return_inverse=True)[1].astype(np.intp)
+        groups_count = int(self._column_groups.max()) + 1 if self._column_groups.shape[0] else 0
+        self._order = self._sort(matrix)
+        self._matrix = matrix[self._order]
+
+        if not issparse(self._matrix):
+            self._matrix.flags.writeable = False
+
+        blocks_count = -(-matrix.shape[0] // self._block_size)
+        self._upper = np.empty((blocks_count, matrix.shape[1]), dtype=np.float64)
+        self._lower = np.empty((blocks_count, matrix.shape[1]), dtype=np.float64)
+        self._nonzero = np.empty((blocks_count, groups_count), dtype=np.int32)
+
+        for block in range(blocks_count):
+            rows = self._matrix[block * self._block_size : (block + 1) * self._block_size]
+            rows = rows.toarray().astype(np.float64) if issparse(rows) else rows.astype(np.float64)
+            self._upper[block] = rows.max(axis=0)
+            self._lower[block] = rows.min(axis=0)
+
+            for group in range(groups_count):
+                self._nonzero[block, group] = np.count_nonzero(rows[:, self._column_groups == group], axis=1).max()
+
+        return self
+
+    def search(
+        self,
+        profile_vector: NDArray[np.float32],
+        scores_sum: np.uint32,
+        indexes_invalid: NDArray[np.intp],
+        count: int,
+    ) -> tuple[NDArray[np.intp], NDArray[np.float32], np.float32, np.float32]:
+        """Find titles with the highest scores and the range of scores of valid titles.
+
+        Scores are `matrix @ profile_vector / scores_sum` calculated in the data type of the profile vector. Blocks are
+        scored in batches in the order of their upper bounds, starting with enough blocks to collect `count` titles and
+        doubling the batch, until the next upper bound is below the `count`-th score found. Then all blocks whose lower
+        bound is below the lowest score found are scored to get the minimum score. If the share of features present in
+        the profile vector exceeds `max_density`, bounds would not prune anything and all blocks are scored at once.
+        Ties are broken by the index of the title, the same as in `VectorUtility`.
+
+        Parameters
+        ----------
+        profile_vector : NDArray[np.float32]
+            Weighted sum of feature rows of user's titles in the compute data type.
+
+        scores_sum : np.uint32
+            The sum of the scores of user's titles.
+
+        indexes_invalid : NDArray[np.intp]
+            Indexes of titles never recommended (included and excluded ones).
+
+        count : int
+            The number of top titles to find.
+
+        Returns
+        -------
+        tuple[NDArray[np.intp], NDArray[np.float32], np.float32, np.float32]
+            Indexes of at most `count` top titles sorted by score and index, their scores, the minimum and the maximum
+            score of valid titles. Indexes are empty if there are no valid titles.
+        """
+        dtype = profile_vector.dtype
+        blocks_count = self._upper.shape[0]
+        batch_size = count // self._block_size + 1
+
+        if np.count_nonzero(profile_vector) <= self.max_density * profile_vector.shape[0]:
+            upper_bounds, lower_bounds = self._bounds(profile_vector, dtype.type(scores_sum))
+        else:
+            upper_bounds, lower_bounds = np.full(blocks_count, np.inf), np.full(blocks_count, -np.inf)
+            batch_size = blocks_count
+
+        is_valid = np.ones(self._order.shape[0], dtype=bool)
+        is_valid[np.argsort(self._order)[indexes_invalid]] = False
+        is_scored = np.zeros(blocks_count, dtype=bool)
+        scores = np.empty(self._order.shape[0], dtype=dtype)
+
+        blocks = np.argsort(-upper_bounds, kind='stable')
+        batch_start = 0
+        threshold = dtype.type(-np.inf)
+
+        while batch_start < blocks.shape[0] and upper_bounds[blocks[batch_start]] >= threshold:
+            batch = blocks[batch_start : batch_start + batch_size]
+            self._score_blocks(batch[upper_bounds[batch] >= threshold], profile_vector, scores_sum, is_scored, scores)
+            threshold = self._threshold(scores[is_valid & self._rows(is_scored)], count)
+            batch_start, batch_size = batch_start + batch_size, batch_size * 2
+
+        is_candidate = is_valid & self._rows(is_scored)
+        candidates = np.flatnonzero(is_candidate & (scores >= self._threshold(scores[is_candidate], count)))
+
+        if not candidates.shape[0]:
+            return self._order[candidates], scores[candidates], dtype.type(0), dtype.type(0)
+
+        score_min = scores[is_candidate].min()
+        self._score_blocks(
+            np.flatnonzero(~is_scored & (lower_bounds < score_min)),
+            profile_vector,
+            scores_sum,
+            is_scored,
+            scores,
+        )
+        score_min = scores[is_valid & self._rows(is_scored)].min()
+
+        logger.info(
+            'Scored {scored} of {blocks} blocks for top {count} titles.'.format(
+                scored=np.count_nonzero(is_scored),
+                blocks=is_scored.shape[0],
+                count=count,
+            ),
+        )
+
+        candidates = candidates[np.lexsort((self._order[candidates], -scores[candidates]))][:count]
+
+        return self._order[candidates], scores[candidates], score_min, scores[candidates[0]]
+
+    def _bounds(
+        self,
+        profile_vector: NDArray[np.float32],
+        scores_sum: np.float32,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Calculate upper and lower bounds of scores of titles per block.
+
+        Bounds are widened by the worst-case rounding error of the dot product in the data type of the profile vector,
+        so they hold for computed scores as well. Scores of blocks without negative contributions are exactly
+        non-negative, so their lower bounds are not widened below zero. Only features present in the profile vector
+        are considered, since the rest contribute exact zeros.
+
+        Parameters
+        ----------
+        profile_vector : NDArray[np.float32]
+            Weighted sum of feature rows of user's titles.
+
+        scores_sum : np.float32
+            The sum of the scores of user's titles.
+
+        Returns
+        -------
+        tuple[NDArray[np.float64], NDArray[np.float64]]
+            Upper and lower bounds of scores per block.
+        """
+        active = np.flatnonzero(profile_vector)
+        profile_vector = profile_vector[active].astype(np.float64)
+        contributions_upper = self._upper[:, active] * profile_vector
+        contributions_lower = self._lower[:, active] * profile_vector
+        contributions_max = np.maximum(contributions_upper, contributions_lower)
+        contributions_min = np.minimum(contributions_upper, contributions_lower)
+        active_groups = self._column_groups[active]
+
+        upper_bounds = np.zeros(self._upper.shape[0], dtype=np.float64)
+        lower_bounds = np.zeros(self._upper.shape[0], dtype=np.float64)
+
+        for group in np.unique(active_groups):
+            columns = np.flatnonzero(active_groups == group)
+            upper_bounds += self._top_sum(np.maximum(contributions_max[:, columns], 0), self._nonzero[:, group])
+            lower_bounds -= self._top_sum(np.maximum(-contributions_min[:, columns], 0), self._nonzero[:, group])
+
+        upper_bounds = np.minimum(upper_bounds, contributions_max.sum(axis=1))
+        lower_bounds = np.maximum(lower_bounds, contributions_min.sum(axis=1))
+
+        rounding = np.abs(contributions_max).sum(axis=1) + np.abs(contributions_min).sum(axis=1)
+        rounding *= 2 * (active.shape[0] + 2) * np.finfo(np.float32).eps
+        epsilon = np.finfo(np.float32).tiny
+
+        upper_bounds = (upper_bounds + rounding) / scores_sum + epsilon
+        lower_bounds = (lower_bounds - rounding) / scores_sum - epsilon
+
+        return upper_bounds, np.where((contributions_min >= 0).all(axis=1), np.maximum(lower_bounds, 0), lower_bounds)
+
+    def _score_blocks(
+        self,
+        blocks: NDArray[np.intp],
+        profile_vector: NDArray[np.float32],
+        scores_sum: np.uint32,
+        is_scored: NDArray[np.bool_],
+        out: NDArray[np.float32],
+    ):
+        """Score titles of blocks, a run of adjacent blocks at once.
+
+        Parameters
+        ----------
+        blocks : NDArray[np.intp]
+            Indexes of blocks to score.
+
+        profile_vector : NDArray[np.float32]
+            Weighted sum of feature rows of user's titles.
+
+        scores_sum : np.uint32
+            The sum of the scores of user's titles.
+
+        is_scored : NDArray[np.bool_]
+            Mask of scored blocks, updated in place.
+
+        out : NDArray[np.float32]
+            Scores of titles in the order of the index, updated in place.
+        """
+        dtype = profile_vector.dtype
+        blocks = np.sort(blocks)
+        is_scored[blocks] = True
+
+        for run in np.split(blocks, np.flatnonzero(np.diff(blocks) != 1) + 1):
+            if not run.shape[0]:
+                continue
+
+            rows_range = slice(run[0] * self._block_size, (run[-1] + 1) * self._block_size)
+            rows = self._matrix[rows_range]
+            rows = rows.astype(dtype) if rows.dtype != dtype else rows
+            out[rows_range] = np.asarray(rows @ profile_vector, dtype=dtype).reshape(-1)
+            out[rows_range] /= dtype.type(scores_sum)
+
+    def _sort(self, matrix: NDArray[np.float32]) -> NDArray[np.intp]:
+        """Order titles lexicographically by presence of the most frequent features.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features.
+
+        Returns
+        -------
+        NDArray[np.intp]
+            Permutation of titles.
+        """
+        if issparse(matrix):
+            frequencies = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        else:
+            frequencies = np.count_nonzero(matrix, axis=0)
+
+        features = np.argsort(-frequencies, kind='stable')[: self._sort_features]
+        presence = matrix[:, features]
+        presence = presence.toarray() != 0 if issparse(presence) else presence != 0
+
+        return np.lexsort(presence.T[::-1]).astype(np.intp) if features.shape[0] else np.arange(matrix.shape[0])
+
+    @staticmethod
+    def _threshold(scores: NDArray[np.float32], count: int) -> np.float32:
+        """Return the `count`-th highest score.
+
+        Parameters
+        ----------
+        scores : NDArray[np.float32]
+            Scores of scored valid titles.
+
+        count : int
+            Position of the score.
+
+        Returns
+        -------
+        np.float32
+            The score or `-inf` if there are fewer scores.
+        """
+        if scores.shape[0] < count:
+            return scores.dtype.type(-np.inf)
+
+        return np.partition(scores, scores.shape[0] - count)[scores.shape[0] - count]
+
+    def _rows(self, is_scored: NDArray[np.bool_]) -> NDArray[np.bool_]:
+        """Expand the mask of scored blocks to titles.
+
+        Parameters
+        ----------
+        is_scored : NDArray[np.bool_]
+            Mask of scored blocks.
+
+        Returns
+        -------
+        NDArray[np.bool_]
+            Mask of scored titles in the order of the index.
+        """
+        return np.repeat(is_scored, self._block_size)[: self._order.shape[0]]
+
+    @staticmethod
+    def _top_sum(contributions: NDArray[np.float64], counts: NDArray[np.int32]) -> NDArray[np.float64]:
+        """Sum the largest contributions of every row, taking the given number of them per row.
+
+        Parameters
+        ----------
+        contributions : NDArray[np.float64]
+            Non-negative contributions of features, blocks x features of a group.
+
+        counts : NDArray[np.int32]
+            The number of contributions to sum per block.
+
+        Returns
+        -------
+        NDArray[np.float64]
+            Sums of the largest contributions per block.
+        """
+        cumulative = np.cumsum(-np.sort(-contributions, axis=1), axis=1)
+        cumulative = np.hstack([np.zeros((cumulative.shape[0], 1)), cumulative])
+
+        return cumulative[np.arange(cumulative.shape[0]), np.minimum(counts, contributions.shape[1])]
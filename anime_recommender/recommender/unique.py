@@ -0,0 +1,271 @@
+"""Unique rows module.
+
+Provides the `UniqueRows` index of distinct rows of the matrix of features. With low-cardinality feature groups only
+(e.g. format, season, episodes) thousands of titles share the same feature row, so kernels are evaluated between
+distinct rows of user's titles and distinct rows of the catalog, and the result is broadcast back to titles.
+"""
+
+from typing import Callable, final
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.sparse import issparse
+
+
+@final
+class UniqueRows(object):
+    """Index of distinct rows of the matrix of features.
+
+    Similarity of titles depends on their feature rows only, so the sum of weighted similarity rows of user's titles is
+    the sum over distinct rows of user's titles weighted by the sums of scores of titles sharing them, and its value for
+    a title is the value for the distinct row of the title.
+
+    Attributes
+    ----------
+    rows : NDArray[np.float32], optional
+        Distinct rows of the matrix of features in the order of their first occurrence. Might be a sparse CSR matrix.
+
+    representatives : NDArray[np.intp], optional
+        Index of the first title of every distinct row.
+
+    inverse : NDArray[np.intp], optional
+        Index of the distinct row of every title.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Ensure the UniqueRows class is not subclassed.
+
+        Parameters
+        ----------
+        **kwargs : dict
+            Arbitrary keyword arguments.
+
+        Raises
+        ------
+        TypeError
+            If there's an attempt to subclass the UniqueRows class.
+        """
+        super().__init_subclass__(**kwargs)
+        if cls is not UniqueRows:
+            raise TypeError('{name} class cannot be subclassed.'.format(name=cls.__base__.__name__))
+
+    def __init__(self):
+        """Initialize the empty index."""
+        self._rows: NDArray[np.float32] | None = None
+        self._representatives: NDArray[np.intp] | None = None
+        self._inverse: NDArray[np.intp] | None = None
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'UniqueRows(\n',
+                '  titles={titles},\n',
+                '  rows={rows})',
+            ],
+        )
+
+        return repr_template.format(
+            titles=self.titles_count,
+            rows=self.rows_count,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @property
+    def key(self) -> tuple:
+        """Return the key identifying the index among artifacts of the same matrix of features.
+
+        Returns
+        -------
+        tuple
+            Name of the index.
+        """
+        return ('unique_rows',)
+
+    @property
+    def rows(self) -> NDArray[np.float32] | None:
+        """Return distinct rows of the matrix of features.
+
+        Returns
+        -------
+        NDArray[np.float32], optional
+            Distinct rows in the order of their first occurrence.
+        """
+        return self._rows
+
+    @property
+    def representatives(self) -> NDArray[np.intp] | None:
+        """Return index of the first title of every distinct row.
+
+        Returns
+        -------
+        NDArray[np.intp], optional
+            Indexes of titles, e.g. to gather row norms of distinct rows.
+        """
+        return self._representatives
+
+    @property
+    def titles_count(self) -> int:
+        """Return the number of titles of the matrix of features.
+
+        Returns
+        -------
+        int
+            The number of rows of the matrix the index was fitted on.
+        """
+        return self._inverse.shape[0] if self._inverse is not None else 0
+
+    @property
+    def rows_count(self) -> int:
+        """Return the number of distinct rows.
+
+        Returns
+        -------
+        int
+            The number of distinct rows.
+        """
+        return self._representatives.shape[0] if self._representatives is not None else 0
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the index in bytes, including distinct rows.
+
+        Returns
+        -------
+        int
+            Total size of arrays of the index.
+        """
+        if self._rows is None:
+            return 0
+
+        if issparse(self._rows):
+            rows_nbytes = self._rows.data.nbytes + self._rows.indices.nbytes + self._rows.indptr.nbytes
+        else:
+            rows_nbytes = self._rows.nbytes
+
+        return rows_nbytes + self._representatives.nbytes + self._inverse.nbytes
+
+    def fit(self, matrix: NDArray[np.float32], transform: Callable | None = None) -> 'UniqueRows':
+        """Find distinct rows of the matrix of features.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features. Might be a sparse CSR matrix.
+
+        transform : Callable, optional
+            Row-wise feature map (e.g. `RandomFourierFeatures.transform`) applied to distinct rows. Titles with equal
+            rows have equal mapped rows, so only distinct rows are mapped.
+
+        Returns
+        -------
+        UniqueRows
+            The fitted index.
+        """
+        if issparse(matrix):
+            inverse = self._sparse_inverse(matrix)
+        else:
+            inverse = np.unique(matrix, axis=0, return_inverse=True)[1].reshape(-1)
+
+        # Number distinct rows by their first occurrence, so they keep the order of titles.
+        representatives = np.full((int(inverse.max(initial=-1)) + 1,), matrix.shape[0], dtype=np.intp)
+        np.minimum.at(representatives, inverse, np.arange(matrix.shape[0], dtype=np.intp))
+        order = np.argsort(representatives, kind='stable')
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(order.shape[0], dtype=np.intp)
+
+        self._representatives = representatives[order]
+        self._inverse = ranks[inverse].astype(np.intp)
+        self._rows = matrix[self._representatives]
+
+        if transform is not None:
+            self._rows = transform(self._rows)
+
+        if not issparse(self._rows):
+            self._rows.flags.writeable = False
+
+        return self
+
+    def collapse(
+        self,
+        indexes_include: NDArray[np.uint32],
+        scores: NDArray[np.uint8],
+    ) -> tuple[NDArray[np.intp], NDArray[np.float64]]:
+        """Map user's titles to distinct rows and sum their scores per distinct row.
+
+        Parameters
+        ----------
+        indexes_include : NDArray[np.uint32]
+            The indexes of the titles to include in the calculation.
+
+        scores : NDArray[np.uint8]
+            The scores of the titles to include in the calculation.
+
+        Returns
+        -------
+        tuple[NDArray[np.intp], NDArray[np.float64]]
+            Indexes of distinct rows of user's titles and sums of scores of titles sharing them.
+        """
+        rows_include = self._inverse[np.asarray(indexes_include, dtype=np.intp).reshape(-1)]
+        rows_unique, positions = np.unique(rows_include, return_inverse=True)
+        weights = np.bincount(positions.reshape(-1), weights=np.asarray(scores, dtype=np.float64).reshape(-1))
+
+        return rows_unique, weights
+
+    def broadcast(self, vector: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Expand vector of values of distinct rows to titles.
+
+        Parameters
+        ----------
+        vector : NDArray[np.float32]
+            Value of every distinct row.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Value of every title.
+        """
+        return vector[self._inverse]
+
+    @staticmethod
+    def _sparse_inverse(matrix: NDArray[np.float32]) -> NDArray[np.intp]:
+        """Find index of the distinct row of every row of a sparse matrix.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            Sparse CSR matrix of features.
+
+        Returns
+        -------
+        NDArray[np.intp]
+            Index of the distinct row of every row in the order of first occurrence.
+        """
+        matrix = matrix.tocsr(copy=True)
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        rows: dict[bytes, int] = {}
+        inverse = np.empty((matrix.shape[0],), dtype=np.intp)
+
+        for row in range(matrix.shape[0]):
+            row_slice = slice(matrix.indptr[row], matrix.indptr[row + 1])
+            row_key = matrix.indices[row_slice].tobytes() + matrix.data[row_slice].tobytes()
+            inverse[row] = rows.setdefault(row_key, len(rows))
+
+        return inverse
@@ -0,0 +1,269 @@
+"""Workspace module.
+
+Provides the `Workspace` arena of scratch buffers reused by a worker thread across chunks and requests, and the shared
+pool of worker threads scoring chunks, so workspaces of pool threads outlive requests. Kernel evaluation writes into
+workspace buffers with `out=` style operations instead of allocating chunk x N temporaries per chunk.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, current_thread, local
+from typing import Callable, final
+from weakref import WeakSet
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+
+@final
+class Workspace(object):
+    """Arena of named scratch buffers owned by a single thread.
+
+    A buffer is reallocated only when a larger one is requested, otherwise a view of the existing one is returned, so
+    under sustained traffic the allocated size reaches its steady state after the first requests of the largest shape.
+    Contents of buffers are undefined on every request.
+
+    Attributes
+    ----------
+    hooks : list[Callable[[dict], None]]
+        Instrumentation hooks called by `report` with statistics of all workspaces.
+
+    thread : str
+        Name of the owning thread.
+
+    buffers : dict[str, NDArray[np.uint8]]
+        Raw buffers by name.
+
+    peak_bytes : int
+        The maximum total size of buffers held at once.
+
+    allocations : int
+        The number of buffer (re)allocations.
+
+    reuses : int
+        The number of requests served by existing buffers.
+    """
+
+    hooks: list[Callable[[dict], None]] = []  # noqa: WPS407
+
+    _threads: local = local()
+    _workspaces: WeakSet = WeakSet()
+    _lock: Lock = Lock()
+
+    def __init__(self):
+        """Initialize the empty workspace."""
+        self._thread: str = current_thread().name
+        self._buffers: dict[str, NDArray[np.uint8]] = {}
+        self._peak_bytes: int = 0
+        self._allocations: int = 0
+        self._reuses: int = 0
+
+    def __repr__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        repr_template = ''.join(
+            [
+                'Workspace(\n',
+                '  buffers={buffers},\n',
+                '  nbytes={nbytes},\n',
+                '  peak_bytes={peak_bytes},\n',
+                '  allocations={allocations},\n',
+                '  reuses={reuses})',
+            ],
+        )
+
+        return repr_template.format(
+            buffers=list(self._buffers),
+            nbytes=self.nbytes,
+            peak_bytes=self._peak_bytes,
+            allocations=self._allocations,
+            reuses=self._reuses,
+        )
+
+    def __str__(self) -> str:
+        """Return the string representation of the class.
+
+        Returns
+        -------
+        str
+            The string representation of the class.
+        """
+        return self.__repr__()
+
+    @classmethod
+    def current(cls) -> 'Workspace':
+        """Return the workspace of the current thread, creating it on first use.
+
+        Returns
+        -------
+        Workspace
+            The workspace of the current thread.
+        """
+        if not hasattr(cls._threads, 'workspace'):
+            cls._threads.workspace = cls()
+
+            with cls._lock:
+                cls._workspaces.add(cls._threads.workspace)
+
+        return cls._threads.workspace
+
+    @classmethod
+    def add_hook(cls, hook: Callable[[dict], None]):
+        """Register instrumentation hook called by `report`.
+
+        Parameters
+        ----------
+        hook : Callable[[dict], None]
+            Function receiving the report of workspaces.
+        """
+        with cls._lock:
+            cls.hooks.append(hook)
+
+    @classmethod
+    def remove_hook(cls, hook: Callable[[dict], None]):
+        """Unregister instrumentation hook.
+
+        Parameters
+        ----------
+        hook : Callable[[dict], None]
+            Previously registered function.
+        """
+        with cls._lock:
+            cls.hooks.remove(hook)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the total size of buffers held by the workspace (steady-state allocation).
+
+        Returns
+        -------
+        int
+            Size of buffers in bytes.
+        """
+        return sum(buffer.nbytes for buffer in list(self._buffers.values()))
+
+    @property
+    def peak_bytes(self) -> int:
+        """Return the maximum total size of buffers held at once.
+
+        Returns
+        -------
+        int
+            Peak size of buffers in bytes.
+        """
+        return self._peak_bytes
+
+    def buffer(self, name: str, shape: tuple[int, ...], dtype: DTypeLike) -> NDArray:
+        """Get C-contiguous scratch array of the given shape and data type.
+
+        Parameters
+        ----------
+        name : str
+            Name of the buffer. Arrays of the same name share memory, so simultaneously used arrays should have
+            different names.
+
+        shape : tuple[int, ...]
+            Shape of the array.
+
+        dtype : DTypeLike
+            Data type of the array.
+
+        Returns
+        -------
+        NDArray
+            View of the buffer with undefined contents.
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+        buffer = self._buffers.get(name)
+
+        if buffer is None or buffer.nbytes < nbytes:
+            self._buffers.pop(name, None)
+            buffer = np.empty(max(nbytes, 1), dtype=np.uint8)
+            self._buffers[name] = buffer
+            self._allocations += 1
+            self._peak_bytes = max(self._peak_bytes, self.nbytes)
+        else:
+            self._reuses += 1
+
+        return buffer[:nbytes].view(dtype).reshape(shape)
+
+    def release(self):
+        """Free all buffers. Statistics are preserved."""
+        self._buffers.clear()
+
+    def stats(self) -> dict:
+        """Collect statistics of the workspace.
+
+        Returns
+        -------
+        dict
+            Name of the owning thread, held (steady-state) and peak sizes in bytes, the numbers of allocations and
+            reuses of buffers.
+        """
+        return {
+            'thread': self._thread,
+            'nbytes': self.nbytes,
+            'peak_bytes': self._peak_bytes,
+            'allocations': self._allocations,
+            'reuses': self._reuses,
+        }
+
+    @classmethod
+    def report(cls) -> dict:
+        """Collect statistics of workspaces of all live threads and pass them to instrumentation hooks.
+
+        Returns
+        -------
+        dict
+            The number of workspaces, total held (steady-state) and peak sizes in bytes, total numbers of allocations
+            and reuses of buffers, and statistics per workspace.
+        """
+        with cls._lock:
+            workspaces_stats = [workspace.stats() for workspace in cls._workspaces]
+            hooks = list(cls.hooks)
+
+        report = {
+            'workspaces': len(workspaces_stats),
+            'nbytes': sum(stats['nbytes'] for stats in workspaces_stats),
+            'peak_bytes': sum(stats['peak_bytes'] for stats in workspaces_stats),
+            'allocations': sum(stats['allocations'] for stats in workspaces_stats),
+            'reuses': sum(stats['reuses'] for stats in workspaces_stats),
+            'threads': workspaces_stats,
+        }
+
+        for hook in hooks:
+            hook(report)
+
+        return report
+
+
+_pools: dict[int, ThreadPoolExecutor] = {}
+_pools_lock: Lock = Lock()
+
+
+def worker_pool(workers: int) -> ThreadPoolExecutor:
+    """Return the process-wide pool of threads scoring chunks.
+
+    Pools are created once per number of workers and kept for the lifetime of the process, so workspaces of their
+    threads are reused across requests.
+
+    Parameters
+    ----------
+    workers : int
+        The number of threads.
+
+    Returns
+    -------
+    ThreadPoolExecutor
+        The pool of threads.
+    """
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scoring')
+
+        return _pools[workers]
@@ -1,8 +1,12 @@
 from abc import ABCMeta, abstractmethod
-from typing import Optional
+from typing import Callable, Hashable, Optional
 
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
 from pandas import DataFrame
 
+from anime_recommender.storage.LowRankFactors import LowRankFactors
+
 
 class IStorage(metaclass=ABCMeta):
     """A storage interface."""
@@ -26,6 +30,100 @@ class IStorage(metaclass=ABCMeta):
             List of mapped indexes.
         """
 
+    @abstractmethod
+    def matrix(self, columns: list[str], dtype: DTypeLike = np.float32, low_rank: bool = False) -> NDArray[np.float32]:
+        """Select matrix of features for all titles by feature groups.
+
+        Parameters
+        ----------
+        columns : list[str]
+            List of feature groups (`column_name` values of metadata) to select.
+
+        dtype : DTypeLike, default: np.float32
+            Data type of the matrix. Matrices of different data types are cached separately.
+
+        low_rank : bool, default: False
+            If True, select the dense matrix of reduced features of the groups (see `low_rank_factors`) instead.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            C-contiguous read-only matrix of selected features. Storages with sparse backend return a CSR matrix
+            instead (at least in float32, since sparse matrices do not support float16).
+        """
+
+    @abstractmethod
+    def matrix_artifact(  # noqa: WPS211
+        self,
+        columns: list[str],
+        name: Hashable,
+        factory: Callable[[NDArray[np.float32]], NDArray],
+        dtype: DTypeLike = np.float32,
+        low_rank: bool = False,
+    ) -> NDArray:
+        """Get array derived from the matrix of features (e.g. row norms), cached alongside the matrix.
+
+        Parameters
+        ----------
+        columns : list[str]
+            List of feature groups (`column_name` values of metadata) of the matrix.
+
+        name : Hashable
+            Name of the artifact. Should include all parameters of the factory other than the matrix.
+
+        factory : Callable[[NDArray[np.float32]], NDArray]
+            Function that builds the artifact from the matrix of selected features.
+
+        dtype : DTypeLike, default: np.float32
+            Data type of the matrix the artifact is built from.
+
+        low_rank : bool, default: False
+            If True, the artifact is built from the matrix of reduced features.
+
+        Returns
+        -------
+        NDArray
+            Cached or newly built artifact.
+        """
+
+    @abstractmethod
+    def low_rank_groups(self, columns: list[str]) -> NDArray[np.object_]:
+        """Get feature group of every column of the matrix of reduced features.
+
+        Parameters
+        ----------
+        columns : list[str]
+            List of feature groups (`column_name` values of metadata) of the matrix.
+
+        Returns
+        -------
+        NDArray[np.object_]
+            Feature group of every column of `matrix(columns, low_rank=True)`.
+        """
+
+    def pin(self) -> 'IStorage':
+        """Get storage bound to the currently loaded version of the data mart.
+
+        Reads of one request should go through the returned storage, so they see the same version of the data mart even
+        if it is reloaded meanwhile. Storages that never reload the data mart return themselves.
+
+        Returns
+        -------
+        IStorage
+            Storage of the currently loaded version of the data mart.
+        """
+        return self
+
+    @property
+    @abstractmethod
+    def low_rank_factors(self) -> LowRankFactors:
+        """Truncated SVD factors of feature groups the matrices of reduced features are made of (`LowRankFactors`)."""
+
+    @property
+    @abstractmethod
+    def snapshot(self) -> str:
+        """Identifier of the loaded version of the data mart. Changes whenever the data mart is updated (str)."""
+
     @property
     @abstractmethod
     def data(self) -> DataFrame:
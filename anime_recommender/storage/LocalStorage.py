@@ -1,28 +1,43 @@
 import gzip
+import hashlib
+import os
 import pickle
-from typing import Callable, Optional, final
+import time
+from threading import Lock
+from typing import Callable, Hashable, Optional, final
 
+import numpy as np
 import pandas as pd
+from loguru import logger
+from numpy.typing import DTypeLike, NDArray
 from pandas import DataFrame
+from scipy.sparse import csr_matrix
 
 from anime_recommender.config import config
 from anime_recommender.storage.IStorage import IStorage
+from anime_recommender.storage.LowRankFactors import LowRankFactors
+from anime_recommender.storage.MatrixCache import MatrixCache
 
 
 @final
-class LocalStorage(IStorage):
-    """IStorage implementation aimed to serve as local storage for the data mart.
+class LocalStorageVersion(IStorage):
+    """IStorage implementation holding one loaded version of the local data mart.
+
+    The version is fully loaded before it is published by `LocalStorage`, and its data never changes afterwards, so
+    every read through the same version sees the same data mart. Only members derived from the data mart are filled in
+    lazily, under the locks of the version.
 
     Attributes
     ----------
-    __data_path : str
-        Path to the data mart file.
-
-    __metadata_path : str
-        Path to the metadata file containing information about data, such as attribute ownership (e.g. `genre` for
-        `genre_Action` column, etc.) and column dtype.
+    __backend : str
+        Backend of the storage (`dense` or `sparse`) the version is loaded with.
 
     __data : DataFrame, read-only
+        Unpacked data mart. With the sparse backend, it is loaded lazily on the first access.
+
+    __sparse_data : csr_matrix, optional
+        Data mart in CSR format. Loaded instead of the dense data mart if `storage_backend` is `sparse`. Column positions
+        are the same as in the dense data mart.
 
     __metadata : DataFrame
         Unpacked metadata in form of pandas DataFrame. Unpacking method is determined by the file extension. Supported
@@ -33,6 +48,18 @@ class LocalStorage(IStorage):
 
     __mapping_inverse : dict[int, int]
         Mapping between the external and internal indexes with the internal index as a key and external index as a value.
+
+    __snapshot : str
+        Identifier of the version based on paths, sizes and modification times of files of the data mart.
+
+    __matrix_cache : MatrixCache
+        Byte-budgeted LRU cache of feature matrices keyed by the frozenset of selected feature groups and of arrays
+        derived from them keyed by the frozenset and the artifact name.
+
+    __low_rank_factors : LowRankFactors, optional
+        Truncated SVD factors of feature groups. Loaded lazily from `low_rank_path` on the first access, groups missing
+        from the file (or all groups if the file is missing or was fitted with another variance) are factorised on
+        demand.
     """
 
     @staticmethod
@@ -92,26 +119,69 @@ class LocalStorage(IStorage):
     }
     """Functional dictionary to map file extension to the corresponding unpacking method."""
 
+    @staticmethod
+    def __read(path: str) -> DataFrame:
+        """Static method to read file with the unpacking method of its extension.
+
+        Parameters
+        ----------
+        path : str
+            Path to the file.
+
+        Returns
+        -------
+        DataFrame
+            Unpacked data.
+        """
+        return LocalStorageVersion.__format[path.split('.')[-1]](path)
+
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
-        if cls is not LocalStorage:
+        if cls is not LocalStorageVersion:
             raise TypeError(f'{cls.__base__.__name__} class cannot be subclassed.')
 
-    def __init__(self):
-        self.__data: DataFrame = LocalStorage.__format[config.data_path.split('.')[-1]](config.data_path)
-        self.__metadata: DataFrame = LocalStorage.__format[config.metadata_path.split('.')[-1]](config.metadata_path)
-        self.__info: DataFrame = LocalStorage.__format[config.info_path.split('.')[-1]](config.info_path)
-        self.__mapping: dict[int, int] = {
-            key: value for value, key in self.__data.reset_index().iloc[:, :2].values.tolist()
-        }
+    def __init__(self, backend: str, snapshot: str):
+        """Load the data mart.
+
+        Parameters
+        ----------
+        backend : str
+            Backend of the storage (`dense` or `sparse`).
+
+        snapshot : str
+            Identifier of the version of files being loaded, taken before loading them.
+        """
+        self.__backend: str = backend
+        self.__metadata: DataFrame = LocalStorageVersion.__read(config.metadata_path)
+        self.__info: DataFrame = LocalStorageVersion.__read(config.info_path)
+        self.__data: DataFrame | None = None
+        self.__sparse_data: csr_matrix | None = None
+
+        if backend == 'sparse':
+            self.__sparse_data = LocalStorageVersion.__read(config.sparse_data_path)
+            self.__mapping: dict[int, int] = {key: value for value, key in enumerate(self.__info.id.values.tolist())}
+        else:
+            self.__data = LocalStorageVersion.__read(config.data_path)
+            self.__mapping = {key: value for value, key in self.__data.reset_index().iloc[:, :2].values.tolist()}
+
         self.__mapping_inverse: dict[int, int] = {key: value for value, key in self.__mapping.items()}
+        self.__matrix_cache: MatrixCache = MatrixCache(config.matrix_cache_bytes)
+        self.__data_lock: Lock = Lock()
+        self.__low_rank_lock: Lock = Lock()
+        self.__low_rank_factors: LowRankFactors | None = None
+        self.__snapshot: str = snapshot
 
     def __repr__(self):
+        data_shape = self.__sparse_data.shape if self.__sparse_data is not None else self.__data.shape
+
         return ''.join(
             [
-                f'LocalStorage(\n',
-                f'  DATA_SHAPE={self.__data.shape},\n',
-                f'  METADATA_SHAPE={self.__metadata.shape})',
+                f'LocalStorageVersion(\n',
+                f'  SNAPSHOT={self.__snapshot},\n',
+                f'  DATA_SHAPE={data_shape},\n',
+                f'  BACKEND={self.__backend},\n',
+                f'  METADATA_SHAPE={self.__metadata.shape},\n',
+                f'  MATRIX_CACHE={self.__matrix_cache})',
             ],
         )
 
@@ -122,9 +192,152 @@ class LocalStorage(IStorage):
             else [self.__mapping[index] for index in indexes if index in self.__mapping.keys()]
         )
 
+    def matrix(
+        self,
+        columns: list[str],
+        dtype: DTypeLike = np.float32,
+        low_rank: bool = False,
+    ) -> NDArray[np.float32] | csr_matrix:
+        dtype = np.dtype(dtype)
+
+        if low_rank:
+            return self.__matrix_cache.get(
+                (frozenset(columns), dtype.str, 'low_rank'),
+                lambda: self.__select_low_rank(columns, dtype),
+            )
+
+        return self.__matrix_cache.get((frozenset(columns), dtype.str), lambda: self.__select(columns, dtype))
+
+    def matrix_artifact(  # noqa: WPS211
+        self,
+        columns: list[str],
+        name: Hashable,
+        factory: Callable[[NDArray[np.float32]], NDArray],
+        dtype: DTypeLike = np.float32,
+        low_rank: bool = False,
+    ) -> NDArray:
+        dtype = np.dtype(dtype)
+        key = (frozenset(columns), dtype.str, 'low_rank', name) if low_rank else (frozenset(columns), dtype.str, name)
+
+        return self.__matrix_cache.get(key, lambda: factory(self.matrix(columns, dtype, low_rank)))
+
+    def low_rank_groups(self, columns: list[str]) -> NDArray[np.object_]:
+        return self.low_rank_factors.column_groups(self.__groups(columns))
+
+    def __select(self, columns: list[str], dtype: np.dtype) -> NDArray[np.float32] | csr_matrix:
+        """Gather features of selected groups into C-contiguous read-only matrix.
+
+        With the sparse backend, the matrix of selected features is a CSR matrix. Sparse matrices do not support
+        float16, so float32 is used instead.
+
+        Parameters
+        ----------
+        columns : list[str]
+            List of feature groups to select.
+
+        dtype : np.dtype
+            Data type of the matrix.
+
+        Returns
+        -------
+        NDArray[np.float32] | csr_matrix
+            Matrix of selected features.
+        """
+        metadata_indexes = self.__metadata[self.__metadata.column_name.isin(columns)].index
+
+        if self.__sparse_data is not None:
+            sparse_dtype = np.promote_types(dtype, np.float32)
+            return csr_matrix(self.__sparse_data[:, metadata_indexes.values], dtype=sparse_dtype)
+
+        matrix = np.ascontiguousarray(self.__data.iloc[:, metadata_indexes].values, dtype=dtype)
+        matrix.flags.writeable = False
+        return matrix
+
+    def __select_low_rank(self, columns: list[str], dtype: np.dtype) -> NDArray[np.float32]:
+        """Concatenate reduced features of selected groups into C-contiguous read-only matrix.
+
+        Parameters
+        ----------
+        columns : list[str]
+            List of feature groups to select.
+
+        dtype : np.dtype
+            Data type of the matrix.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Matrix of reduced features of selected groups, dense with both backends.
+        """
+        groups = self.__groups(columns)
+        factors = self.low_rank_factors
+
+        with self.__low_rank_lock:
+            for group in groups:
+                if group not in factors:
+                    logger.warning(f'Low-rank factors of {group} are not staged, factorising...')
+                    factors.fit_group(group, self.__select([group], np.dtype(np.float32)))
+
+        return factors.matrix(groups, dtype)
+
+    def __groups(self, columns: list[str]) -> list[str]:
+        """Order feature groups by positions of their columns in the data mart.
+
+        Parameters
+        ----------
+        columns : list[str]
+            List of feature groups.
+
+        Returns
+        -------
+        list[str]
+            Feature groups in the order of their first column in metadata.
+        """
+        return list(dict.fromkeys(self.__metadata[self.__metadata.column_name.isin(columns)].column_name.values))
+
+    @property
+    def low_rank_factors(self) -> LowRankFactors:
+        with self.__low_rank_lock:
+            if self.__low_rank_factors is None:
+                self.__low_rank_factors = self.__load_low_rank_factors()
+
+            return self.__low_rank_factors
+
+    def __load_low_rank_factors(self) -> LowRankFactors:
+        """Load factors staged by the ETL if they match the data mart and the configuration.
+
+        Returns
+        -------
+        LowRankFactors
+            Staged factors or empty factors to be fitted on demand.
+        """
+        if os.path.exists(config.low_rank_path):
+            factors = LocalStorageVersion.__read(config.low_rank_path)
+            is_fresh = factors.variance == config.low_rank_variance and factors.max_rank == config.low_rank_max_rank
+
+            if is_fresh and factors.titles_count == self.__info.shape[0]:
+                return factors
+
+            logger.warning('Staged low-rank factors do not match the data mart or the configuration.')
+
+        return LowRankFactors(config.low_rank_variance, config.low_rank_max_rank)
+
+    @property
+    def matrix_cache(self) -> MatrixCache:
+        """Cache of feature matrices (`MatrixCache`, read-only)."""
+        return self.__matrix_cache
+
+    @property
+    def snapshot(self) -> str:
+        return self.__snapshot
+
     @property
     def data(self) -> DataFrame:
-        return self.__data
+        with self.__data_lock:
+            if self.__data is None:
+                self.__data = LocalStorageVersion.__read(config.data_path)
+
+            return self.__data
 
     @property
     def metadata(self) -> DataFrame:
@@ -133,3 +346,172 @@ class LocalStorage(IStorage):
     @property
     def info(self) -> DataFrame:
         return self.__info
+
+
+@final
+class LocalStorage(IStorage):
+    """IStorage implementation aimed to serve as local storage for the data mart.
+
+    Reads are delegated to the currently loaded version of the data mart (`LocalStorageVersion`). When files of the
+    data mart change, the new version is loaded aside and replaces the current one with a single assignment, so reads
+    never see a partially loaded version. Reads of a request that must see the same version (e.g. mapping indexes
+    through `info` and keying caches by `snapshot`) should go through the version returned by `pin`.
+
+    Attributes
+    ----------
+    __backend : str
+        Backend of the storage (`dense` or `sparse`) fixed at initialization.
+
+    __check_interval : float
+        The minimum number of seconds between checks of files of the data mart (`storage_check_interval`).
+
+    __checked_at : float
+        Monotonic time of the last check of files of the data mart.
+
+    __version : LocalStorageVersion
+        The currently loaded version of the data mart. Files are checked on access to `snapshot` and `pin` at most once
+        per `__check_interval`, and the data mart is reloaded if they have changed.
+    """
+
+    @staticmethod
+    def __stat(paths: list[str]) -> str:
+        """Static method to identify version of files by their paths, sizes and modification times.
+
+        Parameters
+        ----------
+        paths : list[str]
+            Paths to the files.
+
+        Returns
+        -------
+        str
+            Hex digest of paths, sizes and modification times of the files.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+
+        for path in paths:
+            stat = os.stat(path)
+            digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+
+        return digest.hexdigest()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls is not LocalStorage:
+            raise TypeError(f'{cls.__base__.__name__} class cannot be subclassed.')
+
+    def __paths(self) -> list[str]:
+        """List files of the data mart the snapshot is based on.
+
+        Returns
+        -------
+        list[str]
+            Paths to the data mart, metadata, info and, if staged, low-rank factors files.
+        """
+        return [
+            config.sparse_data_path if self.__backend == 'sparse' else config.data_path,
+            config.metadata_path,
+            config.info_path,
+        ] + ([config.low_rank_path] if os.path.exists(config.low_rank_path) else [])
+
+    def __init__(self):
+        self.__reload_lock: Lock = Lock()
+        self.__backend: str = config.storage_backend
+        self.__check_interval: float = config.storage_check_interval
+        self.__checked_at: float = time.monotonic()
+        self.__version: LocalStorageVersion = LocalStorageVersion(self.__backend, LocalStorage.__stat(self.__paths()))
+
+    def __refresh(self):
+        """Reload the data mart if its files have changed since it was loaded.
+
+        Files are checked at most once per `storage_check_interval`. Files that cannot be read (e.g. while they are
+        being replaced) leave the loaded version in place until the next check.
+        """
+        now = time.monotonic()
+
+        if now - self.__checked_at < self.__check_interval:
+            return
+
+        self.__checked_at = now
+
+        try:
+            snapshot = LocalStorage.__stat(self.__paths())
+        except OSError:
+            return
+
+        if snapshot == self.__version.snapshot:
+            return
+
+        with self.__reload_lock:
+            if snapshot == self.__version.snapshot:
+                return
+
+            logger.info('Data mart files have changed, reloading...')
+
+            try:
+                self.__version = LocalStorageVersion(self.__backend, snapshot)
+            except (OSError, EOFError, ValueError, pickle.UnpicklingError) as error:
+                logger.warning(f'Failed to reload the data mart, keeping the loaded version: {error}')
+
+    def __repr__(self):
+        return ''.join(
+            [
+                f'LocalStorage(\n',
+                f'  BACKEND={self.__backend},\n',
+                f'  CHECK_INTERVAL={self.__check_interval},\n',
+                f'  VERSION={self.__version})',
+            ],
+        )
+
+    def pin(self) -> LocalStorageVersion:
+        self.__refresh()
+        return self.__version
+
+    def map(self, indexes: list, inverse: Optional[bool] = False) -> list[int]:
+        return self.__version.map(indexes, inverse)
+
+    def matrix(
+        self,
+        columns: list[str],
+        dtype: DTypeLike = np.float32,
+        low_rank: bool = False,
+    ) -> NDArray[np.float32] | csr_matrix:
+        return self.__version.matrix(columns, dtype, low_rank)
+
+    def matrix_artifact(  # noqa: WPS211
+        self,
+        columns: list[str],
+        name: Hashable,
+        factory: Callable[[NDArray[np.float32]], NDArray],
+        dtype: DTypeLike = np.float32,
+        low_rank: bool = False,
+    ) -> NDArray:
+        return self.__version.matrix_artifact(columns, name, factory, dtype, low_rank)
+
+    def low_rank_groups(self, columns: list[str]) -> NDArray[np.object_]:
+        return self.__version.low_rank_groups(columns)
+
+    @property
+    def low_rank_factors(self) -> LowRankFactors:
+        return self.__version.low_rank_factors
+
+    @property
+    def matrix_cache(self) -> MatrixCache:
+        """Cache of feature matrices of the currently loaded version (`MatrixCache`, read-only)."""
+        return self.__version.matrix_cache
+
+    @property
+    def snapshot(self) -> str:
+        return self.pin().snapshot
+
+    @property
+    def data(self) -> DataFrame:
+        return self.__version.data
+
+    @property
+    def metadata(self) -> DataFrame:
+        return self.__version.metadata
+
+    @property
+    def info(self) -> DataFrame:
+        return self.__version.info
@@ -0,0 +1,239 @@
+from typing import final
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+from scipy.sparse import issparse
+from sklearn.utils.extmath import randomized_svd
+
+
+@final
+class LowRankFactors(object):
+    """Truncated SVD factors of feature groups of the data mart.
+
+    Every feature group (`column_name` of metadata) is factorised separately, `X_g ~ U_g S_g V_g^T`, and titles are
+    represented by `Z_g = U_g S_g = X_g V_g` of the smallest rank whose singular values explain at least `variance` of
+    the squared Frobenius norm of the group (uncentered explained variance, so dot products and distances of titles are
+    approximated, not only their spread). Groups of any combination are concatenated, so a single factorisation per
+    group serves all combinations of feature groups.
+
+    The concatenation is scaled by `sqrt(rank / n_features)`: squared distances of titles are then the same fraction of
+    the dimension as in the original space, so kernels with the default coefficient of `1 / n_features` (RBF, random
+    Fourier features) keep their scale, dot products change by a constant factor removed by min-max scaling of scores,
+    and cosine similarity does not change at all.
+
+    Attributes
+    ----------
+    __variance : float
+        The minimum explained variance of every group.
+
+    __max_rank : int
+        The maximum rank of every group. The value of 0 does not limit the rank.
+
+    __values : dict[str, NDArray[np.float32]]
+        Titles in the reduced space of every group (`Z_g`). Narrow groups keep their original features.
+
+    __components : dict[str, NDArray[np.float32] | None]
+        Right singular vectors of every group (`V_g`), None for groups that keep their original features.
+
+    __features : dict[str, int]
+        The number of original features of every group.
+
+    __explained : dict[str, float]
+        Explained variance of the kept rank of every group.
+    """
+
+    __INITIAL_RANK: int = 32
+    """Rank of the first truncated SVD of a group. The rank is doubled until the variance is explained."""
+
+    __MIN_FEATURES: int = 32
+    """The minimum number of features of a group to factorise. Narrow groups (e.g. one-hot encoded format or season)
+    cost little to score, while dropping any of their directions merges whole categories of titles."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls is not LowRankFactors:
+            raise TypeError(f'{cls.__base__.__name__} class cannot be subclassed.')
+
+    def __init__(self, variance: float, max_rank: int = 0):
+        self.__variance: float = variance
+        self.__max_rank: int = max_rank
+        self.__values: dict[str, NDArray[np.float32]] = {}
+        self.__components: dict[str, NDArray[np.float32] | None] = {}
+        self.__features: dict[str, int] = {}
+        self.__explained: dict[str, float] = {}
+
+    def __repr__(self):
+        ranks = {group: self.rank(group) for group in self.__values}
+
+        return ''.join(
+            [
+                f'LowRankFactors(\n',
+                f'  variance={self.__variance},\n',
+                f'  max_rank={self.__max_rank},\n',
+                f'  ranks={ranks},\n',
+                f'  nbytes={self.nbytes})',
+            ],
+        )
+
+    def __contains__(self, group: str) -> bool:
+        return group in self.__values
+
+    def fit(self, matrix: NDArray[np.float32], groups: NDArray[np.object_]) -> 'LowRankFactors':
+        """Factorise every feature group of the matrix of features.
+
+        Parameters
+        ----------
+        matrix : NDArray[np.float32]
+            The matrix of features. Might be a sparse CSR matrix.
+
+        groups : NDArray[np.object_]
+            Feature group of every column of the matrix, i.e. `column_name` values of metadata rows of the columns.
+
+        Returns
+        -------
+        LowRankFactors
+            The fitted factors.
+        """
+        groups = np.asarray(groups, dtype=object)
+
+        for group in dict.fromkeys(groups):
+            self.fit_group(group, matrix[:, np.flatnonzero(groups == group)])
+
+        return self
+
+    def fit_group(self, group: str, matrix: NDArray[np.float32]):
+        """Factorise a single feature group, replacing its factors if they exist.
+
+        Parameters
+        ----------
+        group : str
+            Name of the feature group.
+
+        matrix : NDArray[np.float32]
+            Features of the group for all titles. Might be a sparse CSR matrix.
+        """
+        matrix = matrix.astype(np.float32) if issparse(matrix) else np.asarray(matrix, dtype=np.float32)
+        features = matrix.shape[1]
+        total = float(matrix.multiply(matrix).sum()) if issparse(matrix) else float(np.square(matrix).sum())
+        max_rank = min(matrix.shape) - 1
+
+        if self.__max_rank > 0:
+            max_rank = min(max_rank, self.__max_rank)
+
+        self.__features[group] = features
+
+        if features < LowRankFactors.__MIN_FEATURES or max_rank < 1 or total == 0:
+            self.__values[group] = matrix.toarray() if issparse(matrix) else np.ascontiguousarray(matrix)
+            self.__components[group] = None
+            self.__explained[group] = 1.0
+            return
+
+        rank = min(LowRankFactors.__INITIAL_RANK, max_rank)
+
+        while True:  # noqa: WPS457
+            left, singular, right = randomized_svd(matrix, rank, random_state=0)
+            explained = np.cumsum(np.square(singular, dtype=np.float64)) / total
+
+            if explained[-1] >= self.__variance or rank >= max_rank:
+                break
+
+            rank = min(rank * 2, max_rank)
+
+        rank = min(int(np.searchsorted(explained, self.__variance)) + 1, rank)
+
+        self.__values[group] = np.ascontiguousarray(left[:, :rank] * singular[:rank], dtype=np.float32)
+        self.__components[group] = np.ascontiguousarray(right[:rank].T, dtype=np.float32)
+        self.__explained[group] = float(min(explained[rank - 1], 1))
+
+    def matrix(self, columns: list[str], dtype: DTypeLike = np.float32) -> NDArray[np.float32]:
+        """Concatenate reduced features of feature groups into C-contiguous read-only matrix.
+
+        Parameters
+        ----------
+        columns : list[str]
+            Feature groups to concatenate, in the order of their columns in the data mart.
+
+        dtype : DTypeLike, default: np.float32
+            Data type of the matrix.
+
+        Returns
+        -------
+        NDArray[np.float32]
+            Scaled matrix of reduced features.
+
+        Raises
+        ------
+        KeyError
+            If any of the groups is not factorised.
+        """
+        values = [self.__values[group] for group in columns]
+        matrix = np.hstack(values) if values else np.empty((0, 0), dtype=np.float32)
+        matrix = np.ascontiguousarray(matrix * np.float32(self.__scale(columns)), dtype=dtype)
+        matrix.flags.writeable = False
+        return matrix
+
+    def column_groups(self, columns: list[str]) -> NDArray[np.object_]:
+        """Get feature group of every column of the concatenated matrix.
+
+        Parameters
+        ----------
+        columns : list[str]
+            Feature groups of the matrix, in the same order as passed to `matrix`.
+
+        Returns
+        -------
+        NDArray[np.object_]
+            Feature group of every reduced column.
+        """
+        return np.array([group for group in columns for _ in range(self.rank(group))], dtype=object)
+
+    def rank(self, group: str) -> int:
+        """Return the number of reduced features of a group."""
+        return self.__values[group].shape[1]
+
+    def features(self, group: str) -> int:
+        """Return the number of original features of a group."""
+        return self.__features[group]
+
+    def explained(self, group: str) -> float:
+        """Return explained variance of the kept rank of a group."""
+        return self.__explained[group]
+
+    def __scale(self, columns: list[str]) -> float:
+        """Calculate the scale of concatenated reduced features.
+
+        Parameters
+        ----------
+        columns : list[str]
+            Feature groups of the matrix.
+
+        Returns
+        -------
+        float
+            Square root of the ratio of the number of reduced features to the number of original ones.
+        """
+        features = sum(self.__features[group] for group in columns)
+        rank = sum(self.rank(group) for group in columns)
+
+        return float(np.sqrt(rank / features)) if features else 1.0
+
+    @property
+    def variance(self) -> float:
+        """The minimum explained variance of every group (`float`, read-only)."""
+        return self.__variance
+
+    @property
+    def max_rank(self) -> int:
+        """The maximum rank of every group (`int`, read-only)."""
+        return self.__max_rank
+
+    @property
+    def titles_count(self) -> int:
+        """The number of titles the factors were fitted on (`int`, read-only)."""
+        return next(iter(self.__values.values())).shape[0] if self.__values else 0
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of reduced features and singular vectors in bytes (`int`, read-only)."""
+        components = [component for component in self.__components.values() if component is not None]
+        return sum(values.nbytes for values in self.__values.values()) + sum(part.nbytes for part in components)
@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from threading import Lock, RLock
+from typing import Callable, Hashable, final
+
+from numpy.typing import NDArray
+from scipy.sparse import issparse
+
+
+@final
+class MatrixCache(object):
+    """Bounded least recently used cache of feature matrices with a byte budget.
+
+    Attributes
+    ----------
+    __max_bytes : int
+        Maximum total size of cached matrices in bytes. The least recently used matrices are evicted when the budget is
+        exceeded. Matrices larger than the budget are returned without being cached.
+
+    __entries : OrderedDict[Hashable, NDArray]
+        Cached matrices ordered from the least to the most recently used one.
+
+    __nbytes : int
+        Current total size of cached matrices in bytes.
+
+    __hits : int
+        Number of requests served from the cache.
+
+    __misses : int
+        Number of requests that required building the matrix.
+
+    __lock : RLock
+        Lock of entries and counters. It is never held while a matrix is built, so lookups of other keys are not
+        blocked by builds.
+
+    __builds : dict[Hashable, Lock]
+        Locks of keys being built. Requests for a key being built wait for it instead of building it again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes: int = max_bytes
+        self.__entries: OrderedDict[Hashable, NDArray] = OrderedDict()
+        self.__nbytes: int = 0
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__lock: RLock = RLock()
+        self.__builds: dict[Hashable, Lock] = {}
+
+    def __repr__(self):
+        return ''.join(
+            [
+                f'MatrixCache(\n',
+                f'  entries={len(self.__entries)},\n',
+                f'  nbytes={self.__nbytes},\n',
+                f'  max_bytes={self.__max_bytes},\n',
+                f'  hits={self.__hits},\n',
+                f'  misses={self.__misses})',
+            ],
+        )
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key: Hashable, factory: Callable[[], NDArray]) -> NDArray:
+        """Get matrix from the cache or build it with the factory and cache it.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the matrix, e.g. frozenset of feature groups.
+
+        factory : Callable[[], NDArray]
+            Function that builds the matrix on cache miss.
+
+        Returns
+        -------
+        NDArray
+            Cached or newly built matrix.
+        """
+        with self.__lock:
+            matrix = self.__lookup(key)
+
+            if matrix is not None:
+                return matrix
+
+            build_lock = self.__builds.setdefault(key, Lock())
+
+        with build_lock:
+            with self.__lock:
+                matrix = self.__lookup(key)
+
+                if matrix is not None:
+                    return matrix
+
+                self.__misses += 1
+
+            try:
+                matrix = factory()
+
+                with self.__lock:
+                    self.__store(key, matrix)
+            finally:
+                with self.__lock:
+                    self.__builds.pop(key, None)
+
+            return matrix
+
+    def __lookup(self, key: Hashable) -> NDArray | None:
+        """Get cached matrix and count the hit. Must be called under the lock.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the matrix.
+
+        Returns
+        -------
+        NDArray, optional
+            Cached matrix or None if the key is not cached.
+        """
+        if key not in self.__entries:
+            return None
+
+        self.__hits += 1
+        self.__entries.move_to_end(key)
+        return self.__entries[key]
+
+    def __store(self, key: Hashable, matrix: NDArray):
+        """Cache the matrix and evict the least recently used ones over the budget. Must be called under the lock.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the matrix.
+
+        matrix : NDArray
+            Built matrix. Matrices larger than the budget are not cached.
+        """
+        matrix_nbytes = self.__size(matrix)
+
+        if matrix_nbytes > self.__max_bytes or key in self.__entries:
+            return
+
+        self.__entries[key] = matrix
+        self.__nbytes += matrix_nbytes
+
+        while self.__nbytes > self.__max_bytes:
+            _, evicted = self.__entries.popitem(last=False)
+            self.__nbytes -= self.__size(evicted)
+
+    @staticmethod
+    def __size(matrix: NDArray) -> int:
+        """Calculate size of dense or sparse matrix in bytes.
+
+        Parameters
+        ----------
+        matrix : NDArray
+            Dense array or scipy sparse matrix.
+
+        Returns
+        -------
+        int
+            Size of the matrix in bytes.
+        """
+        if issparse(matrix):
+            return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+        return matrix.nbytes
+
+    def clear(self):
+        """Remove all matrices from the cache. Counters are preserved."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__nbytes = 0
+
+    @property
+    def hits(self) -> int:
+        """Number of requests served from the cache (`int`, read-only)."""
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """Number of requests that required building the matrix (`int`, read-only)."""
+        return self.__misses
+
+    @property
+    def nbytes(self) -> int:
+        """Current total size of cached matrices in bytes (`int`, read-only)."""
+        return self.__nbytes
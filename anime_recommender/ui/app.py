@@ -4,7 +4,7 @@ import os
 
 import dash_bootstrap_components as dbc
 
-from anime_recommender.ui.callbacks.callbacks_misc import cl, update_info_toast, update_modal
+from anime_recommender.ui.callbacks.callbacks_misc import cl, init_session, update_info_toast, update_modal
 from anime_recommender.ui.callbacks.callbacks_parameters import (
     update_features_list,
     update_scaled,
@@ -12,9 +12,13 @@ from attr import dataclass
 from pandas import DataFrame
 
 from anime_recommender.client import AnilistClient, IClient
+from anime_recommender.config import config
 from anime_recommender.etl.ITextProcessor import ITextProcessor
 from anime_recommender.etl.TextProcessor import TextProcessor
-from anime_recommender.recommender.recommender_interface import IRecommender
+from anime_recommender.recommender.centroids import ProfileCentroids
+from anime_recommender.recommender.engine import RecommendationEngine
+from anime_recommender.recommender.recommender import GroupScores, KernelScores, ResultCache, TitleScores
+from anime_recommender.recommender.shards import create_shards
 from anime_recommender.storage.IStorage import IStorage
 from anime_recommender.storage.LocalStorage import LocalStorage
 
@@ -50,6 +54,9 @@ class UIState(object):
     features_list : list[str]
         List of columns used by recommender. Stores last chosen columns.
 
+    feature_weights : dict[str, float]
+        Weights of columns used by recommender. Stores last chosen weights.
+
     included_lists : list[str]
         List of included lists of user used by recommender. Stores last chosen included lists.
 
@@ -81,6 +88,7 @@ class UIState(object):
     recommender_type: str = 'linear_kernel'
     modal_notification: bool = False
     features_list: list[str] = []
+    feature_weights: dict[str, float] = {}
     included_lists: list[str] = []
     excluded_lists: list[str] = []
     is_weighted: bool = False
@@ -110,8 +118,8 @@ class Service(object):
     storage : IStorage, optional
         IStorage interface implementation.
 
-    recommender : IRecommender, optional
-        IRecommender interface implementation.
+    engine : RecommendationEngine, optional
+        Recommendation engine owning catalog-side artifacts and caches shared between recommendations.
 
     text_processor : Type[ITextProcessor]
         Text processor class.
@@ -119,7 +127,7 @@ class Service(object):
 
     client: IClient | None = None
     storage: IStorage | None = None
-    recommender: IRecommender | None = None
+    engine: RecommendationEngine | None = None
     _text_processor: Type[ITextProcessor] = TextProcessor
 
     @property
@@ -225,5 +233,23 @@ class AppData(object):
 client = AnilistClient()
 storage = LocalStorage()
 ui_state = UIState()
-service = Service(client, storage)
+engine = RecommendationEngine(
+    storage,
+    group_scores=GroupScores(storage, config.group_scores_profiles),
+    title_scores=TitleScores(config.title_scores_sessions),
+    result_cache=ResultCache(config.result_cache_entries, config.result_cache_ttl),
+    profile_centroids=(
+        ProfileCentroids(
+            config.centroids_max,
+            config.centroids_tolerance,
+            config.centroids_profiles,
+            config.centroids_min_titles,
+        )
+        if config.centroids_max > 0
+        else None
+    ),
+    kernel_scores=KernelScores(config.kernel_scores_profiles) if config.kernel_scores_profiles > 0 else None,
+    shards=create_shards(storage),
+)
+service = Service(client, storage, engine=engine)
 app_data = AppData(service, ui_state)
@@ -3,14 +3,15 @@
 
 import dash_bootstrap_components as dbc
 import pandas as pd
-from dash import no_update
+from dash import ctx, no_update
 from dash.development.base_component import Component
 
-from anime_recommender.recommender.recommender import Recommender, RecommenderConfig, SimilarityMethod, VectorUtility
+from anime_recommender.recommender.recommender import RecommenderConfig, SimilarityMethod
 from anime_recommender.ui.app_data import app_data
 from anime_recommender.ui.constants import NUMBER_OF_TITLES, USER_EXCLUDED_LISTS, USER_INCLUDED_LISTS
 from anime_recommender.ui.layout.layout_dynamic import alert, card
 from anime_recommender.ui.ui_utils.dcw import callback_manager as cm
+from anime_recommender.ui.ui_utils.id_holder import IdHolder as ID
 
 
 def recommend_content() -> Component:
@@ -30,23 +31,23 @@ def recommend_content() -> Component:
         app_data.ui_state.scale_slider,
         app_data.ui_state.search_type_switch,
         app_data.ui_state.item_searchbar,
+        column_weights={
+            column: weight
+            for column, weight in app_data.ui_state.feature_weights.items()
+            if column in app_data.ui_state.features_list
+        },
     )
     similarity_method = SimilarityMethod(app_data.ui_state.recommender_type)
-    vector_utility = VectorUtility(similarity_method)
-    app_data.service.recommender = Recommender(
+    storage = app_data.service.storage.pin()
+    recommendations = app_data.service.engine.recommend(
         app_data.service.client,
-        app_data.service.storage,
         recommender_config,
-        vector_utility,
-    )
-
-    app_data.df = pd.merge(
-        pd.DataFrame(app_data.service.recommender.recommend(), columns=['id', 'proba']),
-        app_data.service.storage.info,
-        how='left',
-        left_on='id',
-        right_on='id',
+        similarity_method,
+        NUMBER_OF_TITLES,
+        session=cm.session_id.data,
+        storage=storage,
     )
+    app_data.df = recommendations.join(storage.info)
 
     df = app_data.df.iloc[:NUMBER_OF_TITLES]
 
@@ -81,6 +82,7 @@ def update_app_data():
     app_data.ui_state.recommender_type = cm.recommender_type.value
     app_data.ui_state.modal_notification = cm.modal_notification.is_open
     app_data.ui_state.features_list = cm.features_list.value
+    app_data.ui_state.feature_weights = get_feature_weights()
     app_data.ui_state.is_weighted = cm.is_weighted.value
     app_data.ui_state.is_scaled = is_weighted_and_scaled_scores
     app_data.ui_state.scale_slider = cm.scale_slider.value if is_weighted_and_scaled_scores else None
@@ -92,6 +94,25 @@ def update_app_data():
     app_data.ui_state.language = cm.titles_language.label
 
 
+def get_feature_weights() -> dict[str, float]:
+    """Get weights of features set with sliders.
+
+    Sliders have pattern-matching ids, so their values are read from the list of states of the callback context.
+
+    Returns
+    -------
+    dict[str, float]
+        Weights of features keyed by feature name.
+    """
+    return {
+        state['id']['index']: state['value']
+        for states in ctx.states_list
+        if isinstance(states, list)
+        for state in states
+        if state['id']['type'] == ID.feature_weight
+    }
+
+
 def is_searchbar_empty_and_active() -> bool:
     """Check if either username or item searchbar is empty and active.
 
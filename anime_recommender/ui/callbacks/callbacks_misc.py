@@ -1,6 +1,8 @@
 """Callbacks for miscellaneous UI elements."""
 
-from dash import Input, Output, State, clientside_callback, ctx
+from uuid import uuid4
+
+from dash import Input, Output, State, clientside_callback, ctx, no_update
 from dash.dependencies import ClientsideFunction
 
 from anime_recommender.ui.layout.layout_dynamic import modal_body
@@ -17,6 +19,16 @@ cl = clientside_callback(
 )
 
 
+@callback(
+    Output(ID.session_id, 'data'),
+    Input(ID.session_id, 'modified_timestamp'),
+    State(ID.session_id, 'data'),
+)
+def init_session(modified_timestamp, session_id):
+    """Generate identifier of the browser session if it is not stored yet."""
+    return uuid4().hex if session_id is None else no_update
+
+
 @callback(
     Output(ID.info_container, 'is_open'),
     Input(ID.info_button, 'n_clicks'),
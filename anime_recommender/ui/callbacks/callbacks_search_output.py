@@ -1,7 +1,7 @@
 """Callbacks for searchbar and output container."""
 
 import dash_bootstrap_components as dbc
-from dash import Input, Output, State, ctx, no_update
+from dash import ALL, Input, Output, State, ctx, no_update
 
 from anime_recommender.config import config
 from anime_recommender.ui.app_data import app_data
@@ -180,6 +180,8 @@ def update_items_dropdown(language, search_value, selected_indexes):
         State(ID.user_lists, 'style'),
         State(ID.user_lists, 'children'),
         State(ID.titles_language, 'label'),
+        State(ID.session_id, 'data'),
+        State({'type': ID.feature_weight, 'index': ALL}, 'value'),
     ],
     prevent_initial_call=True,
 )
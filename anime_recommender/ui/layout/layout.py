@@ -1,6 +1,6 @@
 """Web App layout."""
 import dash_bootstrap_components as dbc
-from dash import html
+from dash import dcc, html
 
 from anime_recommender.ui.layout.layout_dynamic import modal_body
 from anime_recommender.ui.layout.layout_static import info_button, main, settings
@@ -21,6 +21,7 @@ layout = html.Div(
         ),
         dbc.Button(id=ID.trigger_modal_update),
         dbc.Button(id=ID.trigger_switch_update),
+        dcc.Store(id=ID.session_id, storage_type='session'),
         *info_button,
     ],
 )
@@ -137,6 +137,8 @@ recommender_type = dbc.AccordionItem(
             options=[
                 {'label': 'Standard', 'value': 'linear_kernel'},
                 {'label': 'Experimental', 'value': 'rbf_kernel'},
+                {'label': 'Experimental (approximate)', 'value': 'rbf_kernel_rff'},
+                {'label': 'Cosine', 'value': 'cosine'},
             ],
             value='linear_kernel',
             id=ID.recommender_type,
@@ -177,6 +179,34 @@ scaled_options = [
     {'label': 'Scale scores', 'value': True},
 ]
 
+feature_weights = dbc.Accordion(
+    dbc.AccordionItem(
+        [
+            html.P(html.I(UI.feature_weights_desc1)),
+            *[
+                html.Div(
+                    [
+                        html.Span(option['label']),
+                        dcc.Slider(
+                            min=0,
+                            max=2,
+                            value=1,
+                            step=0.25,
+                            marks={slider_val: str(slider_val) for slider_val in range(3)},
+                            tooltip={'placement': 'bottom'},
+                            id={'type': ID.feature_weight, 'index': option['value']},
+                        ),
+                    ],
+                )
+                for option in feature_options
+            ],
+        ],
+        title=UI.title_feature_weights,
+        class_name='feature-description',
+    ),
+    start_collapsed=True,
+)
+
 included_features = dbc.AccordionItem(
     [
         html.P(UI.title_features, className='title-mobile'),
@@ -210,6 +240,7 @@ included_features = dbc.AccordionItem(
         ),
         html.Div([], id=ID.features_alert),
         dbc.Checklist(options=feature_options, value=['tags'], id=ID.features_list),
+        feature_weights,
     ],
     title=UI.title_features,
 )
@@ -37,6 +37,9 @@ class IdHolder(StrEnum):
     trigger_modal_update = auto()
     trigger_switch_update = auto()
 
+    # browser session
+    session_id = auto()
+
     # modal window
     modal_notification = auto()
 
@@ -75,6 +78,7 @@ class IdHolder(StrEnum):
     # features
     features_list = auto()
     features_alert = auto()
+    feature_weight = auto()
 
     # user lists
     user_lists = auto()
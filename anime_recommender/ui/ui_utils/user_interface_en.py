@@ -31,6 +31,7 @@ class UserInterfaceEN(StrEnum):
     title_rec_engine = 'Recommendation Engine'
     title_features = 'Included Features'
     title_features_desc = 'Features Description'
+    title_feature_weights = 'Feature Weights'
     title_score = 'Score'
     title_weigted = 'Weighted'
     title_scaled = 'Scaled'
@@ -72,7 +73,9 @@ class UserInterfaceEN(StrEnum):
     rec_engine_desc1 = (
         'Recommendation engine stands for the algorithm used to generate recommendations. Standard (linear kernel) is '
         + 'the default engine and works good for most cases. Experimental (rbf kernel) is awful for large number of '
-        + 'titles, but can give some interesting results for individual one(s).',
+        + 'titles, but can give some interesting results for individual one(s). Experimental (approximate) is a fast '
+        + 'approximation of the rbf kernel suitable for large lists. Cosine is as fast as the standard engine, but is '
+        + 'not biased towards titles with many features (e.g. long-running ones with many tags).',
     )
 
     features_desc1 = (
@@ -95,6 +98,11 @@ class UserInterfaceEN(StrEnum):
     features_desc14 = 'Studios: list of studios that worked on title.'
     features_desc15 = 'Producers: list of producers that worked on title.'
 
+    feature_weights_desc1 = (
+        'How much each included feature affects recommendations relative to the others. Weights apply to the '
+        + 'Standard engine only, other engines treat all included features equally.'
+    )
+
     weighted_desc1 = (
         'Whether to include user scores in calculation or not. Each score applies as a coefficient to the '
         + 'corresponding title that user watched.',
@@ -0,0 +1,206 @@
+"""Benchmarks of recommendation scoring modes. Run this file to get reports on the local data mart."""
+
+import argparse
+
+from anime_recommender.config import config
+from anime_recommender.recommender import benchmark
+from anime_recommender.storage.LocalStorage import LocalStorage
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark Arguments',
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument(
+        '--rff',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Compare approximate RBF kernel with random Fourier features against the exact one.''',
+    )
+
+    parser.add_argument(
+        '--precision',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Compare time, peak memory and accuracy of precision modes against float64.''',
+    )
+
+    parser.add_argument(
+        '--backends',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Compare time, peak memory and agreement of the Numba kernel backend with the NumPy one.''',
+    )
+
+    parser.add_argument(
+        '--top-k',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Compare the exact top-k search over blocks of titles against scoring of the whole catalog.''',
+    )
+
+    parser.add_argument(
+        '--block-sizes',
+        required=False,
+        nargs='+',
+        type=int,
+        default=[32, 64, 256],
+        help='''Optional. The numbers of titles in a block of the top-k search. Default: 32 64 256.''',
+    )
+
+    parser.add_argument(
+        '--centroids',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Compare RBF kernel scored through weighted centroids of titles against the exact one.''',
+    )
+
+    parser.add_argument(
+        '--tolerances',
+        required=False,
+        nargs='+',
+        type=float,
+        default=[0.01, 0.005, 0.002],
+        help='''Optional. Tolerances of the number of centroids. Default: 0.01 0.005 0.002.''',
+    )
+
+    parser.add_argument(
+        '--low-rank',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Compare scoring with truncated SVD factors of feature groups against the full matrix.''',
+    )
+
+    parser.add_argument(
+        '--variances',
+        required=False,
+        nargs='+',
+        type=float,
+        default=[0.8, 0.9, 0.95],
+        help='''Optional. Explained variances of truncated SVD of feature groups. Default: 0.8 0.9 0.95.''',
+    )
+
+    parser.add_argument(
+        '--paging',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Check that consecutive pages of recommendations make up the sorted recommendations.''',
+    )
+
+    parser.add_argument(
+        '--ann',
+        required=False,
+        action='store_true',
+        default=False,
+        help='''Optional. Measure recall of the approximate nearest neighbours index of title mode against the exact
+RBF kernel. The index is built from low-rank factors of feature groups of `low_rank_variance`.''',
+    )
+
+    parser.add_argument(
+        '--candidates',
+        required=False,
+        nargs='+',
+        type=int,
+        default=[128, 256, 512],
+        help='''Optional. The numbers of candidates found by the index. Default: 128 256 512.''',
+    )
+
+    parser.add_argument(
+        '-m',
+        '--methods',
+        required=False,
+        nargs='+',
+        default=['linear_kernel', 'rbf_kernel'],
+        help='''Optional. Similarity methods to benchmark precision modes and kernel backends for.
+Default: linear_kernel rbf_kernel.''',
+    )
+
+    parser.add_argument(
+        '-c',
+        '--columns',
+        required=False,
+        nargs='+',
+        default=['tags', 'genres'],
+        help='''Optional. Feature groups to select. Default: tags genres.''',
+    )
+
+    parser.add_argument(
+        '-l',
+        '--list-size',
+        required=False,
+        type=int,
+        default=3000,
+        help='''Optional. The number of titles in the sampled user profile. Default: 3000.''',
+    )
+
+    parser.add_argument(
+        '--components',
+        required=False,
+        nargs='+',
+        type=int,
+        default=[512, 1024, 2048, 4096],
+        help='''Optional. Dimensions of the random Fourier feature space. Default: 512 1024 2048 4096.''',
+    )
+
+    parser.add_argument(
+        '-s',
+        '--seed',
+        required=False,
+        type=int,
+        default=0,
+        help='''Optional. Seed of the random generator used for sampling the user profile. Default: 0.''',
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    storage = LocalStorage()
+
+    if args.rff:
+        benchmark.benchmark_rff(storage, args.columns, args.list_size, args.components, args.seed)
+
+    if args.precision:
+        benchmark.benchmark_precision(storage, args.columns, args.list_size, args.methods, args.seed)
+
+    if args.backends:
+        benchmark.benchmark_backends(storage, args.columns, args.list_size, args.methods, args.seed)
+
+    if args.top_k:
+        list_sizes = sorted({1, 10, args.list_size})
+        benchmark.benchmark_block_top_k(storage, args.columns, list_sizes, args.block_sizes, seed=args.seed)
+
+    if args.centroids:
+        list_sizes = sorted({1000, args.list_size, 4 * args.list_size})
+        benchmark.benchmark_centroids(storage, args.columns, list_sizes, args.tolerances, seed=args.seed)
+
+    if args.low_rank:
+        benchmark.benchmark_low_rank(
+            storage,
+            args.columns,
+            args.list_size,
+            args.variances,
+            args.methods,
+            config.low_rank_max_rank,
+            args.seed,
+        )
+
+    if args.paging:
+        benchmark.benchmark_paging(storage, args.columns, args.list_size, args.methods, seed=args.seed)
+
+    if args.ann:
+        benchmark.benchmark_ann(storage, args.columns, [1, 3], args.candidates, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
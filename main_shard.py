@@ -0,0 +1,55 @@
+"""Shard server of the catalog. Run this file on every host listed in `shard_addresses` to serve its shard of titles."""
+
+import argparse
+import os
+
+from anime_recommender.recommender.shards import CatalogShard, serve_shard
+from anime_recommender.storage.LocalStorage import LocalStorage
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Shard Server Arguments',
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+
+    parser.add_argument(
+        '-i',
+        '--index',
+        required=True,
+        type=int,
+        help='''Required. Index of the shard, from 0 to the number of shards - 1.''',
+    )
+
+    parser.add_argument(
+        '-n',
+        '--shards',
+        required=True,
+        type=int,
+        help='''Required. The number of shards, the same as the number of `shard_addresses`.''',
+    )
+
+    parser.add_argument(
+        '-a',
+        '--address',
+        required=True,
+        help='''Required. host:port or path of the Unix domain socket to listen on.
+The shared key is read from the SHARD_AUTHKEY environment variable.''',
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    authkey = os.environ.get('SHARD_AUTHKEY')
+
+    if not authkey:
+        raise ValueError('SHARD_AUTHKEY environment variable is required to serve the shard.')
+
+    shard = CatalogShard.slice(LocalStorage(), args.index, args.shards)
+    serve_shard(shard, args.address, authkey.encode())
+
+
+if __name__ == '__main__':
+    main()